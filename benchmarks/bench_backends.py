@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Subprocess və in-process backend-lərin hər video üçün əlavə xərcinin müqayisəsi.
+
+Şəbəkə lazım deyil: lokal HTTP server kiçik fayl verir, `fakebench://ID`
+linklərini isə yt-dlp plugin-i kimi yazılmış saxta extractor açır. Plugin
+`PYTHONPATH` ilə həm alt-proseslərə, həm də cari prosesə görünür, ona görə hər
+iki backend eyni extractor-la ölçülür.
+
+    python benchmarks/bench_backends.py -n 30
+    python benchmarks/bench_backends.py -n 30 --yt-dlp ./yt-dlp   # real PyInstaller binary
+
+`--yt-dlp` verilməsə subprocess backend `python -m yt_dlp` işlədir — bu,
+PyInstaller açılma xərcini saymır, yəni nəticə subprocess üçün optimistdir.
+"""
+
+import argparse
+import http.server
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLUGIN_SRC = '''
+import os
+from yt_dlp.extractor.common import InfoExtractor
+
+
+class FakeBenchIE(InfoExtractor):
+    _VALID_URL = r"fakebench://(?P<id>[\\w-]+)"
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        port = os.environ["FAKEBENCH_PORT"]
+        return {
+            "id": video_id,
+            "title": "Fake " + video_id,
+            "url": "http://127.0.0.1:%s/%s.mp4" % (port, video_id),
+            "ext": "mp4",
+        }
+'''
+
+
+class _PayloadHandler(http.server.BaseHTTPRequestHandler):
+    payload = b"\0" * (256 * 1024)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def setup_plugin(tmp):
+    plugin_dir = os.path.join(tmp, "plugins", "yt_dlp_plugins", "extractor")
+    os.makedirs(plugin_dir)
+    with open(os.path.join(plugin_dir, "fakebench.py"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN_SRC)
+    root = os.path.join(tmp, "plugins")
+    os.environ["PYTHONPATH"] = os.pathsep.join(p for p in (root, os.environ.get("PYTHONPATH")) if p)
+    sys.path.insert(0, root)
+
+
+def python_module_wrapper(tmp):
+    path = os.path.join(tmp, "yt-dlp-py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"#!/bin/sh\nexec {sys.executable} -m yt_dlp \"$@\"\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def run(backend, n, outdir):
+    noop = lambda *a: None  # noqa: E731
+    t0 = time.perf_counter()
+    failures = 0
+    for i in range(n):
+        tmpl = os.path.join(outdir, backend.name, f"{i:04d}.%(ext)s")
+        rc = backend.download(f"fakebench://v{i:04d}", "mp4", tmpl, noop, noop)
+        failures += rc != 0
+    elapsed = time.perf_counter() - t0
+    backend.close()
+    return elapsed, failures
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=20, help="video sayı")
+    ap.add_argument("--yt-dlp", dest="yt_dlp", default=None, help="subprocess üçün yt-dlp binary")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="ytbench-")
+    try:
+        setup_plugin(tmp)
+
+        from ytdownloader import backends
+
+        if not backends.HAVE_YT_DLP:
+            print("yt_dlp modulu quraşdırılmayıb — in-process backend ölçülə bilməz (pip install yt-dlp).")
+            return 1
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _PayloadHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ["FAKEBENCH_PORT"] = str(server.server_address[1])
+
+        class BenchSubprocess(backends.SubprocessBackend):
+            def args_for(self, fmt):
+                return ["-f", "best", "--no-part", "--quiet"]
+
+        class BenchInProcess(backends.InProcessBackend):
+            def params_for(self, fmt, raw=False):
+                # konveyerin xam axınları öz formatları ilə qalır
+                if raw:
+                    return super().params_for(fmt, raw)
+                params = dict(self.base_params)
+                params.update({"format": "best", "nopart": True})
+                return params
+
+        exe = args.yt_dlp or python_module_wrapper(tmp)
+        results = []
+        for backend in (BenchSubprocess(exe), BenchInProcess(exe)):
+            elapsed, failures = run(backend, args.n, tmp)
+            results.append((backend.name, elapsed, failures))
+            note = "" if failures == 0 else f"  ({failures} uğursuz)"
+            print(f"{backend.name:<11} {args.n} video: {elapsed:7.2f}s  ->  {elapsed / args.n * 1000:8.1f} ms/video{note}")
+
+        sub, inproc = results[0][1], results[1][1]
+        if inproc > 0:
+            print(f"in-process {sub / inproc:.1f}x sürətli (hər video üçün {(sub - inproc) / args.n * 1000:.1f} ms qənaət)")
+        server.shutdown()
+        return 0
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ümumi sürət limitinin simulyasiyası: büdcə doldurulurmu, aşılırmı, pay ədalətlidirmi.
+
+Hər "yükləmə" thread-i öz kanal sürəti ilə bayt "endirir", hər TICK-də
+`BandwidthScheduler.consume()` çağırır və qaytarılan müddət qədər saxlanılır
+(engine-də bu, prosesin SIGSTOP ilə dondurulmasıdır). Ssenarilər:
+
+  * equal  — bütün yükləmələr sürətli kanaldadır: hər biri limit / N almalıdır;
+  * mixed  — yarısı yavaşdır: sürətlilər boş qalan payı götürməli, cəmi limitə çatmalıdır;
+  * churn  — yükləmələr yarıda emala keçir (close): qalanlar onların payını almalıdır.
+
+    python benchmarks/bench_bandwidth.py
+    python benchmarks/bench_bandwidth.py --limit 8M -n 6 --seconds 4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdownloader.bandwidth import BandwidthScheduler, format_rate, parse_rate  # noqa: E402
+
+TICK = 0.02
+
+
+def flow(sched, key, link, seconds, got, stop_at=None):
+    sched.open(key)
+    total = 0
+    t0 = time.monotonic()
+    end = t0 + seconds
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= end or (stop_at is not None and now - t0 >= stop_at):
+                break
+            total += int(link * TICK)
+            got[key] = total
+            hold = sched.consume(key, total)
+            time.sleep(hold if hold > 0 else TICK)
+    finally:
+        sched.close(key)
+
+
+def run(limit, links, seconds, stop_at=None):
+    sched = BandwidthScheduler(f"{limit}")
+    got = {}
+    threads = []
+    for i, link in enumerate(links):
+        cut = stop_at if stop_at is not None and i % 2 else None
+        t = threading.Thread(target=flow, args=(sched, i, link, seconds, got, cut))
+        threads.append(t)
+    t0 = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - t0
+    return got, elapsed
+
+
+def jain(values):
+    values = [v for v in values if v > 0]
+    if not values:
+        return 0.0
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limit", default="4M", help="ümumi limit (default: %(default)s)")
+    ap.add_argument("-n", type=int, default=4, help="paralel yükləmə sayı")
+    ap.add_argument("--seconds", type=float, default=3.0, help="hər ssenarinin müddəti")
+    args = ap.parse_args()
+
+    limit = parse_rate(args.limit)
+    fast, slow = limit * 2, limit / (4 * args.n)
+    scenarios = {
+        "equal": ([fast] * args.n, None),
+        "mixed": ([fast if i % 2 == 0 else slow for i in range(args.n)], None),
+        "churn": ([fast] * args.n, args.seconds / 2),
+    }
+    print(f"limit {format_rate(limit)}, {args.n} yükləmə, {args.seconds:.0f} san.")
+    print(f"{'ssenari':>8} {'cəmi':>13} {'limitdən':>9} {'ədalət':>7}  yükləmələr (MiB/s)")
+    for name, (links, stop_at) in scenarios.items():
+        got, elapsed = run(args.limit, links, args.seconds, stop_at)
+        total = sum(got.values()) / elapsed
+        # ədalət yalnız eyni sürətli, sona qədər işləyən kanallar arasında ölçülür
+        fast_rates = [
+            got[i] / elapsed for i, link in enumerate(links) if link == fast and (stop_at is None or i % 2 == 0)
+        ]
+        per = " ".join(f"{got[i] / elapsed / 2 ** 20:.2f}" for i in sorted(got))
+        print(f"{name:>8} {format_rate(total):>13} {total / limit:>8.0%} {jain(fast_rates):>7.2f}  {per}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Toplu iş və playlistlərin bir-bir yüklənməsi, saxta yt-dlp ilə (şəbəkəsiz).
+
+`--lists` playlist, hər biri `--entries` video; qonşu playlistlər `--overlap`
+video ilə üst-üstə düşür (`list=AD:N` — bax `fake_ytdlp.py`). Müqayisə:
+
+    ardıcıl — hər link ayrıca `python -m ytdownloader URL -o qovluq` (əvvəlki yol);
+    toplu   — bir `--batch` işi: təkrar videolar bir dəfə yüklənir, qalanları hardlink.
+
+Yükləmə sayı log-dakı "Başladı" yazılarından sayılır; toplu işdə o unikal
+videoların sayına bərabər olmalıdır.
+
+    python benchmarks/bench_batch.py --lists 4 --entries 30 --overlap 10
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from run_suite import make_launcher  # noqa: E402
+
+
+def links(args):
+    step = args.entries - args.overlap
+    return [f"https://www.youtube.com/playlist?list=L{i + 1}:{i * step}" for i in range(args.lists)]
+
+
+def run_cli(work, launcher, env, extra):
+    cmd = [sys.executable, "-m", "ytdownloader", "--yt-dlp", launcher, "--single-stage", "-q", "-f", "mp3",
+           "-j", "8", *extra]
+    subprocess.run(cmd, cwd=work, env=env, stdout=subprocess.DEVNULL, check=False)
+
+
+def downloads(work):
+    with open(os.path.join(work, "ytdownloader_log.txt"), encoding="utf-8") as f:
+        return sum(1 for line in f if "Başladı" in line)
+
+
+def files(work):
+    return sum(len([n for n in names if n.endswith(".mp3")]) for _, _, names in os.walk(os.path.join(work, "out")))
+
+
+def measure(tmp, launcher, args, batch):
+    work = tempfile.mkdtemp(dir=tmp)
+    env = dict(os.environ, PYTHONPATH=ROOT, FAKE_ENTRIES=str(args.entries), FAKE_SIZE=str(args.size),
+               FAKE_RATE=str(args.rate), FAKE_TICK="0.05")
+    t0 = time.perf_counter()
+    if batch:
+        path = os.path.join(work, "links.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(links(args)) + "\n")
+        run_cli(work, launcher, env, ["-o", "out", "--batch", path])
+    else:
+        for i, url in enumerate(links(args), 1):
+            run_cli(work, launcher, env, ["-o", os.path.join("out", f"L{i}"), url])
+    return time.perf_counter() - t0, downloads(work), files(work)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lists", type=int, default=4, help="playlist sayı")
+    ap.add_argument("--entries", type=int, default=30, help="hər playlistdə video")
+    ap.add_argument("--overlap", type=int, default=10, help="qonşu playlistlərin ortaq videoları")
+    ap.add_argument("--size", type=int, default=256 * 1024, help="video ölçüsü, bayt")
+    ap.add_argument("--rate", type=float, default=1024 * 1024, help="hər yükləmənin sürəti, bayt/san")
+    args = ap.parse_args()
+    args.overlap = max(0, min(args.overlap, args.entries))
+    unique = args.entries + (args.lists - 1) * (args.entries - args.overlap)
+
+    tmp = tempfile.mkdtemp(prefix="ytbatch-")
+    try:
+        launcher = make_launcher(tmp)
+        print(f"{args.lists} playlist × {args.entries} video, ortaq {args.overlap} — unikal {unique}")
+        print(f"{'':<9} {'vaxt':>8} {'yükləmə':>8} {'fayl':>6}")
+        results = {}
+        for label, batch in (("ardıcıl", False), ("toplu", True)):
+            elapsed, count, made = measure(tmp, launcher, args, batch)
+            results[label] = count
+            print(f"{label:<9} {elapsed:>7.2f}s {count:>8} {made:>6}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    ok = results["toplu"] == unique
+    print(f"\ntoplu işdə yükləmə = unikal video: {'OK' if ok else 'XƏTA'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Koordinator + bir neçə worker node bir maşında, saxta yt-dlp ilə (şəbəkəsiz).
+
+Koordinator (`--serve`) və hər node (`--worker`) ayrıca prosesdir — real
+paylanmış quruluşun eynisi, yalnız ünvan 127.0.0.1-dir. `--kill` verilərsə
+bir node həmin saniyədə SIGKILL ilə öldürülür: onun icarələri `--lease-ttl`
+bitəndə başqa node-lara keçməlidir və iş yenə tam bitməlidir.
+
+    python benchmarks/bench_cluster.py --entries 200 --nodes 1 2 4
+    python benchmarks/bench_cluster.py --nodes 3 --kill 3 --lease-ttl 5
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from run_suite import PLAYLIST_URL, make_launcher  # noqa: E402
+
+
+def start(args, cwd, env):
+    cmd = [sys.executable, "-m", "ytdownloader", *args]
+    return subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+
+def run(tmp, launcher, nodes, args):
+    work = tempfile.mkdtemp(dir=tmp)
+    env = dict(os.environ, PYTHONPATH=ROOT, FAKE_ENTRIES=str(args.entries), FAKE_SIZE=str(args.size),
+               FAKE_RATE=str(args.rate), FAKE_TICK="0.05", FAKE_STARTUP=str(args.startup))
+    common = ["--yt-dlp", launcher, "--log-file", os.path.join(work, "log.txt")]
+    coord = start(["--serve", "--port", "0", "--exit-when-done", "--lease-ttl", str(args.lease_ttl), "-q",
+                   *common, PLAYLIST_URL, "-f", "mp3"], work, env)
+    # birinci sətir: "Koordinator: http://127.0.0.1:PORT"
+    url = coord.stdout.readline().strip().split(" ", 1)[1]
+    t0 = time.perf_counter()
+    workers = []
+    for i in range(nodes):
+        d = os.path.join(work, f"node{i + 1}")
+        os.makedirs(d)
+        workers.append(start(["--worker", url, "-j", str(args.threads), "--single-stage", "-q",
+                              "--node-name", f"node{i + 1}", *common], d, env))
+    killed = None
+    if args.kill is not None and nodes > 1:
+        time.sleep(args.kill)
+        killed = workers[0]
+        killed.send_signal(signal.SIGKILL)
+    coord.wait()
+    elapsed = time.perf_counter() - t0
+    for w in workers:
+        try:
+            w.wait(30)
+        except subprocess.TimeoutExpired:
+            w.kill()
+
+    conn = sqlite3.connect(os.path.join(work, "ytdownloader_coordinator.db"))
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+    requeued = conn.execute("SELECT COUNT(*) FROM items WHERE leases > 1").fetchone()[0]
+    per_node = dict(conn.execute("SELECT worker, COUNT(*) FROM items WHERE status = 'done' GROUP BY worker"))
+    conn.close()
+    files = {}
+    for i in range(nodes):
+        for name in os.listdir(os.path.join(work, f"node{i + 1}")):
+            if name.endswith(".mp3"):
+                files[name] = files.get(name, 0) + 1
+    return {
+        "elapsed": elapsed,
+        "done": counts.get("done", 0),
+        "error": counts.get("error", 0),
+        "requeued": requeued,
+        "files": len(files),
+        "duplicates": sum(n - 1 for n in files.values()),
+        "per_node": per_node,
+        "killed": killed is not None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=120, help="playlist-dəki video sayı")
+    ap.add_argument("--nodes", type=int, nargs="+", default=[1, 2, 4], help="node sayları")
+    ap.add_argument("-j", "--threads", type=int, default=4, help="hər node-da paralel yükləmə")
+    ap.add_argument("--size", type=int, default=512 * 1024, help="video ölçüsü, bayt")
+    ap.add_argument("--rate", type=float, default=1024 * 1024, help="hər yükləmənin sürəti, bayt/san")
+    ap.add_argument("--startup", type=float, default=0.1, help="yt-dlp açılma gecikməsi, san.")
+    ap.add_argument("--lease-ttl", type=float, default=5.0, help="icarə müddəti, san.")
+    ap.add_argument("--kill", type=float, default=None, metavar="SEC", help="bu saniyədə bir node-u öldür")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="ytcluster-")
+    failed = False
+    try:
+        launcher = make_launcher(tmp)
+        print(f"{'node':>5} {'vaxt':>8} {'video/san':>10} {'bitdi':>6} {'xəta':>5} {'qaytarılan':>11} {'təkrar fayl':>12}")
+        for n in args.nodes:
+            r = run(tmp, launcher, n, args)
+            print(f"{n:>5} {r['elapsed']:>7.2f}s {r['done'] / r['elapsed']:>10.2f} {r['done']:>6} {r['error']:>5} "
+                  f"{r['requeued']:>11} {r['duplicates']:>12}"
+                  + ("   (bir node öldürüldü)" if r["killed"] else ""))
+            print("      node-lar üzrə: " + ", ".join(f"{k}={v}" for k, v in sorted(r["per_node"].items())))
+            if r["done"] != args.entries:
+                print(f"      XƏTA: {args.entries - r['done']} video bitməyib")
+                failed = True
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Jurnalın bərpa (replay + resume_job) sürəti.
+
+N videoluq yarımçıq iş sintez olunur: hər video üçün növbə, status və bir
+neçə bayt yazısı; bir hissəsi bitmiş, bir hissəsi yüklənərkən "çökmüş".
+Sonra jurnal oxunur və iş mühərrikə yenidən yüklənir (worker-lər işə
+salınmır, yalnız növbə və UI kanalı dolur).
+
+    python benchmarks/bench_journal.py            # 10 000 video
+    python benchmarks/bench_journal.py -n 50000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdownloader.engine import DownloadEngine  # noqa: E402
+from ytdownloader.events import ProgressChannel  # noqa: E402
+from ytdownloader.journal import Journal, replay  # noqa: E402
+
+
+def synth_journal(path, n, outdir):
+    dumps = json.dumps
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps({"t": "job", "url": "https://www.youtube.com/playlist?list=PLbench", "fmt": "mp4", "out": outdir}) + "\n")
+        for i in range(1, n + 1):
+            f.write(dumps({"t": "q", "i": i, "u": f"https://www.youtube.com/watch?v=v{i:07d}", "n": f"Video {i}",
+                           "p": 1, "v": f"v{i:07d}"}) + "\n")
+        f.write('{"t":"listed"}\n')
+        done = n * 6 // 10
+        for i in range(1, done + n // 10 + 1):
+            f.write(dumps({"t": "s", "i": i, "s": "downloading"}) + "\n")
+            f.write(dumps({"t": "b", "i": i, "b": 0, "f": os.path.join(outdir, f"#{i:02d} - Video {i}.mp4")}) + "\n")
+            for b in range(1, 4):
+                f.write(dumps({"t": "b", "i": i, "b": b * 4194304}) + "\n")
+            if i <= done:
+                f.write(dumps({"t": "s", "i": i, "s": "done"}) + "\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=10000, help="video sayı")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="ytjournal-")
+    try:
+        path = os.path.join(tmp, "journal.jsonl")
+        synth_journal(path, args.n, tmp)
+        with open(path, encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+
+        t0 = time.perf_counter()
+        state = replay(path)
+        t1 = time.perf_counter()
+
+        engine = DownloadEngine("yt-dlp", output_dir=tmp)
+        channel = ProgressChannel()
+        journal = Journal(path)
+        engine.subscribe(channel)
+        engine.subscribe(journal)
+        engine.resume_job(state)
+        t2 = time.perf_counter()
+        frame = channel.drain()
+        t3 = time.perf_counter()
+        journal.close()
+
+        print(f"jurnal: {args.n} video, {lines} sətir, {os.path.getsize(path) / 1e6:.1f} MB (bərpadan sonra sıxılmış)")
+        print(f"replay           {(t1 - t0) * 1000:8.1f} ms")
+        print(f"resume_job       {(t2 - t1) * 1000:8.1f} ms  ({engine.counts()['queued']} növbədə)")
+        print(f"UI kanalı drain  {(t3 - t2) * 1000:8.1f} ms  ({len(frame.added)} sətir)")
+        print(f"cəmi             {(t3 - t0) * 1000:8.1f} ms")
+        return 0
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Video siyahısının doldurulma və hər UI tick-inin qiyməti: 1k / 10k / 50k sətir.
+
+Model səviyyəsində (Tk-sız) ölçülür: `queued` hadisələri ProgressChannel-dən
+keçib ListModel-ə tətbiq olunur və görünən pəncərə (WINDOW sətir) Treeview
+dəyərlərinə çevrilir — VirtualList-in hər tick-də etdiyi iş budur. DISPLAY
+varsa əlavə olaraq köhnə yanaşma (hər video üçün bir Treeview item-i) ilə
+VirtualList real Tk üzərində müqayisə olunur.
+
+    python benchmarks/bench_listview.py
+    python benchmarks/bench_listview.py -n 1000 10000 50000 --ticks 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdownloader.events import ProgressChannel  # noqa: E402
+from ytdownloader.listview import ListModel, VirtualList, row_values  # noqa: E402
+
+WINDOW = 30
+ACTIVE = 8
+
+
+def feed_queued(channel, n):
+    for i in range(1, n + 1):
+        channel("queued", i, {"title": f"Video {i}", "url": f"https://youtu.be/v{i}", "playlist": True})
+
+
+def feed_tick(channel, tick, n):
+    # ACTIVE paralel yükləmə irəliləyir, hər 10 tick-də biri bitir və növbəti başlayır
+    base = (tick // 10) * ACTIVE
+    for k in range(ACTIVE):
+        idx = (base + k) % n + 1
+        channel("progress", idx, {"percent": (tick % 10) * 10.0, "mb": tick * 0.5, "speed": 2e6, "eta": 30,
+                                  "phase": "download"})
+    if tick % 10 == 9:
+        for k in range(ACTIVE):
+            idx = (base + k) % n + 1
+            channel("status", idx, {"status": "done"})
+            channel("status", (base + ACTIVE + k) % n + 1, {"status": "downloading"})
+
+
+def render_window(model, first=0):
+    return [row_values(row) for _, row in model.window(first, WINDOW)]
+
+
+def bench_model(n, ticks):
+    channel = ProgressChannel()
+    model = ListModel()
+
+    t0 = time.perf_counter()
+    feed_queued(channel, n)
+    model.apply(channel.drain())
+    render_window(model)
+    populate = time.perf_counter() - t0
+
+    tick_total = 0.0
+    for tick in range(ticks):
+        feed_tick(channel, tick, n)
+        t = time.perf_counter()
+        model.apply(channel.drain())
+        render_window(model, first=tick % max(1, n - WINDOW))
+        tick_total += time.perf_counter() - t
+
+    t = time.perf_counter()
+    model.set_filter("downloading")
+    render_window(model)
+    filt = time.perf_counter() - t
+
+    # filtr aktivkən tick-lər
+    ftick_total = 0.0
+    for tick in range(ticks, ticks * 2):
+        feed_tick(channel, tick, n)
+        t = time.perf_counter()
+        model.apply(channel.drain())
+        render_window(model)
+        ftick_total += time.perf_counter() - t
+    model.set_filter(None)
+
+    t = time.perf_counter()
+    model.set_sort("title")
+    render_window(model)
+    sort = time.perf_counter() - t
+
+    return populate, tick_total / ticks, filt, ftick_total / ticks, sort
+
+
+def bench_tk(n, ticks):
+    """Real Tk: bir-item-bir-video Treeview vs VirtualList (DISPLAY lazımdır)."""
+    import tkinter as tk
+    from tkinter import ttk
+
+    root = tk.Tk()
+    root.geometry("880x600")
+    columns = ("title", "status", "percent", "mb", "speed", "eta")
+    try:
+        # köhnə yanaşma
+        frame = ttk.Frame(root)
+        frame.pack(fill="both", expand=True)
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        tree.pack(fill="both", expand=True)
+        root.update()
+        t0 = time.perf_counter()
+        for i in range(1, n + 1):
+            tree.insert("", "end", iid=f"v{i}", values=(f"#{i} - Video {i}", "Gözləyir", "0%", "0.0", "", ""))
+        root.update()
+        naive_pop = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for tick in range(ticks):
+            for k in range(ACTIVE):
+                iid = f"v{(tick // 10 * ACTIVE + k) % n + 1}"
+                tree.set(iid, "percent", f"{(tick % 10) * 10.0:.1f}%")
+                tree.set(iid, "mb", f"{tick * 0.5:.2f}")
+            root.update()
+        naive_tick = (time.perf_counter() - t0) / ticks
+        frame.destroy()
+
+        # VirtualList
+        frame = ttk.Frame(root)
+        frame.pack(fill="both", expand=True)
+        channel = ProgressChannel()
+        model = ListModel()
+        view = VirtualList(frame, model, columns, (360, 120, 70, 90, 90, 70))
+        root.update()
+        t0 = time.perf_counter()
+        feed_queued(channel, n)
+        model.apply(channel.drain())
+        view.refresh()
+        root.update()
+        virt_pop = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for tick in range(ticks):
+            feed_tick(channel, tick, n)
+            model.apply(channel.drain())
+            view.refresh()
+            root.update()
+        virt_tick = (time.perf_counter() - t0) / ticks
+        frame.destroy()
+    finally:
+        root.destroy()
+    return naive_pop, naive_tick, virt_pop, virt_tick
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, nargs="+", default=[1000, 10000, 50000], help="sətir sayları")
+    ap.add_argument("--ticks", type=int, default=100, help="ölçülən UI tick sayı")
+    args = ap.parse_args()
+
+    print(f"model + {WINDOW} görünən sətir, {ACTIVE} aktiv yükləmə")
+    print(f"{'sətir':>8} {'doldurma':>11} {'tick':>10} {'filtr':>10} {'tick (filtr)':>13} {'sıralama':>10}")
+    for n in args.n:
+        pop, tick, filt, ftick, sort = bench_model(n, args.ticks)
+        print(f"{n:>8} {pop * 1000:>8.1f} ms {tick * 1e6:>7.0f} µs {filt * 1000:>7.2f} ms "
+              f"{ftick * 1e6:>10.0f} µs {sort * 1000:>7.1f} ms")
+
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        print("\nDISPLAY yoxdur — Tk müqayisəsi atlandı.")
+        return 0
+    print("\nTk: hər video üçün Treeview item-i vs VirtualList")
+    print(f"{'sətir':>8} {'köhnə doldurma':>15} {'köhnə tick':>11} {'virtual doldurma':>17} {'virtual tick':>13}")
+    for n in args.n:
+        naive_pop, naive_tick, virt_pop, virt_tick = bench_tk(n, min(args.ticks, 50))
+        print(f"{n:>8} {naive_pop * 1000:>12.0f} ms {naive_tick * 1000:>8.2f} ms "
+              f"{virt_pop * 1000:>14.0f} ms {virt_tick * 1000:>10.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
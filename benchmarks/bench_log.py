@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Log ötürmə qabiliyyəti: köhnə `append_log` (hər çağırışda open/write/close)
+vs `log.AsyncLogger` (deque + tək yazıcı thread), N paralel thread-dən.
+
+Ölçülür:
+  * çağırış  — worker-in bir `append_log`-da itirdiyi orta vaxt;
+  * cəmi     — bütün yazıların fayla düşməsinə qədər keçən vaxt (flush daxil);
+  * sətir/s  — cəmi vaxta görə ötürmə qabiliyyəti.
+
+    python benchmarks/bench_log.py
+    python benchmarks/bench_log.py -t 1 8 50 -n 2000
+"""
+
+import argparse
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdownloader.log import AsyncLogger  # noqa: E402
+
+
+def legacy_logger(path):
+    """Əvvəlki core.append_log-un surəti."""
+
+    def append_log(text, level="info", **fields):
+        ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(f"[{ts}] {text}\n")
+        except Exception:
+            pass
+
+    return append_log, lambda: None
+
+
+def async_logger(path, fmt="text"):
+    logger = AsyncLogger(path, fmt=fmt, max_bytes=0)
+
+    def finish():
+        logger.flush(60)
+        logger.close()
+
+    return logger.log, finish
+
+
+def run(factory, threads, per_thread):
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "log.txt")
+    log, finish = factory(path)
+    barrier = threading.Barrier(threads + 1)
+    spent = [0.0] * threads
+
+    def worker(k):
+        barrier.wait()
+        t = time.perf_counter()
+        for i in range(per_thread):
+            log(f"Başladı idx={i} url=https://www.youtube.com/watch?v=x{k}", idx=i, url="x")
+        spent[k] = time.perf_counter() - t
+
+    ts = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    for t in ts:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in ts:
+        t.join()
+    finish()
+    total = time.perf_counter() - t0
+    with open(path, encoding="utf-8") as f:
+        lines = sum(1 for _ in f)
+    shutil.rmtree(tmp, ignore_errors=True)
+    n = threads * per_thread
+    assert lines == n, (lines, n)
+    return sum(spent) / n, total, n / total
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-t", type=int, nargs="+", default=[1, 8, 50], help="thread sayları")
+    ap.add_argument("-n", type=int, default=2000, help="hər thread-in yazı sayı")
+    args = ap.parse_args()
+
+    impls = (
+        ("köhnə", legacy_logger),
+        ("async", async_logger),
+        ("async json", lambda p: async_logger(p, "json")),
+    )
+    print(f"{'thread':>6} {'implementasiya':>15} {'çağırış':>10} {'cəmi':>10} {'sətir/s':>10}")
+    for threads in args.t:
+        for name, factory in impls:
+            call, total, rate = run(factory, threads, args.n)
+            print(f"{threads:>6} {name:>15} {call * 1e6:>7.1f} µs {total * 1000:>7.0f} ms {rate:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+İrəliləyiş parser-lərinin mikro-benchmark-ı.
+
+Eyni yükləmə iki formada log kimi yaradılır (və ya `--log` ilə real yt-dlp
+çıxışı verilir): köhnə `--newline` sətirləri və `--progress-template`
+protokolu. Hər sətir üçün parser-in qiyməti ölçülür.
+
+    python benchmarks/bench_progress.py                 # 2 milyon sətir
+    python benchmarks/bench_progress.py -n 5000000
+    python benchmarks/bench_progress.py --log captured.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ytdownloader.core import parse_progress_line  # noqa: E402
+from ytdownloader.progress import PREFIX, parse_line  # noqa: E402
+
+NOISE = (
+    "[youtube] Extracting URL: https://www.youtube.com/watch?v=dQw4w9WgXcQ\n",
+    "[info] dQw4w9WgXcQ: Downloading 1 format(s): 137+140\n",
+    "[download] Destination: #01 - Video.f137.mp4\n",
+)
+
+
+def synth_logs(n):
+    """n sətirlik (legacy, template) cütü; hər 100 sətrin 3-ü səs-küydür."""
+    total = 104857600
+    legacy, template = [], []
+    for i in range(n):
+        if i % 100 < 3:
+            line = NOISE[i % 3]
+            legacy.append(line)
+            template.append(line)
+            continue
+        done = (i * 4096) % total
+        pct = done * 100.0 / total
+        legacy.append(f"[download]  {pct:5.1f}% of ~ 100.00MiB at    2.50MiB/s ETA 00:{i % 60:02d} (frag {i % 50}/50)\n")
+        template.append(f"{PREFIX}d|{done}|{total}|NA|2621440.0|{i % 60}|{i % 50}|50\n")
+    return legacy, template
+
+
+def bench(name, fn, lines):
+    t0 = time.perf_counter()
+    hits = 0
+    for line in lines:
+        if fn(line) is not None:
+            hits += 1
+    elapsed = time.perf_counter() - t0
+    print(f"{name:<28} {len(lines):>9} sətir  {elapsed:7.3f}s  {len(lines) / elapsed / 1e6:6.2f} M sətir/s  "
+          f"{elapsed / len(lines) * 1e9:7.0f} ns/sətir  ({hits} uyğun)")
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=2000000, help="sintetik sətir sayı")
+    ap.add_argument("--log", default=None, help="real yt-dlp çıxışı (hər iki formatın qarışığı ola bilər)")
+    args = ap.parse_args()
+
+    if args.log:
+        with open(args.log, encoding="utf-8", errors="replace") as f:
+            lines = f.readlines()
+        bench("regex (köhnə)", parse_progress_line, lines)
+        bench("parse_line", parse_line, lines)
+        return 0
+
+    legacy, template = synth_logs(args.n)
+    old = bench("regex, --newline", parse_progress_line, legacy)
+    bench("parse_line, --newline", parse_line, legacy)
+    new = bench("parse_line, template", parse_line, template)
+    print(f"template protokolu köhnə regex yolundan {old / new:.1f}x sürətli")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Proqramın başlanğıc vaxtı: prosesin açılmasından pəncərənin işlək olmasına qədər.
+
+Hər ölçmə təzə Python prosesində, ayrıca qovluqda aparılır; yt-dlp (saxta,
+`fake_ytdlp.py`, `--startup` san. açılma gecikməsi ilə — PyInstaller binary-si
+kimi) və ffmpeg (saxta) PATH-də hazırdır. İki hal müqayisə olunur:
+
+    cold — alət keşi (`ytdownloader_tools.json`) yoxdur: versiyalar soruşulur;
+    warm — keş etibarlıdır: heç bir alət prosesi başladılmır.
+
+Mərhələlər: import (GUI modulu + ytdownloader), window (pəncərə çəkildi,
+yalnız DISPLAY varsa), ready (alətlər tapıldı, mühərrik quruldu, Start
+aktivdir) və process (interpretatorun açılması daxil, xarici ölçmə).
+DISPLAY yoxdursa `tools_ready`-nin Tk-sız hissəsi ölçülür.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --startup 1.5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+TARGET = 0.5  # warm başlanğıc: pəncərə bu müddətdə işlək olmalıdır, san.
+TOOLS_CACHE = "ytdownloader_tools.json"
+
+
+def has_display():
+    return bool(os.environ.get("DISPLAY")) or not sys.platform.startswith("linux")
+
+
+def make_tools(tmp):
+    """Saxta yt-dlp və ffmpeg — `tmp` PATH-in əvvəlinə əlavə olunur."""
+    script = os.path.join(HERE, "fake_ytdlp.py")
+    if os.name == "nt":
+        with open(os.path.join(tmp, "yt-dlp.cmd"), "w") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\n')
+        with open(os.path.join(tmp, "ffmpeg.cmd"), "w") as f:
+            f.write("@echo ffmpeg version 0.0-fake\n")
+        return
+    for name, body in (
+        ("yt-dlp", f'exec "{sys.executable}" "{script}" "$@"'),
+        ("ffmpeg", 'echo "ffmpeg version 0.0-fake"'),
+    ):
+        path = os.path.join(tmp, name)
+        with open(path, "w") as f:
+            f.write(f"#!/bin/sh\n{body}\n")
+        os.chmod(path, 0o755)
+
+
+# ---------------- uşaq proses: ölçmənin özü ----------------
+def child(gui):
+    t0 = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import full_youtube_playlist_installer as app
+
+    marks = {"import": time.perf_counter() - t0}
+
+    if gui:
+        tools_ready = app.UltraDownloader.tools_ready
+
+        def timed_ready(self, tools):
+            tools_ready(self, tools)
+            marks["ready"] = time.perf_counter() - t0
+
+        def mainloop(root, n=0):
+            root.update()
+            marks["window"] = time.perf_counter() - t0
+            deadline = time.monotonic() + 30
+            while "ready" not in marks and time.monotonic() < deadline:
+                root.update()
+                time.sleep(0.002)
+            root.destroy()
+
+        app.UltraDownloader.tools_ready = timed_ready
+        app.tk.Tk.mainloop = mainloop
+        app.UltraDownloader()
+    else:
+        from ytdownloader.tools import ToolSetup
+
+        result = {}
+        ToolSetup(result.update, install=False).run()
+        marks["tools"] = time.perf_counter() - t0
+        # tools_ready-nin Tk-sız hissəsi
+        engine = app.DownloadEngine(
+            result["yt-dlp"]["path"],
+            backend=app.make_backend("auto", result["yt-dlp"]["path"]),
+            index=app.DownloadIndex(),
+            cache=app.PlaylistCache(),
+        )
+        engine.subscribe(app.Journal())
+        engine.subscribe(app.Metrics(engine))
+        marks["ready"] = time.perf_counter() - t0
+    print(json.dumps(marks))
+
+
+# ---------------- ana proses ----------------
+def run_once(tmp, gui, startup):
+    env = dict(os.environ)
+    env["PATH"] = tmp + os.pathsep + env.get("PATH", "")
+    env["FAKE_STARTUP"] = str(startup)
+    cmd = [sys.executable, os.path.abspath(__file__), "--child"]
+    if gui:
+        cmd.append("--gui")
+    t0 = time.perf_counter()
+    out = subprocess.run(cmd, cwd=tmp, env=env, stdout=subprocess.PIPE, text=True, check=True).stdout
+    marks = json.loads(out.strip().splitlines()[-1])
+    marks["process"] = time.perf_counter() - t0
+    return marks
+
+
+def measure(gui=False, repeat=5, startup=0.8):
+    """{"cold": {mərhələ: median}, "warm": {...}} — san."""
+    tmp = tempfile.mkdtemp(prefix="ytstartup-")
+    try:
+        make_tools(tmp)
+        results = {}
+        for case in ("cold", "warm"):
+            runs = []
+            for _ in range(repeat):
+                cache = os.path.join(tmp, TOOLS_CACHE)
+                if case == "cold" and os.path.exists(cache):
+                    os.remove(cache)
+                runs.append(run_once(tmp, gui, startup))
+            results[case] = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+        return results
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5, help="hər hal üçün ölçmə sayı (median)")
+    ap.add_argument("--startup", type=float, default=0.8, help="saxta yt-dlp-nin açılma gecikməsi, san.")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--gui", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.gui)
+        return 0
+
+    gui = has_display()
+    if not gui:
+        print("DISPLAY yoxdur — pəncərəsiz ölçülür (Tk qurulması daxil deyil).")
+    results = measure(gui, args.repeat, args.startup)
+    phases = [p for p in ("import", "tools", "window", "ready", "process") if p in results["warm"]]
+    print(f"{'':<6}" + "".join(f"{p:>10}" for p in phases))
+    for case in ("cold", "warm"):
+        print(f"{case:<6}" + "".join(f"{results[case][p]:>9.3f}s" for p in phases))
+    ready = results["warm"]["ready"]
+    ok = ready < TARGET
+    print(f"\nwarm ready: {ready * 1000:.0f} ms (hədəf < {TARGET * 1000:.0f} ms) — {'OK' if ok else 'AŞILDI'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
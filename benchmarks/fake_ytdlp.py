@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark-lar üçün saxta `yt-dlp`: şəbəkəsiz, idarə olunan sürət və xətalarla.
+
+Mühərrik onu real yt-dlp kimi çağırır; davranış mühit dəyişənləri ilə verilir:
+
+    FAKE_ENTRIES      playlist-dəki entry sayı (default 10)
+                      linkdə `list=AD:N` — id-lər N+1-dən başlayır (üst-üstə düşən playlistlər), başlıq "Fake AD"
+    FAKE_LIST_RATE    --flat-playlist -j: saniyədə entry (0 — limitsiz)
+    FAKE_STARTUP      hər çağırışda başlanğıc gecikməsi, san. (PyInstaller + extractor)
+    FAKE_SIZE         video ölçüsü, bayt (default 5 MiB)
+    FAKE_RATE         yükləmə sürəti, bayt/san (0 — limitsiz)
+    FAKE_TICK         irəliləyiş sətirləri arası, san. (default 0.05)
+    FAKE_FAIL         xəta ilə bitən videoların payı 0..1 (video id-yə görə deterministik)
+    FAKE_ERROR        xəta sətri (default "HTTP Error 403: Forbidden"; məs. "HTTP Error 429: Too Many Requests",
+                      "Private video. Sign in if you've been granted access to this video")
+    FAKE_FAIL_TIMES   xətalı video yalnız ilk N cəhddə uğursuz olur (təkrar cəhdlərin yoxlanması; 0 — həmişə)
+    FAKE_STATE        cəhd sayğaclarının qovluğu (FAKE_FAIL_TIMES üçün lazımdır)
+    FAKE_TEMPLATE     1 — `--help` `--progress-template`-i "dəstəkləyir" (default), 0 — köhnə `--newline`
+    FAKE_WRITE        1 — çıxış faylı ölçüsü qədər (sparse) yaradılır (default), 0 — boş fayl
+
+Çıxış: `[download] Destination: ...`, sonra `--newline` sətirləri
+(`[download]  42.0% of 5.00MiB at 2.00MiB/s ETA 00:03`) və ya
+`--progress-template` verilibsə həmin şablonla doldurulmuş sətirlər.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+import zlib
+
+MIB = 1024 * 1024
+
+
+def env(name, default, cast=float):
+    value = os.environ.get(name)
+    return cast(value) if value not in (None, "") else default
+
+
+def video_id(url):
+    m = re.search(r"(?:v=|/)([\w-]{4,})$", url)
+    return m.group(1) if m else "video"
+
+
+def failing(vid, ratio):
+    # deterministik: eyni video hər dəfə eyni nəticəni verir
+    return ratio > 0 and (zlib.crc32(vid.encode()) % 10000) < ratio * 10000
+
+
+def attempt_fails(vid):
+    """FAKE_FAIL_TIMES: cəhdləri FAKE_STATE qovluğunda sayır, ilk N-i uğursuz olur."""
+    times = env("FAKE_FAIL_TIMES", 0, int)
+    state = os.environ.get("FAKE_STATE")
+    if not times or not state:
+        return True
+    path = os.path.join(state, vid + ".attempts")
+    try:
+        with open(path) as f:
+            n = int(f.read() or 0)
+    except OSError:
+        n = 0
+    with open(path, "w") as f:
+        f.write(str(n + 1))
+    return n < times
+
+
+def list_playlist(args):
+    n = env("FAKE_ENTRIES", 10, int)
+    rate = env("FAKE_LIST_RATE", 0.0)
+    start = int(args[args.index("--playlist-start") + 1]) if "--playlist-start" in args else 1
+    m = re.search(r"list=([^&:]+)(?::(\d+))?", args[-1])
+    name, offset = (m.group(1), int(m.group(2) or 0)) if m else ("fake", 0)
+    t0 = time.monotonic()
+    out = sys.stdout
+    for i in range(start, n + 1):
+        vid = f"fake{i + offset:07d}"
+        out.write(json.dumps({
+            "_type": "url",
+            "ie_key": "Youtube",
+            "id": vid,
+            "title": f"Fake video {i}",
+            "url": f"https://www.youtube.com/watch?v={vid}",
+            "duration": 60 + i % 600,
+            "playlist_index": i,
+            "playlist_title": f"Fake {name}",
+        }) + "\n")
+        if rate:
+            out.flush()
+            delay = t0 + (i - start + 1) / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    out.flush()
+    return 0
+
+
+def fill_template(tmpl, vid, ext, format_id="18"):
+    return (tmpl.replace("%(title)s", f"Fake {vid}").replace("%(id)s", vid)
+            .replace("%(ext)s", ext).replace("%(format_id)s", format_id))
+
+
+def progress_line(template, done, total, speed, eta):
+    if template:
+        return (template.replace("%(progress.downloaded_bytes)s", str(done))
+                .replace("%(progress.total_bytes)s", str(total))
+                .replace("%(progress.total_bytes_estimate)s", "NA")
+                .replace("%(progress.speed)s", f"{speed:.1f}" if speed else "NA")
+                .replace("%(progress.eta)s", str(int(eta)) if eta is not None else "NA")
+                .replace("%(progress.fragment_index)s", "NA")
+                .replace("%(progress.fragment_count)s", "NA"))
+    pct = done * 100.0 / total
+    eta_text = f"{int(eta) // 60:02d}:{int(eta) % 60:02d}" if eta is not None else "Unknown"
+    return f"[download] {pct:5.1f}% of {total / MIB:.2f}MiB at {speed / MIB:.2f}MiB/s ETA {eta_text}"
+
+
+def download(args):
+    url = args[-1]
+    vid = video_id(url)
+    size = env("FAKE_SIZE", 5 * MIB, int)
+    rate = env("FAKE_RATE", 0.0)
+    tick = env("FAKE_TICK", 0.05)
+    tmpl = args[args.index("-o") + 1] if "-o" in args else "%(title)s.%(ext)s"
+    ext = "mp3" if "--extract-audio" in args else "mp4"
+    target = fill_template(tmpl, vid, ext)
+    template = None
+    if "--progress-template" in args:
+        for i, a in enumerate(args):
+            if a == "--progress-template" and args[i + 1].startswith("download:"):
+                template = args[i + 1][len("download:"):]
+    out = sys.stdout
+    out.write(f"[youtube] Extracting URL: {url}\n[info] {vid}: Downloading 1 format(s): 18\n")
+    out.write(f"[download] Destination: {target}\n")
+    out.flush()
+
+    t0 = time.monotonic()
+    done = 0
+    fail_at = size // 3 if failing(vid, env("FAKE_FAIL", 0.0)) and attempt_fails(vid) else None
+    step = max(1, int(rate * tick)) if rate else max(1, size // 20)
+    while done < size:
+        done = min(size, done + step)
+        elapsed = time.monotonic() - t0
+        if rate:
+            delay = t0 + done / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elapsed = time.monotonic() - t0
+        speed = done / elapsed if elapsed > 0 else float(rate or size)
+        eta = (size - done) / speed if speed else None
+        out.write(progress_line(template, done, size, speed, eta) + "\n")
+        out.flush()
+        if fail_at is not None and done >= fail_at:
+            error = os.environ.get("FAKE_ERROR") or "HTTP Error 403: Forbidden"
+            out.write(f"ERROR: [youtube] {vid}: {error}\n")
+            out.flush()
+            return 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    with open(target, "wb") as f:
+        if env("FAKE_WRITE", 1, int):
+            f.truncate(size)
+    out.write(f"[download] 100% of {size / MIB:.2f}MiB in {time.monotonic() - t0:.2f}s\n")
+    out.flush()
+    return 0
+
+
+def main(args):
+    # PyInstaller binary-si --help/--version üçün də özünü açır
+    startup = env("FAKE_STARTUP", 0.0)
+    if startup:
+        time.sleep(startup)
+    if "--help" in args:
+        print("Usage: yt-dlp [OPTIONS] URL")
+        if env("FAKE_TEMPLATE", 1, int):
+            print("    --progress-template [TYPES:]TEMPLATE")
+        return 0
+    if "--version" in args:
+        print("2099.01.01-fake")
+        return 0
+    if "-j" in args or "--flat-playlist" in args:
+        return list_playlist(args)
+    return download(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
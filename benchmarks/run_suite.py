@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Şəbəkəsiz benchmark dəsti: mühərrik saxta yt-dlp (`fake_ytdlp.py`) ilə işləyir.
+
+Ssenarilər:
+  * prepare — `prepare_playlist`: 10 / 1k / 10k entry-lik siyahının növbəyə düşməsi;
+  * workers — `worker_loop` ötürmə qabiliyyəti 1..50 thread-də (kiçik fayllar, 5% xəta);
+  * parse   — irəliləyiş sətrinin qiyməti (regex, parse_line --newline, parse_line template);
+  * ui      — ListModel doldurulması və hər UI tick-i 1k / 10k sətirdə;
+  * control — pauza, davam və dayandırmanın gecikməsi 8 aktiv yükləmədə;
+  * startup — proqramın başlanğıcı alət keşi ilə və keşsiz (bax `bench_startup.py`).
+
+Nəticələr düz açarlı JSON-a yazılır (`benchmarks/results/<vaxt>-<commit>.json`
+və ya `-o`); hər metrikin vahidi və "yaxşı" istiqaməti var. `--compare` iki
+faylı müqayisə edir və həddən çox pisləşmə varsa 1 kodu ilə çıxır:
+
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --quick --scenarios parse ui
+    python benchmarks/run_suite.py --compare results/old.json results/new.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from bench_listview import bench_model  # noqa: E402
+from bench_progress import synth_logs  # noqa: E402
+from bench_startup import has_display, measure  # noqa: E402
+from ytdownloader.core import parse_progress_line  # noqa: E402
+from ytdownloader.engine import DownloadEngine  # noqa: E402
+from ytdownloader.log import configure_logging  # noqa: E402
+from ytdownloader.progress import parse_line  # noqa: E402
+
+SCENARIOS = ("prepare", "workers", "parse", "ui", "control", "startup")
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PLfake"
+MIB = 1024 * 1024
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, key, value, unit, better="lower"):
+        self.metrics[key] = {"value": round(value, 6), "unit": unit, "better": better}
+        print(f"  {key:<36} {value:>14.3f} {unit}")
+
+
+def make_launcher(tmp):
+    """Saxta yt-dlp-ni icra olunan fayl kimi təqdim edir (mühərrik onu yol ilə çağırır)."""
+    script = os.path.join(HERE, "fake_ytdlp.py")
+    if os.name == "nt":
+        path = os.path.join(tmp, "yt-dlp.cmd")
+        with open(path, "w") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\n')
+    else:
+        path = os.path.join(tmp, "yt-dlp")
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(path, 0o755)
+    return path
+
+
+def fake_env(**values):
+    for k, v in values.items():
+        os.environ["FAKE_" + k.upper()] = str(v)
+
+
+def new_engine(launcher, tmp, threads=8):
+    out = tempfile.mkdtemp(dir=tmp)
+    return DownloadEngine(launcher, output_dir=out, threads=threads, pipeline=False)
+
+
+# ---------------- ssenarilər ----------------
+def bench_prepare(res, launcher, tmp, quick):
+    sizes = (10, 1000) if quick else (10, 1000, 10000)
+    fake_env(startup=0, list_rate=0)
+    for n in sizes:
+        fake_env(entries=n)
+        engine = new_engine(launcher, tmp)
+        t0 = time.perf_counter()
+        got = engine.prepare_playlist(PLAYLIST_URL)
+        elapsed = time.perf_counter() - t0
+        assert got == n, (got, n)
+        res.add(f"prepare.{n}.seconds", elapsed, "s")
+        res.add(f"prepare.{n}.entries_per_s", n / elapsed, "entry/s", "higher")
+
+
+def bench_workers(res, launcher, tmp, quick):
+    counts = (1, 8) if quick else (1, 8, 20, 50)
+    videos = 40 if quick else 200
+    fake_env(entries=videos, size=MIB, rate=0, fail=0.05, startup=0)
+    for threads in counts:
+        engine = new_engine(launcher, tmp, threads)
+        events = [0]
+
+        def count(event, idx, data):
+            if event == "progress":
+                events[0] += 1
+
+        engine.subscribe(count)
+        t0 = time.perf_counter()
+        engine.prepare_playlist(PLAYLIST_URL, start_threads=threads)
+        engine.wait(600)
+        elapsed = time.perf_counter() - t0
+        counts_ = engine.counts()
+        assert counts_["done"] + counts_["error"] == videos, counts_
+        res.add(f"workers.{threads}.videos_per_s", videos / elapsed, "video/s", "higher")
+        res.add(f"workers.{threads}.progress_events_per_s", events[0] / elapsed, "event/s", "higher")
+        res.add(f"workers.{threads}.errors", counts_["error"], "video", "lower")
+
+
+def bench_parse(res, launcher, tmp, quick):
+    n = 200000 if quick else 1000000
+    legacy, template = synth_logs(n)
+    for name, fn, lines in (
+        ("regex_newline", parse_progress_line, legacy),
+        ("parse_line_newline", parse_line, legacy),
+        ("parse_line_template", parse_line, template),
+    ):
+        t0 = time.perf_counter()
+        for line in lines:
+            fn(line)
+        elapsed = time.perf_counter() - t0
+        res.add(f"parse.{name}.ns_per_line", elapsed / len(lines) * 1e9, "ns")
+
+
+def bench_ui(res, launcher, tmp, quick):
+    sizes = (1000,) if quick else (1000, 10000)
+    ticks = 50 if quick else 200
+    for n in sizes:
+        populate, tick, filt, ftick, sort = bench_model(n, ticks)
+        res.add(f"ui.{n}.populate_ms", populate * 1000, "ms")
+        res.add(f"ui.{n}.tick_us", tick * 1e6, "µs")
+        res.add(f"ui.{n}.filtered_tick_us", ftick * 1e6, "µs")
+        res.add(f"ui.{n}.sort_ms", sort * 1000, "ms")
+
+
+def proc_state(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0]
+    except OSError:
+        return None
+
+
+def wait_for(predicate, timeout=30.0):
+    # ölçmə üçün sıx yoxlama; mühərrikin özü poll etmir
+    end = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > end:
+            raise TimeoutError("benchmark şərti gözlənilən vaxtda ödənmədi")
+        time.sleep(0.0005)
+    return time.perf_counter()
+
+
+def bench_control(res, launcher, tmp, quick):
+    threads = 8
+    rounds = 1 if quick else 3
+    # yükləmələr ~50 san. çəkir: ölçmə vaxtı hamısı aktivdir
+    fake_env(entries=threads * 2, size=50 * MIB, rate=MIB, fail=0, tick=0.05, startup=0)
+    samples = {"pause_call_ms": [], "pause_ms": [], "resume_ms": [], "stop_call_ms": [], "stop_ms": [],
+               "stop_exit_ms": []}
+    for _ in range(rounds):
+        engine = new_engine(launcher, tmp, threads)
+        last = [0.0]
+
+        def on_event(event, idx, data):
+            if event == "progress":
+                last[0] = time.perf_counter()
+
+        engine.subscribe(on_event)
+        engine.prepare_playlist(PLAYLIST_URL, start_threads=threads)
+        wait_for(lambda: len(engine.procs.running()) == threads and engine.counts()["downloading"] == threads)
+        time.sleep(0.3)
+        pids = [p.pid for p in engine.procs.running()]
+
+        t0 = time.perf_counter()
+        engine.pause()
+        samples["pause_call_ms"].append((time.perf_counter() - t0) * 1000)
+        if os.path.isdir("/proc"):
+            # bütün yt-dlp prosesləri "T" (stopped) vəziyyətinə keçənə qədər
+            t = wait_for(lambda: all(proc_state(pid) in ("T", "t", None) for pid in pids))
+            samples["pause_ms"].append((t - t0) * 1000)
+        time.sleep(0.2)
+
+        t0 = time.perf_counter()
+        engine.resume()
+        t = wait_for(lambda: last[0] > t0)
+        samples["resume_ms"].append((t - t0) * 1000)
+        time.sleep(0.2)
+
+        t0 = time.perf_counter()
+        engine.stop()
+        samples["stop_call_ms"].append((time.perf_counter() - t0) * 1000)
+        engine.wait(30)
+        samples["stop_ms"].append((time.perf_counter() - t0) * 1000)
+        t = wait_for(lambda: not engine.procs.running())
+        samples["stop_exit_ms"].append((t - t0) * 1000)
+    for name, values in samples.items():
+        if values:
+            res.add(f"control.{name}", statistics.median(values), "ms")
+
+
+def bench_startup(res, launcher, tmp, quick):
+    results = measure(has_display(), repeat=3 if quick else 7)
+    for case, phases in results.items():
+        for phase, value in phases.items():
+            res.add(f"startup.{case}.{phase}_ms", value * 1000, "ms")
+
+
+BENCHES = {
+    "prepare": bench_prepare,
+    "workers": bench_workers,
+    "parse": bench_parse,
+    "ui": bench_ui,
+    "control": bench_control,
+    "startup": bench_startup,
+}
+
+
+# ---------------- nəticə faylları ----------------
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            universal_newlines=True, timeout=10,
+        )
+        commit = out.stdout.strip() or "unknown"
+        dirty = subprocess.run(
+            ["git", "-C", ROOT, "status", "--porcelain", "--untracked-files=no"], stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, universal_newlines=True, timeout=30,
+        ).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def meta(args):
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": args.quick,
+        "scenarios": args.scenarios,
+    }
+
+
+def compare(old_path, new_path, threshold):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} → {new['meta']['commit']} (hədd {threshold:.0%})")
+    for field in ("quick", "cpu_count", "python"):
+        if old["meta"].get(field) != new["meta"].get(field):
+            print(f"  diqqət: '{field}' fərqlidir ({old['meta'].get(field)} / {new['meta'].get(field)}) — nəticələr tam müqayisəli deyil")
+    regressions = 0
+    for key in sorted(set(old["results"]) & set(new["results"])):
+        a, b = old["results"][key], new["results"][key]
+        if not a["value"]:
+            continue
+        change = (b["value"] - a["value"]) / a["value"]
+        worse = -change if a["better"] == "higher" else change
+        mark = ""
+        if worse > threshold:
+            mark = "  PİSLƏŞMƏ"
+            regressions += 1
+        elif worse < -threshold:
+            mark = "  yaxşılaşma"
+        print(f"  {key:<36} {a['value']:>12.3f} → {b['value']:>12.3f} {a['unit']:<8} {change:+7.1%}{mark}")
+    for key in sorted(set(old["results"]) ^ set(new["results"])):
+        print(f"  {key:<36} yalnız {'köhnə' if key in old['results'] else 'yeni'} faylda")
+    print(f"{regressions} pisləşmə")
+    return 1 if regressions else 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="işlədiləcək ssenarilər")
+    ap.add_argument("--quick", action="store_true", help="kiçik ölçülər (CI / tez yoxlama üçün)")
+    ap.add_argument("-o", "--output", default=None, help="JSON nəticə faylı (default: benchmarks/results/...)")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="iki nəticə faylını müqayisə et")
+    ap.add_argument("--threshold", type=float, default=0.10, help="pisləşmə həddi (default: %(default)s)")
+    args = ap.parse_args()
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    tmp = tempfile.mkdtemp(prefix="ytbench-")
+    saved_env = dict(os.environ)
+    # benchmark logu cari qovluğu zibilləməsin
+    configure_logging(path=os.path.join(tmp, "log.txt"), max_bytes=0)
+    results = Results()
+    try:
+        launcher = make_launcher(tmp)
+        for name in args.scenarios:
+            print(f"[{name}]")
+            BENCHES[name](results, launcher, tmp, args.quick)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    info = meta(args)
+    path = args.output
+    if path is None:
+        stamp = info["timestamp"].replace(":", "").replace("-", "")
+        path = os.path.join(HERE, "results", f"{stamp}-{info['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": info, "results": results.metrics}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Nəticələr: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
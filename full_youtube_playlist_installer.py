@@ -6,125 +6,65 @@ YouTube Ultra Downloader v2.1 — düzəldilmiş, təmizlənmiş və build_gui o
 """
 
 import os
+import sys
 import platform
 import subprocess
 import threading
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import queue
-import json
-import re
-import time
-import datetime
-import shutil
-
-# winsound yalnız Windows üçün
-if platform.system().lower() == "windows":
-    try:
-        import winsound
-    except Exception:
-        winsound = None
-else:
-    winsound = None
-
-APP_TITLE = "YouTube Ultra Downloader v2.1"
-LOG_FILE = os.path.join(os.getcwd(), "ytdownloader_log.txt")
-
-PCT_RE = re.compile(
-    r"(?P<pct>\d{1,3}(?:\.\d+)?)%\s+of\s+(?P<total>\d+(?:\.\d+)?)(?P<unit>KiB|MiB|GiB|KB|MB|GB)",
-    re.IGNORECASE,
+
+# headless serverlərdə Tk olmaya bilər — o halda yalnız --headless işləyir
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox
+except ImportError:
+    tk = ttk = filedialog = messagebox = None
+
+from ytdownloader.core import (
+    APP_TITLE,
+    LOG_FILE,
+    append_log,
+    play_sound_notification,
 )
-PCT_APPROX_RE = re.compile(
-    r"(?P<pct>\d{1,3}(?:\.\d+)?)%\s+of\s+~?(?P<total>\d+(?:\.\d+)?)(?P<unit>KiB|MiB|GiB|KB|MB|GB)",
-    re.IGNORECASE,
+from ytdownloader.backends import make_backend
+from ytdownloader.bandwidth import BandwidthScheduler, format_rate, parse_schedule
+from ytdownloader.batch import BatchJob, read_batch_file, split_urls
+from ytdownloader.cache import PlaylistCache
+from ytdownloader.engine import DownloadEngine, FORMATS, MAX_THREADS, format_key, parse_formats
+from ytdownloader.events import ProgressChannel
+from ytdownloader.index import DownloadIndex
+from ytdownloader.journal import Journal, replay
+from ytdownloader.listview import STATUS_LABELS, ListModel, VirtualList
+from ytdownloader.log import get_logger
+from ytdownloader.metrics import Metrics
+from ytdownloader.node import CoordinatorClient, CoordinatorError, WorkerNode
+from ytdownloader.scheduler import POLICY_LABELS
+from ytdownloader.tools import ToolSetup
+
+UI_FRAME_MS = 100  # UI yenilənmə tezliyi (~10 kadr/san)
+FILTER_ALL = "Hamısı"
+STATS_ROWS = (
+    ("queue_wait", "Növbədə gözləmə"),
+    ("spawn", "Başlanğıc"),
+    ("ttfb", "İlk bayt"),
+    ("download", "Yükləmə"),
+    ("post_wait", "Emal növbəsi"),
+    ("post", "Emal"),
+    ("total", "Cəmi"),
+    ("mbps", "Sürət"),
 )
-PCT_ALT_RE = re.compile(r"download\s+(?P<pct>\d{1,3}(?:\.\d+)?)%", re.IGNORECASE)
-
-
-def human_to_mb(value: float, unit: str) -> float:
-    unit = unit.lower()
-    v = float(value)
-    if unit in ("kib", "kb"):
-        return v / 1024.0
-    if unit in ("mib", "mb"):
-        return v
-    if unit in ("gib", "gb"):
-        return v * 1024.0
-    return v
-
-
-def play_sound_notification():
-    try:
-        if winsound:
-            winsound.MessageBeep(winsound.MB_ICONINFORMATION)
-        else:
-            print("\a")
-    except Exception:
-        pass
-
-
-def append_log(text: str):
-    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[{ts}] {text}\n")
-    except Exception:
-        pass
-
-
-def yt_dlp_yoxla_ve_endir():
-    system = platform.system().lower()
-    exe_name = "yt-dlp.exe" if system == "windows" else "yt-dlp"
-    exe_path = os.path.join(os.getcwd(), exe_name)
-    if os.path.exists(exe_path):
-        return exe_path
-    try:
-        import urllib.request
-
-        if system == "windows":
-            url = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp.exe"
-        else:
-            url = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp"
-        urllib.request.urlretrieve(url, exe_path)
-        if system != "windows":
-            os.chmod(exe_path, 0o755)
-        return exe_path
-    except Exception as e:
-        append_log(f"yt-dlp endirilə bilmədi: {e}")
-        print("yt-dlp endirilə bilmədi:", e)
-        return None
 
 
 # ---------------- Main Class ----------------
 class UltraDownloader:
     def __init__(self):
-        # yt-dlp yoxla / endir
-        self.yt_dlp = yt_dlp_yoxla_ve_endir()
-        if not self.yt_dlp:
-            try:
-                root_tmp = tk.Tk()
-                root_tmp.withdraw()
-                messagebox.showerror(
-                    "yt-dlp yoxlanışı",
-                    "yt-dlp tapılmadı və endirilə bilmədi.\n\nZəhmət olmasa internet bağlantınızı yoxlayın və yt-dlp sənədini proqram qovluğuna qoyun.",
-                )
-                root_tmp.destroy()
-            except Exception:
-                print("yt-dlp tapılmadı və endirilə bilmədi.")
-            return
-
-        # iş üçün struktur
-        self.q = queue.Queue()
-        self.stop_event = threading.Event()
-        self.pause_event = threading.Event()
-        self.pause_event.clear()
-        self.threads = []
-        self.video_rows = {}
-        self.video_info = {}
-        self.lock = threading.Lock()
-        self.total_videos = 0
-
-        # GUI
+        self.yt_dlp = None
+        self.engine = None
+        self.node = None
+        self.metrics = None
+        self.stats_win = None
+        self.model = ListModel()
+        self.channel = ProgressChannel()
+
+        # GUI — pəncərə alətləri gözləmədən açılır; Start mühərrik hazır olanda aktivləşir
         self.root = tk.Tk()
         self.root.title(APP_TITLE)
         self.root.geometry("880x720")
@@ -132,12 +72,64 @@ class UltraDownloader:
 
         self.setup_style()
         self.build_gui()
+        self.btn_start.config(state="disabled")
+        self.status_var.set("Alətlər yoxlanılır...")
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
-        self.root.after(250, self.update_ui)
+        self.root.after(UI_FRAME_MS, self.update_ui)
+        # yt-dlp/ffmpeg axtarışı (keşlə) və çatışmayanların quraşdırılması fonda
+        ToolSetup(
+            lambda tools: self.call_soon(self.tools_ready, tools),
+            on_status=lambda text: self.call_soon(self.status_var.set, text),
+        ).start()
         append_log("Program başladıldı.")
         self.root.mainloop()
 
+    def call_soon(self, fn, *args):
+        # fon thread-lərindən Tk thread-inə; pəncərə artıq bağlanıbsa atılır
+        try:
+            self.root.after(0, fn, *args)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def tools_ready(self, tools):
+        ytdlp = tools.get("yt-dlp")
+        if ytdlp is None:
+            self.status_var.set("yt-dlp tapılmadı")
+            messagebox.showerror(
+                "yt-dlp yoxlanışı",
+                "yt-dlp tapılmadı və endirilə bilmədi.\n\nZəhmət olmasa internet bağlantınızı yoxlayın və yt-dlp sənədini proqram qovluğuna qoyun.",
+            )
+            return
+        self.yt_dlp = ytdlp["path"]
+
+        # iş mühərriki — GUI yalnız onun hadisələrinə qulaq asır
+        try:
+            index = DownloadIndex()
+        except Exception as e:
+            append_log(f"İndeks açılmadı, hər şey yenidən yüklənəcək: {e}")
+            index = None
+        try:
+            cache = PlaylistCache()
+        except Exception as e:
+            append_log(f"Playlist keşi açılmadı: {e}")
+            cache = None
+        self.engine = DownloadEngine(
+            self.yt_dlp, backend=make_backend("auto", self.yt_dlp), index=index, cache=cache
+        )
+        self.engine.subscribe(self.channel)
+        self.journal = Journal()
+        self.engine.subscribe(self.journal)
+        self.metrics = Metrics(self.engine)
+        self.engine.subscribe(self.metrics)
+        self.apply_order()
+
+        versions = ", ".join(f"{name} {t['version']}" for name, t in tools.items() if t and t.get("version"))
+        append_log(f"Alətlər hazırdır ({versions}). Backend: {self.engine.backend.name}")
+        self.status_var.set("Hazır")
+        self.btn_start.config(state="normal")
+        self.offer_resume()
+
     def setup_style(self):
         self.style = ttk.Style()
         try:
@@ -168,12 +160,31 @@ class UltraDownloader:
         except Exception:
             pass
 
+    def prepare_batch(self, urls, start_threads=None):
+        self.status_var.set(f"{len(urls)} link oxunur...")
+        job = BatchJob(self.engine, urls)
+        try:
+            total = job.run(start_threads=start_threads)
+        except subprocess.CalledProcessError as e:
+            self.show_error("yt-dlp Xətası", f"Linklərin heç biri oxunmadı!\n\nKomanda çıxışı:\n{e.output}")
+            self.status_var.set("Xəta")
+            self.root.after(0, self.reset_buttons)
+            return
+        if total == 0:
+            self.show_error("Xəta", "Heç bir video tapılmadı. Zəhmət olmasa linkləri yoxla.")
+            self.root.after(0, self.reset_buttons)
+            return
+        text = f"{total} unikal video sıraya alındı ({job.stats['entries']} entry)."
+        if job.errors:
+            text += f" {len(job.errors)} link oxunmadı."
+        self.status_var.set(text)
+
     # ---------------- GUI ----------------
     def build_gui(self):
         frm_top = ttk.Frame(self.root)
         frm_top.pack(fill="x", padx=10, pady=8)
 
-        ttk.Label(frm_top, text="🔗 Playlist və ya Video link:").pack(anchor="w")
+        ttk.Label(frm_top, text="🔗 Playlist və ya Video link (bir neçəsi — boşluqla):").pack(anchor="w")
 
         # link + paste
         link_row = ttk.Frame(frm_top)
@@ -186,23 +197,54 @@ class UltraDownloader:
         # store paste button to be able to enable/disable later
         self.btn_paste = ttk.Button(link_row, text="📋 Paste", command=self.paste_clipboard)
         self.btn_paste.pack(side="left", padx=2)
+        # toplu iş: fayldakı linklər sahəyə yazılır
+        ttk.Button(link_row, text="📄 Fayldan", command=self.load_links).pack(side="left", padx=2)
 
         # options row
         opts = ttk.Frame(frm_top)
         opts.pack(fill="x", pady=6)
 
-        # format
+        # format — bir neçəsi seçilə bilər: video bir dəfə endirilir, formatlar ffmpeg ilə çıxarılır
         fmt_frame = ttk.LabelFrame(opts, text="Format")
         fmt_frame.pack(side="left", padx=6)
-        self.format_var = tk.StringVar(value="mp4")
-        for f in ("mp4", "mp3", "wav"):
-            ttk.Radiobutton(fmt_frame, text=f.upper(), variable=self.format_var, value=f).pack(side="left", padx=6)
+        self.format_vars = {f: tk.BooleanVar(value=f == "mp4") for f in FORMATS}
+        for f in FORMATS:
+            ttk.Checkbutton(fmt_frame, text=f.upper(), variable=self.format_vars[f]).pack(side="left", padx=6)
 
         # threads
-        thr_frame = ttk.LabelFrame(opts, text="Parallel (1..50)")
+        thr_frame = ttk.LabelFrame(opts, text=f"Parallel (1..{MAX_THREADS})")
         thr_frame.pack(side="left", padx=6)
         self.threads_var = tk.IntVar(value=8)
-        ttk.Entry(thr_frame, textvariable=self.threads_var, width=6, justify="center").pack(padx=6, pady=4)
+        ttk.Entry(thr_frame, textvariable=self.threads_var, width=6, justify="center").pack(side="left", padx=6, pady=4)
+        # avto: sayı mühərrik özü tənzimləyir, yazılan dəyər yuxarı hədd olur
+        self.auto_threads_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(thr_frame, text="Avto", variable=self.auto_threads_var).pack(side="left", padx=(0, 6))
+
+        # ümumi sürət limiti: "5M" və ya "09:00-18:00=2M,*=10M"; boş — limitsiz
+        lim_frame = ttk.LabelFrame(opts, text="Sürət limiti")
+        lim_frame.pack(side="left", padx=6)
+        self.limit_var = tk.StringVar(value="")
+        ttk.Entry(lim_frame, textvariable=self.limit_var, width=12, justify="center").pack(padx=6, pady=4)
+
+        # növbə sırası: işləyərkən dəyişdirilə bilər
+        order_frame = ttk.LabelFrame(opts, text="Növbə")
+        order_frame.pack(side="left", padx=6)
+        self.order_var = tk.StringVar(value=POLICY_LABELS["playlist"])
+        order_cb = ttk.Combobox(
+            order_frame, textvariable=self.order_var, values=tuple(POLICY_LABELS.values()), state="readonly", width=15
+        )
+        order_cb.pack(padx=6, pady=4)
+        order_cb.bind("<<ComboboxSelected>>", self.apply_order)
+
+        # koordinator: boşdursa iş yerli; doludursa GUI node kimi videoları koordinatordan götürür
+        coord_frame = ttk.LabelFrame(opts, text="Koordinator")
+        coord_frame.pack(side="left", padx=6)
+        self.coordinator_var = tk.StringVar(value="")
+        ttk.Entry(coord_frame, textvariable=self.coordinator_var, width=22).pack(padx=6, pady=4)
+
+        # yalnız son sinxrondan bəri yeni videolar
+        self.only_new_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(opts, text="Yalnız yenilər", variable=self.only_new_var).pack(side="left", padx=6)
 
         # output folder
         out_frame = ttk.Frame(opts)
@@ -213,6 +255,13 @@ class UltraDownloader:
         ofrow.pack()
         ttk.Entry(ofrow, textvariable=self.output_var, width=40).pack(side="left", padx=(0, 6))
         ttk.Button(ofrow, text="Seç", command=self.choose_output).pack(side="left")
+        # boşdursa fayllar birbaşa əlavə qovluğa yazılır; doludursa orada hazırlanıb köçürülür
+        ttk.Label(out_frame, text="Müvəqqəti qovluq (boş — yoxdur):").pack(anchor="w")
+        self.scratch_var = tk.StringVar(value="")
+        scrow = ttk.Frame(out_frame)
+        scrow.pack()
+        ttk.Entry(scrow, textvariable=self.scratch_var, width=40).pack(side="left", padx=(0, 6))
+        ttk.Button(scrow, text="Seç", command=self.choose_scratch).pack(side="left")
 
         # control buttons
         ctrl_frame = ttk.Frame(self.root)
@@ -227,25 +276,35 @@ class UltraDownloader:
         self.btn_stop = ttk.Button(ctrl_frame, text="⛔ Stop All", command=self.stop_all, state="disabled")
         self.btn_stop.pack(side="left", padx=6)
 
+        # seçilmiş videonu növbədə önə/sona keçir
+        ttk.Button(ctrl_frame, text="⏫ Önə", command=lambda: self.move_selected(True)).pack(side="left", padx=(18, 2))
+        ttk.Button(ctrl_frame, text="⏬ Sona", command=lambda: self.move_selected(False)).pack(side="left", padx=2)
+
         ttk.Button(ctrl_frame, text="🗒 Open Log", command=self.open_log).pack(side="right", padx=6)
+        ttk.Button(ctrl_frame, text="📊 Statistika", command=self.open_stats).pack(side="right", padx=6)
+
+        # status filtri
+        self.filter_var = tk.StringVar(value=FILTER_ALL)
+        cb = ttk.Combobox(
+            ctrl_frame,
+            textvariable=self.filter_var,
+            values=(FILTER_ALL,) + tuple(STATUS_LABELS.values()),
+            state="readonly",
+            width=12,
+        )
+        cb.pack(side="right", padx=6)
+        cb.bind("<<ComboboxSelected>>", self.apply_filter)
         ttk.Checkbutton(
             ctrl_frame, text="Dark Mode", variable=self.theme, onvalue="dark", offvalue="light", command=self.apply_theme
         ).pack(side="right", padx=6)
 
-        # treeview for videos
+        # video siyahısı — yalnız görünən sətirlər Treeview-da yaradılır
         tree_frame = ttk.Frame(self.root)
         tree_frame.pack(fill="both", padx=10, pady=6, expand=True)
 
-        columns = ("title", "status", "percent", "mb")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", selectmode="browse")
-        for c, w in zip(columns, (420, 140, 80, 120)):
-            self.tree.heading(c, text=c.title())
-            self.tree.column(c, width=w, anchor="center")
-        self.tree.pack(side="left", fill="both", expand=True)
-
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        vsb.pack(side="right", fill="y")
-        self.tree.configure(yscrollcommand=vsb.set)
+        columns = ("title", "status", "percent", "mb", "speed", "eta")
+        self.listview = VirtualList(tree_frame, self.model, columns, (360, 120, 70, 90, 90, 70))
+        self.tree = self.listview.tree
 
         bottom = ttk.Frame(self.root)
         bottom.pack(fill="x", padx=10, pady=8)
@@ -257,6 +316,9 @@ class UltraDownloader:
         self.status_var = tk.StringVar(value="Hazır")
         ttk.Label(bottom, textvariable=self.status_var).pack(side="left", padx=8)
 
+        self.concurrency_var = tk.StringVar(value="")
+        ttk.Label(bottom, textvariable=self.concurrency_var).pack(side="right", padx=8)
+
         self.apply_theme()
 
     def paste_clipboard(self):
@@ -265,13 +327,31 @@ class UltraDownloader:
         except Exception:
             messagebox.showwarning("Clipboard", "Clipboard-dan məlumat alınmadı.")
 
+    def load_links(self):
+        path = filedialog.askopenfilename(filetypes=[("Linklər", "*.txt"), ("Hamısı", "*.*")])
+        if not path:
+            return
+        try:
+            urls = read_batch_file(path)
+        except OSError as e:
+            messagebox.showerror("Fayl", f"Fayl oxunmadı:\n{e}")
+            return
+        self.link_var.set(" ".join(urls))
+
     def choose_output(self):
         d = filedialog.askdirectory(initialdir=self.output_var.get())
         if d:
             self.output_var.set(d)
 
+    def choose_scratch(self):
+        d = filedialog.askdirectory(initialdir=self.scratch_var.get() or self.output_var.get())
+        if d:
+            self.scratch_var.set(d)
+
     def open_log(self):
         try:
+            # növbədəki yazılar fayla düşsün
+            get_logger().flush(1.0)
             if os.path.exists(LOG_FILE):
                 if platform.system().lower() == "windows":
                     os.startfile(LOG_FILE)
@@ -282,298 +362,313 @@ class UltraDownloader:
         except Exception as e:
             messagebox.showerror("Xəta", f"Log açılmadı:\n{e}")
 
-    # ---------------- Playlist hazırlığı ----------------
-    def prepare_playlist_thread(self):
-        threading.Thread(target=self.prepare_playlist, daemon=True).start()
-
-    def prepare_playlist(self):
-        url = self.link_var.get().strip()
-        if not url:
+    def open_stats(self):
+        if self.metrics is None:
+            return
+        if self.stats_win is not None and self.stats_win.winfo_exists():
+            self.stats_win.lift()
             return
-        self.clear_tree()
+        win = self.stats_win = tk.Toplevel(self.root)
+        win.title("Statistika")
+        win.geometry("560x300")
+        columns = ("phase", "count", "mean", "p50", "p95", "max")
+        tree = ttk.Treeview(win, columns=columns, show="headings", height=len(STATS_ROWS))
+        for col, text, width in zip(columns, ("Mərhələ", "Say", "Orta", "p50", "p95", "Maks"), (150, 60, 80, 80, 80, 80)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w" if col == "phase" else "e")
+        tree.pack(fill="both", expand=True, padx=8, pady=8)
+        for key, label in STATS_ROWS:
+            tree.insert("", "end", iid=key, values=(label,))
+        totals_var = tk.StringVar()
+        ttk.Label(win, textvariable=totals_var).pack(anchor="w", padx=8, pady=(0, 8))
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            stats = self.metrics.phase_stats()
+            for key, label in STATS_ROWS:
+                st = stats.get(key) or {}
+                if not st.get("count"):
+                    tree.item(key, values=(label, 0))
+                    continue
+                fmt = "{:.2f} MB/s" if key == "mbps" else "{:.2f} s"
+                values = [fmt.format(st[k]) for k in ("mean", "p50", "p95", "max")]
+                tree.item(key, values=(label, st["count"], *values))
+            m = self.metrics
+            totals_var.set(
+                f"Bitdi: {m.results['done']}, xəta: {m.results['error']}, təkrar: {m.retries}, "
+                f"cəmi {m.bytes / 1024 / 1024:.1f} MB"
+            )
+            win.after(1000, refresh)
+
+        refresh()
+
+    # ---------------- Playlist hazırlığı ----------------
+    def prepare_playlist_thread(self, start_threads=None):
+        urls = split_urls(self.link_var.get())
+        if not urls:
+            return False
+        if len(urls) > 1:
+            threading.Thread(target=self.prepare_batch, args=(urls, start_threads), daemon=True).start()
+            return True
+        threading.Thread(target=self.prepare_playlist, args=(urls[0], start_threads), daemon=True).start()
+        return True
+
+    def show_error(self, title, text):
+        # messagebox yalnız Tk thread-indən çağırılmalıdır
+        self.root.after(0, lambda: messagebox.showerror(title, text))
+
+    def prepare_playlist(self, url, start_threads=None):
         self.status_var.set("Playlist oxunur...")
         try:
-            out = subprocess.check_output([self.yt_dlp, "-J", "--flat-playlist", url], text=True, stderr=subprocess.STDOUT)
-            info = json.loads(out)
-            entries = info.get("entries") if isinstance(info, dict) else None
-
-            if not entries:
-                self.total_videos = 1
-                self.tree.insert("", "end", iid="v1", values=("Tək video", "Hazır", "0%", "0.0"))
-                self.video_rows[1] = "v1"
-                self.video_info[1] = {"url": url, "title": info.get("title", "Video"), "status": "queued", "percent": 0.0, "mb": 0.0}
-                self.q.put((1, url))
-            else:
-                self.total_videos = len(entries)
-                for i, e in enumerate(entries, 1):
-                    vid = e.get("id")
-                    vurl = f"https://www.youtube.com/watch?v={vid}"
-                    title = e.get("title", f"Video {i}")
-                    iid = f"v{i}"
-                    self.tree.insert("", "end", iid=iid, values=(f"#{i} - {title}", "Gözləyir", "0%", "0.0"))
-                    self.video_rows[i] = iid
-                    self.video_info[i] = {"url": vurl, "title": title, "status": "queued", "percent": 0.0, "mb": 0.0}
-                    self.q.put((i, vurl))
-
-            self.status_var.set(f"{self.total_videos} video sıraya alındı.")
-            append_log(f"{self.total_videos} video aşkarlandı.")
+            total = self.engine.prepare_playlist(url, start_threads=start_threads)
+            if total == 0:
+                if self.engine.only_new:
+                    self.root.after(0, lambda: messagebox.showinfo("Sinxron", "Yeni video yoxdur."))
+                else:
+                    self.show_error("Xəta", "Heç bir video tapılmadı. Zəhmət olmasa linki yoxla.")
+                self.root.after(0, self.reset_buttons)
+                return
+            self.status_var.set(f"{total} video sıraya alındı.")
         except subprocess.CalledProcessError as e:
             try:
                 out = e.output if hasattr(e, "output") else str(e)
             except Exception:
                 out = str(e)
-            messagebox.showerror("yt-dlp Xətası", f"yt-dlp playlisti oxuya bilmədi!\n\nKomanda çıxışı:\n{out}")
+            self.show_error("yt-dlp Xətası", f"yt-dlp playlisti oxuya bilmədi!\n\nKomanda çıxışı:\n{out}")
             append_log(f"yt-dlp xətası: {out}")
             self.status_var.set("Xəta")
-        except json.JSONDecodeError as e:
-            messagebox.showerror("Xəta", f"yt-dlp-dən gələn nəticə pars edilə bilmədi:\n{e}")
-            append_log(f"JSON parse xətası: {e}")
-            self.status_var.set("Xəta")
+            self.root.after(0, self.reset_buttons)
         except Exception as e:
-            messagebox.showerror("Xəta", f"Playlist oxunmadı:\n{e}")
+            self.show_error("Xəta", f"Playlist oxunmadı:\n{e}")
             append_log(f"Playlist hazırlama xətası: {e}")
             self.status_var.set("Xəta")
+            self.root.after(0, self.reset_buttons)
+
+    def offer_resume(self):
+        try:
+            state = replay()
+        except Exception as e:
+            append_log(f"Jurnal oxunmadı: {e}")
+            return
+        if state is None or not state.resumable():
+            return
+        if not messagebox.askyesno(
+            "Yarımçıq iş",
+            f"Əvvəlki işdən {state.pending()} video yüklənməyib ({len(state.items)} videodan).\n\n"
+            f"{state.url}\n\nDavam etdirilsin?",
+        ):
+            return
+        self.link_var.set(state.url or "")
+        try:
+            chosen = parse_formats(state.fmt)
+        except ValueError:
+            chosen = ()
+        if chosen:
+            for f, var in self.format_vars.items():
+                var.set(f in chosen)
+        if state.output_dir:
+            self.output_var.set(state.output_dir)
+        if not self.apply_limit():
+            return
+        try:
+            max_threads = max(1, min(MAX_THREADS, int(self.threads_var.get())))
+        except Exception:
+            max_threads = 4
+        threading.Thread(target=self.engine.resume_job, args=(state, max_threads), daemon=True).start()
+        self.btn_start.config(state="disabled")
+        self.btn_pause.config(state="normal", text="⏸ Pause")
+        self.btn_stop.config(state="normal")
 
     # ---------------- Yükləmə ----------------
     def start_all(self):
-        # əgər siyahı hələ yoxdursa — sinxron şəkildə hazırlayırıq
-        if self.total_videos == 0:
-            self.prepare_playlist()
-            if self.total_videos == 0:
+        try:
+            max_threads = max(1, min(MAX_THREADS, int(self.threads_var.get())))
+        except Exception:
+            max_threads = 4
+
+        formats = [f for f, var in self.format_vars.items() if var.get()]
+        if not formats:
+            messagebox.showerror("Format", "Ən azı bir format seçin.")
+            return
+        if len(formats) > 1 and self.engine.post is None:
+            messagebox.showerror("Format", "Bir neçə format üçün ffmpeg lazımdır.")
+            return
+        self.engine.fmt = format_key(formats)
+        self.engine.output_dir = self.output_var.get()
+        self.engine.set_scratch(self.scratch_var.get().strip() or None)
+        self.engine.only_new = bool(self.only_new_var.get()) and self.engine.index is not None
+        self.engine.auto_tune = bool(self.auto_threads_var.get())
+        if not self.apply_limit():
+            return
+
+        coordinator = self.coordinator_var.get().strip()
+        if coordinator:
+            threading.Thread(
+                target=self.run_node, args=(coordinator, split_urls(self.link_var.get()), max_threads), daemon=True
+            ).start()
+        # əgər siyahı hələ yoxdursa — fonda axınla oxuyuruq, worker-lər 1-ci videodan başlayır
+        elif self.engine.total_videos == 0:
+            if not self.prepare_playlist_thread(start_threads=max_threads):
                 messagebox.showerror("Xəta", "Heç bir video tapılmadı. Zəhmət olmasa linki yoxla.")
                 return
-
-        if self.q.empty():
+        elif self.engine.q.empty():
             messagebox.showwarning("Xəbərdarlıq", "Yükləmək üçün video yoxdur.")
             return
-
-        try:
-            max_threads = max(1, min(50, int(self.threads_var.get())))
-        except Exception:
-            max_threads = 4
-        self.max_threads = max_threads
+        else:
+            self.engine.start(max_threads)
 
         self.btn_start.config(state="disabled")
-        self.btn_pause.config(state="normal")
+        self.btn_pause.config(state="normal", text="⏸ Pause")
         self.btn_stop.config(state="normal")
-        self.pause_event.clear()
 
-        append_log(f"Yükləmələr başladı. Paralel: {self.max_threads}, format: {self.format_var.get()}")
-        for _ in range(self.max_threads):
-            t = threading.Thread(target=self.worker_loop, daemon=True)
-            t.start()
-            self.threads.append(t)
+    def run_node(self, coordinator, urls, max_threads):
+        """Koordinatorun node-u kimi: linklər verilibsə əvvəlcə hər biri iş kimi göndərilir."""
+        client = CoordinatorClient(coordinator)
+        self.status_var.set("Koordinatora qoşulur...")
+        try:
+            for url in urls:
+                client.submit(url, self.engine.fmt)
+        except CoordinatorError as e:
+            self.show_error("Koordinator", f"Koordinatora qoşulmaq olmadı:\n{e}")
+            self.call_soon(self.reset_buttons)
+            return
+        self.node = WorkerNode(self.engine, client)
+        try:
+            self.node.run(max_threads)
+        except Exception as e:
+            append_log(f"Node xətası: {e}", "error")
+            self.show_error("Koordinator", f"Node dayandı:\n{e}")
+        finally:
+            self.node = None
+            self.call_soon(self.reset_buttons)
 
-    def stop_all(self):
-        self.stop_event.set()
-        # təmizləyirik queue-ni
-        with self.q.mutex:
-            self.q.queue.clear()
-        self.status_var.set("Dayandırıldı")
-        self.btn_pause.config(state="disabled")
+    def apply_limit(self):
+        text = self.limit_var.get().strip()
+        try:
+            schedule = parse_schedule(text) if text else None
+        except ValueError as e:
+            messagebox.showerror("Sürət limiti", str(e))
+            return False
+        limited = schedule is not None and (schedule.default is not None or schedule.windows)
+        self.engine.bandwidth = BandwidthScheduler(schedule) if limited else None
+        return True
+
+    def apply_order(self, event=None):
+        if self.engine is None:
+            return
+        label = self.order_var.get()
+        policy = next((p for p, lbl in POLICY_LABELS.items() if lbl == label), "playlist")
+        self.engine.set_order(policy)
+
+    def move_selected(self, top):
+        idx = self.listview.selected
+        if idx is None or self.engine is None:
+            return
+        moved = self.engine.pin(idx) if top else self.engine.set_priority(idx, -1)
+        if not moved:
+            self.status_var.set("Seçilmiş video növbədə deyil")
+
+    def reset_buttons(self):
+        self.btn_pause.config(state="disabled", text="⏸ Pause")
         self.btn_stop.config(state="disabled")
         self.btn_start.config(state="normal")
-        append_log("Bütün yükləmələr dayandırıldı.")
+
+    def stop_all(self):
+        if self.node is not None:
+            # icarədəki videolar koordinatora qaytarılır
+            self.node.stop()
+        self.engine.stop()
+        self.status_var.set("Dayandırıldı")
+        self.reset_buttons()
 
     def toggle_pause(self):
-        if not self.pause_event.is_set():
-            self.pause_event.set()
+        if not self.engine.is_paused():
+            self.engine.pause()
             self.btn_pause.config(text="▶ Resume")
             self.status_var.set("Dayandırıldı (pause)")
         else:
-            self.pause_event.clear()
+            self.engine.resume()
             self.btn_pause.config(text="⏸ Pause")
             self.status_var.set("Davam edir")
 
-    def worker_loop(self):
-        while not self.stop_event.is_set():
-            try:
-                idx, url = self.q.get(timeout=1)
-            except queue.Empty:
-                break
-            try:
-                self.run_download(idx, url)
-            except Exception as e:
-                append_log(f"Error download idx {idx}: {e}")
-                with self.lock:
-                    if idx in self.video_info:
-                        self.video_info[idx]["status"] = "error"
-                        self.tree.set(self.video_rows.get(idx, ""), "status", "Xəta")
-            finally:
-                self.q.task_done()
-        append_log("Worker thread çıxır.")
-
-    def run_download(self, idx, video_url):
-        # pause halında gözləyirik
-        while self.pause_event.is_set():
-            time.sleep(0.2)
-
-        fmt = self.format_var.get()
-
-        # əgər playlistdən gəlirsə, fayl adının əvvəlində sıra nömrəsi olsun
-        if idx and self.total_videos > 1:
-            output_template = os.path.join(self.output_var.get(), f"#{idx:02d} - %(title)s.%(ext)s")
-        else:
-            output_template = os.path.join(self.output_var.get(), "%(title)s.%(ext)s")
-
-        if fmt == "mp4":
-    args = [
-        "-f",
-        "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4",
-        "--merge-output-format",
-        "mp4",
-        "--audio-format",
-        "mp3",
-        "--embed-metadata",
-        "--embed-thumbnail",
-        "--prefer-ffmpeg",
-        "--compat-options",
-        "no-keep-subs",
-    ]
-        else:
-            args = ["-f", "bestaudio/best", "--extract-audio", "--audio-format", fmt]
-
-        cmd = [self.yt_dlp, *args, "-o", output_template, "--newline", video_url]
+    # ---------------- UI yenilənməsi ----------------
+    def apply_filter(self, event=None):
+        label = self.filter_var.get()
+        status = next((s for s, lbl in STATUS_LABELS.items() if lbl == label), None)
+        self.listview.set_filter(status)
 
-        with self.lock:
-            if idx in self.video_info:
-                self.video_info[idx]["status"] = "downloading"
-            self.tree.set(self.video_rows.get(idx, ""), "status", "Yüklənir")
-            self.tree.set(self.video_rows.get(idx, ""), "percent", "0%")
-            self.tree.set(self.video_rows.get(idx, ""), "mb", "0.0")
-        append_log(f"Başladı idx={idx} url={video_url}")
+    def apply_frame(self, frame):
+        self.model.apply(frame)
+        if frame.finished_ok:
+            play_sound_notification()
 
-        proc = None
-        try:
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1)
-            if not proc.stdout:
-                raise RuntimeError("yt-dlp stdout açılmadı")
-
-            for line in proc.stdout:
-                # pause halında loopu saxla
-                while self.pause_event.is_set():
-                    time.sleep(0.2)
-
-                m = PCT_RE.search(line) or PCT_APPROX_RE.search(line) or PCT_ALT_RE.search(line)
-                if m:
-                    try:
-                        pct = float(m.group("pct"))
-                    except Exception:
-                        pct = 0.0
-
-                    downloaded_mb = None
-                    try:
-                        if m.re is PCT_ALT_RE:
-                            downloaded_mb = None
-                        else:
-                            total_mb = human_to_mb(float(m.group("total")), m.group("unit"))
-                            downloaded_mb = total_mb * (pct / 100.0)
-                    except Exception:
-                        downloaded_mb = None
-
-                    with self.lock:
-                        if idx in self.video_info:
-                            self.video_info[idx]["percent"] = pct
-                            if downloaded_mb is not None:
-                                self.video_info[idx]["mb"] = downloaded_mb
-                                self.tree.set(self.video_rows.get(idx, ""), "mb", f"{downloaded_mb:.2f}")
-                        self.tree.set(self.video_rows.get(idx, ""), "percent", f"{pct:.1f}%")
-
-            return_code = proc.wait()
-            with self.lock:
-                if return_code == 0:
-                    if idx in self.video_info:
-                        self.video_info[idx]["status"] = "done"
-                    self.tree.set(self.video_rows.get(idx, ""), "status", "✅ Bitdi")
-                    self.tree.set(self.video_rows.get(idx, ""), "percent", "100%")
-                else:
-                    if idx in self.video_info:
-                        self.video_info[idx]["status"] = "error"
-                    self.tree.set(self.video_rows.get(idx, ""), "status", "Xəta")
-            append_log(f"Bitdi idx={idx} url={video_url} rc={return_code}")
-            if return_code == 0:
-                play_sound_notification()
-        except Exception as e:
-            try:
-                if proc:
-                    proc.kill()
-            except Exception:
-                pass
-            with self.lock:
-                if idx in self.video_info:
-                    self.video_info[idx]["status"] = "error"
-                self.tree.set(self.video_rows.get(idx, ""), "status", "Xəta")
-            append_log(f"Exception download idx={idx}: {e}")
-        finally:
-            try:
-                if proc and proc.stdout:
-                    proc.stdout.close()
-            except Exception:
-                pass
-
-    # ---------------- UI yenilənməsi ----------------
     def update_ui(self):
+        if self.engine is None:
+            # alətlər hələ hazırlanır — status sətri ToolSetup-a məxsusdur
+            self.root.after(UI_FRAME_MS, self.update_ui)
+            return
         try:
-            done_count = sum(1 for v in self.video_info.values() if v.get("status") == "done")
-            self.total_progress["maximum"] = max(1, self.total_videos)
+            frame = self.channel.drain()
+            if frame:
+                self.apply_frame(frame)
+            self.listview.refresh()
+            done_count = self.engine.counts()["done"]
+            self.total_progress["maximum"] = max(1, self.engine.total_videos)
             self.total_progress["value"] = done_count
-            self.status_var.set(f"{done_count}/{self.total_videos} tamamlandı")
-        except Exception:
-            pass
-        self.root.after(500, self.update_ui)
-
-    def clear_tree(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        self.video_rows.clear()
-        self.video_info.clear()
-        with self.q.mutex:
-            self.q.queue.clear()
-        self.total_videos = 0
-        try:
-            self.total_progress["value"] = 0
-        except Exception:
-            pass
-        append_log("Tree və queue təmizləndi.")
+            self.status_var.set(
+                f"{done_count}/{self.engine.total_videos} tamamlandı — {self.channel.total_mb:.1f} MB"
+            )
+            parts = []
+            tuner = self.engine.tuner
+            if tuner is not None:
+                parts.append(f"Paralel: {self.engine.max_threads} (avto — {tuner.last[1]})")
+            elif self.engine.threads:
+                parts.append(f"Paralel: {self.engine.max_threads}")
+            if self.engine.bandwidth is not None:
+                parts.append(f"Limit: {format_rate(self.engine.bandwidth.rate())}")
+            node = self.node
+            if node is not None and node.counts:
+                c = node.counts
+                parts.append(f"Koordinator: {c['done']}/{sum(c.values())} bitdi, {c['leased']} icarədə")
+            throttled = self.engine.breaker.remaining()
+            if throttled:
+                parts.append(f"Throttling: {throttled:.0f} san. gözləmə")
+            short = self.engine.disk_short
+            if short is not None:
+                parts.append(f"Diskdə yer çatmır: {short[0]} (boş {short[2] / 2**20:.0f} MB) — gözlənilir")
+            util = self.engine.reporter.last if self.engine.reporter else None
+            if util:
+                text = f"Yükləmə {util['download']:.0%} · Emal {util['post']:.0%}"
+                if util["bottleneck"]:
+                    text += f" (darboğaz: {util['bottleneck']})"
+                parts.append(text)
+            self.concurrency_var.set("   ".join(parts))
+        except Exception as e:
+            append_log(f"UI yenilənmə xətası: {e}")
+        self.root.after(UI_FRAME_MS, self.update_ui)
 
     def on_close(self):
         if messagebox.askokcancel("Exit", "Programdan çıxmaq istəyirsiniz?"):
-            self.stop_event.set()
+            # yt-dlp prosesləri ayrıca qrupdadır — proqramla birlikdə özləri ölmür
+            if self.node is not None:
+                self.node.stop()
+            if self.engine is not None:
+                self.engine.stop()
+                self.engine.backend.close()
+                self.journal.close()
             try:
                 self.root.destroy()
             except Exception:
                 pass
 
 
-def auto_setup():
-    system = platform.system().lower()
-
-    ffmpeg_path = shutil.which("ffmpeg")
-    if not ffmpeg_path:
-        print("[AUTO-SETUP] ffmpeg tapılmadı. Qurulur...")
-        try:
-            if system in ("linux", "darwin"):
-                subprocess.run(["sudo", "apt", "update"], check=False)
-                subprocess.run(["sudo", "apt", "install", "ffmpeg", "-y"], check=False)
-            print("[AUTO-SETUP] ffmpeg quraşdırılmağa cəhd olundu!")
-        except Exception as e:
-            print("[AUTO-SETUP] ffmpeg quraşdırıla bilmədi:", e)
-    else:
-        print("[AUTO-SETUP] ffmpeg artıq var:", ffmpeg_path)
-
-    ytdlp_path = shutil.which("yt-dlp")
-    if not ytdlp_path:
-        print("[AUTO-SETUP] yt-dlp tapılmadı. Qurulur...")
-        try:
-            if system in ("linux", "darwin"):
-                subprocess.run(["sudo", "apt", "install", "yt-dlp", "-y"], check=False)
-            print("[AUTO-SETUP] yt-dlp quraşdırılmağa cəhd olundu!")
-        except Exception as e:
-            print("[AUTO-SETUP] yt-dlp quraşdırıla bilmədi:", e)
-    else:
-        print("[AUTO-SETUP] yt-dlp artıq mövcuddur:", ytdlp_path)
-
-
 if __name__ == "__main__":
-    auto_setup()
-    UltraDownloader() 
\ No newline at end of file
+    if "--headless" in sys.argv[1:]:
+        from ytdownloader.cli import main
+
+        sys.exit(main([a for a in sys.argv[1:] if a != "--headless"]))
+    if tk is None:
+        print("Tkinter tapılmadı. GUI olmadan işlətmək üçün: --headless URL")
+        sys.exit(2)
+    UltraDownloader()
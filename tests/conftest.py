@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Testlər şəbəkəsiz işləyir: mühərrik `benchmarks/fake_ytdlp.py`-ni real yt-dlp
+kimi (ayrıca proses) çağırır, davranışı FAKE_* mühit dəyişənləri verir.
+Hər test öz müvəqqəti qovluğunda işləyir; log da ora yazılır.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.join(ROOT, "benchmarks")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH)
+
+from fake_ytdlp import failing  # noqa: E402,F401
+from run_suite import PLAYLIST_URL, make_launcher  # noqa: E402,F401
+from ytdownloader.backends import SubprocessBackend  # noqa: E402
+from ytdownloader.engine import DownloadEngine  # noqa: E402
+from ytdownloader.log import configure_logging  # noqa: E402
+
+FAKE_DEFAULTS = {"ENTRIES": 5, "SIZE": 20000, "RATE": 0, "TICK": 0.01, "STARTUP": 0, "FAIL": 0}
+
+
+def wait_for(cond, timeout=10.0, step=0.02):
+    """`cond()` True olana qədər gözləyir; vaxt bitsə False."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(step)
+    return bool(cond())
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    configure_logging(path=str(tmp_path / "log.txt"))
+    return tmp_path
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """fake(entries=3, size=...) — saxta yt-dlp-nin parametrləri (FAKE_<AD>)."""
+
+    def set_env(**values):
+        for k, v in dict(FAKE_DEFAULTS, **values).items():
+            monkeypatch.setenv("FAKE_" + k.upper(), str(v))
+
+    set_env()
+    return set_env
+
+
+@pytest.fixture
+def launcher(tmp_path):
+    return make_launcher(str(tmp_path))
+
+
+@pytest.fixture
+def make_engine(launcher, tmp_path):
+    """Konveyersiz, disk yoxlamasız mühərrik; test bitəndə dayandırılır."""
+    engines = []
+
+    def make(**kw):
+        kw.setdefault("output_dir", str(tmp_path / "out"))
+        kw.setdefault("fmt", "mp3")
+        kw.setdefault("backend", SubprocessBackend(launcher))
+        kw.setdefault("pipeline", False)
+        kw.setdefault("min_free", None)
+        engine = DownloadEngine(launcher, **kw)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.stop()
+        engine.wait(10)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""Toplu iş: link faylı, üst-üstə düşən playlistlərdə videonun bir dəfə yüklənməsi və hardlink."""
+
+import os
+
+from ytdownloader.batch import BatchJob, materialize, safe_name, split_urls
+from ytdownloader.index import DownloadIndex
+
+
+def test_split_urls():
+    text = "# şərh\nhttps://a, https://b\n\n  https://c https://a\n"
+    assert split_urls(text) == ["https://a", "https://b", "https://c"]
+
+
+def test_safe_name():
+    assert safe_name('a/b:c*d?"') == "a_b_c_d_"
+    assert safe_name(" . ") == "playlist"
+    assert len(safe_name("x" * 300)) == 100
+
+
+def test_materialize(tmp_path):
+    src = tmp_path / "src.mp3"
+    src.write_bytes(b"x")
+    dest = tmp_path / "dest.mp3"
+    assert materialize(str(src), str(dest)) == "link"
+    assert os.stat(dest).st_ino == os.stat(src).st_ino
+    assert materialize(str(src), str(dest)) is None
+
+
+def links(count, entries, overlap):
+    step = entries - overlap
+    return [f"https://www.youtube.com/playlist?list=L{i + 1}:{i * step}" for i in range(count)]
+
+
+def mp3s(folder):
+    return sorted(n for n in os.listdir(folder) if n.endswith(".mp3"))
+
+
+def run_batch(make_engine, urls, **kw):
+    engine = make_engine(**kw)
+    started = []
+    engine.subscribe(lambda e, idx, d: started.append(idx) if d.get("status") == "downloading" else None)
+    unique = BatchJob(engine, urls).run(start_threads=4)
+    assert engine.wait(30)
+    return engine, unique, started
+
+
+def test_overlapping_playlists_download_once(fake, make_engine, tmp_path):
+    fake(entries=5)
+    engine, unique, started = run_batch(make_engine, links(3, 5, 2))
+    assert unique == 5 + 3 + 3
+    assert len(started) == len(set(started)) == unique
+    assert engine.counts()["done"] == unique
+
+    out = tmp_path / "out"
+    assert sorted(os.listdir(out)) == ["Fake L1", "Fake L2", "Fake L3"]
+    for name in ("Fake L1", "Fake L2", "Fake L3"):
+        files = mp3s(out / name)
+        assert len(files) == 5
+        assert [f[:6] for f in files] == [f"#{i:02d} - " for i in range(1, 6)]
+    # L1-in son iki videosu L2-nin ilk ikisidir: eyni fayl (hardlink)
+    a = os.stat(out / "Fake L1" / mp3s(out / "Fake L1")[3])
+    b = os.stat(out / "Fake L2" / mp3s(out / "Fake L2")[0])
+    assert a.st_ino == b.st_ino
+
+
+def test_index_places_known_videos_without_download(fake, make_engine, tmp_path):
+    fake(entries=4)
+    index = DownloadIndex(str(tmp_path / "index.db"))
+    run_batch(make_engine, links(1, 4, 0), index=index)
+
+    # ikinci playlist birincinin iki videosunu da ehtiva edir
+    engine, unique, started = run_batch(make_engine, links(2, 4, 2), index=index)
+    assert unique == 6
+    assert sorted(engine.video_info[i]["video_id"] for i in started) == ["fake0000005", "fake0000006"]
+    assert len(mp3s(tmp_path / "out" / "Fake L2")) == 4
+    index.close()
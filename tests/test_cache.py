@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Playlist keşi: TTL, siyahı fərqi və yalnız dəyişikliklərin növbəyə düşməsi."""
+
+from conftest import PLAYLIST_URL
+from ytdownloader.cache import PlaylistCache, playlist_key
+from ytdownloader.index import DownloadIndex
+
+
+def test_put_returns_diff(tmp_path):
+    cache = PlaylistCache(str(tmp_path / "cache.db"), ttl=60)
+    assert cache.put(PLAYLIST_URL, [{"id": "a"}, {"id": "b"}]) == ([], [])
+    assert cache.fresh(PLAYLIST_URL + "&index=3") == [{"id": "a"}, {"id": "b"}]
+    assert cache.put(PLAYLIST_URL, [{"id": "b"}, {"id": "c"}]) == (["c"], ["a"])
+    assert playlist_key(PLAYLIST_URL) == "list:PLfake"
+    cache.close()
+
+
+def test_changed_only_queues_added_and_marks_removed(fake, make_engine, tmp_path):
+    cache = PlaylistCache(str(tmp_path / "cache.db"), ttl=3600)
+    index = DownloadIndex(str(tmp_path / "index.db"))
+    fake(entries=4)
+    first = make_engine(cache=cache, index=index)
+    first.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert first.wait(30)
+
+    fake(entries=6)
+    second = make_engine(cache=cache, index=index, changed_only=True)
+    listed = []
+    second.subscribe(lambda e, idx, d: listed.append(d) if e == "listed" else None)
+    assert second.prepare_playlist(PLAYLIST_URL, start_threads=2) == 2  # keş təzə olsa da yenidən oxunur
+    assert second.wait(30)
+    assert sorted(second.video_info) == [5, 6]
+    assert listed == [{"added": ["fake0000005", "fake0000006"], "removed": []}]
+
+    fake(entries=3)
+    third = make_engine(cache=cache, index=index, changed_only=True)
+    assert third.prepare_playlist(PLAYLIST_URL, start_threads=2) == 0
+    assert third.wait(30)
+    assert index.removed(PLAYLIST_URL) == {"fake0000004", "fake0000005", "fake0000006"}
+
+    # geri qayıdan video "silinmiş" qeydindən çıxır
+    fake(entries=4)
+    make_engine(cache=cache, index=index, changed_only=True).prepare_playlist(PLAYLIST_URL)
+    assert index.removed(PLAYLIST_URL) == {"fake0000005", "fake0000006"}
+    index.close()
+    cache.close()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""Koordinator və worker node-lar: API yoxlamaları, itmiş icarələr və öldürülən node."""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import PLAYLIST_URL, ROOT, wait_for
+from ytdownloader.coordinator import TOKEN_HEADER, Coordinator, CoordinatorServer, JobStore
+from ytdownloader.node import WorkerNode
+
+
+@pytest.fixture
+def coordinator(launcher, tmp_path):
+    servers = []
+
+    def start(ttl=60.0, token=None):
+        c = Coordinator(JobStore(str(tmp_path / "coordinator.db")), launcher, ttl=ttl).start()
+        server = CoordinatorServer(c, 0, token=token).start()
+        servers.append((c, server))
+        return c, f"http://127.0.0.1:{server.port}"
+
+    yield start
+    for c, server in servers:
+        server.close()
+        c.close()
+
+
+def post(url, path, body, token=None):
+    req = urllib.request.Request(url + path, data=json.dumps(body).encode("utf-8"), method="POST")
+    if token:
+        req.add_header(TOKEN_HEADER, token)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_jobs_api_validates_input(fake, coordinator):
+    fake(entries=1)
+    c, url = coordinator(token="sirr")
+    assert post(url, "/jobs", {"url": PLAYLIST_URL}, token="sehv")[0] == 403
+    assert post(url, "/jobs", {"fmt": "mp3"}, token="sirr")[0] == 400
+    assert post(url, "/jobs", {"url": PLAYLIST_URL, "fmt": "flac"}, token="sirr")[0] == 400
+    code, body = post(url, "/jobs", {"url": PLAYLIST_URL, "fmt": "mp4,mp3"}, token="sirr")
+    assert code == 200
+    assert c.store.job(body["id"])["fmt"] == "mp4+mp3"
+
+
+class StubClient:
+    """3 video icarəyə verir; ilk heartbeat-də 2 və 3-ün icarəsi itir."""
+
+    def __init__(self):
+        self.jobs = [{"id": 1, "url": PLAYLIST_URL, "fmt": "mp3"}]
+        self.leased = False
+        self.heartbeats = []
+        self.completed = []
+        self.released = []
+
+    def next_job(self, worker):
+        return self.jobs.pop() if self.jobs else None
+
+    def lease(self, worker, job, count, wait=0.0):
+        items = []
+        if not self.leased:
+            self.leased = True
+            items = [
+                {"idx": i, "url": f"https://www.youtube.com/watch?v=fake000000{i}", "title": f"V{i}",
+                 "video_id": f"fake000000{i}", "playlist": 1, "duration": 60, "size": None}
+                for i in (1, 2, 3)
+            ]
+        return {"items": items, "done": not items, "counts": {}, "ttl": 0.3}
+
+    def heartbeat(self, worker, job, items):
+        self.heartbeats.append(list(items))
+        return [i for i in items if i in (2, 3)] if len(self.heartbeats) == 1 else []
+
+    def complete(self, worker, job, idx, status, error=None):
+        self.completed.append((idx, status))
+
+    def release(self, worker, job, items):
+        self.released.append(list(items))
+
+
+def test_lost_leases_leave_held_and_queue(fake, make_engine):
+    fake(size=100000, rate=200000)
+    engine = make_engine()
+    client = StubClient()
+    started = []
+    engine.subscribe(lambda e, idx, d: started.append(idx) if d.get("status") == "downloading" else None)
+    WorkerNode(engine, client, name="n1").run(threads=1)
+
+    assert client.heartbeats[0] == [1, 2, 3]
+    assert all(hb == [1] for hb in client.heartbeats[1:])
+    assert started == [1]
+    assert client.completed == [(1, "done")]
+    assert client.released == []
+
+
+def start_worker(url, name, cwd, launcher):
+    os.makedirs(cwd)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    cmd = [sys.executable, "-m", "ytdownloader", "--worker", url, "-j", "2", "--single-stage", "-q",
+           "--node-name", name, "--yt-dlp", launcher, "--log-file", os.path.join(cwd, "log.txt")]
+    return subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def test_killed_worker_items_done_exactly_once(fake, coordinator, launcher, tmp_path):
+    entries = 12
+    fake(entries=entries, size=200000, rate=400000, tick=0.05)
+    c, url = coordinator(ttl=1.5)
+    job_id = c.submit(PLAYLIST_URL, "mp3")
+    workers = {name: start_worker(url, name, str(tmp_path / name), launcher) for name in ("n1", "n2", "n3")}
+    try:
+        assert wait_for(lambda: c.store.leased_by_worker().get("n1", 0) > 0, timeout=30)
+        workers["n1"].send_signal(signal.SIGKILL)
+        assert wait_for(lambda: c.store.drained(job_id), timeout=60)
+        for name in ("n2", "n3"):
+            assert workers[name].wait(30) == 0
+    finally:
+        for p in workers.values():
+            if p.poll() is None:
+                p.kill()
+                p.wait()
+
+    assert c.store.counts(job_id) == {"queued": 0, "leased": 0, "done": entries, "error": 0}
+    # hər video bir dəfə "bitdi" qəbul olunub
+    assert sum(w["done"] for w in c.workers.values()) == entries
+    requeued = c.store._conn.execute("SELECT COUNT(*) FROM items WHERE leases > 1").fetchone()[0]
+    assert requeued > 0  # öldürülən node-un icarələri başqalarına keçib
+    files = [n for name in ("n2", "n3") for n in os.listdir(tmp_path / name) if n.endswith(".mp3")]
+    done_by_n1 = c.workers.get("n1", {}).get("done", 0)
+    assert len(set(files)) == entries - done_by_n1
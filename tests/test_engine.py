@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""DownloadEngine saxta yt-dlp ilə: hadisə sırası, sayğaclar, dayandırma, pauza və jurnaldan bərpa."""
+
+import time
+
+from conftest import PLAYLIST_URL, failing, wait_for
+from ytdownloader.journal import Journal, replay
+from ytdownloader.retry import RetryPolicy
+
+
+def record(engine):
+    events = []
+    engine.subscribe(lambda event, idx, data: events.append((event, idx, dict(data))))
+    return events
+
+
+def statuses(events, idx):
+    return [d["status"] for e, i, d in events if e == "status" and i == idx]
+
+
+def test_events_in_order(fake, make_engine):
+    fake(entries=4)
+    engine = make_engine()
+    events = record(engine)
+    assert engine.prepare_playlist(PLAYLIST_URL, start_threads=2) == 4
+    assert engine.wait(30)
+
+    names = [e for e, _, _ in events]
+    assert names[:2] == ["cleared", "job"]
+    assert names[-1] == "idle"
+    assert names.count("idle") == 1
+    assert "listed" in names
+    for idx in range(1, 5):
+        mine = [e for e, i, _ in events if i == idx]
+        assert mine.index("queued") < mine.index("finished")
+        assert statuses(events, idx) == ["downloading", "done"]
+        done_at = next(n for n, (e, i, d) in enumerate(events) if i == idx and d.get("status") == "done")
+        finished_at = next(n for n, (e, i, _) in enumerate(events) if i == idx and e == "finished")
+        assert done_at < finished_at
+    assert engine.counts()["done"] == 4
+
+
+def test_done_and_error_counts(fake, make_engine):
+    fake(entries=12, fail=0.4, error="Private video. Sign in if you've been granted access to this video")
+    engine = make_engine(retry=RetryPolicy(retries=0))
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=4)
+    assert engine.wait(30)
+
+    expected = {
+        idx: "error" if failing(info["video_id"], 0.4) else "done" for idx, info in engine.video_info.items()
+    }
+    assert 0 < list(expected.values()).count("error") < 12
+    assert {idx: info["status"] for idx, info in engine.video_info.items()} == expected
+    counts = engine.counts()
+    assert counts["done"] == list(expected.values()).count("done")
+    assert counts["error"] == list(expected.values()).count("error")
+    assert counts["queued"] == counts["downloading"] == 0
+
+
+def test_stop_returns_videos_to_queue(fake, make_engine):
+    fake(entries=4, size=10 ** 6, rate=10 ** 5, tick=0.05)
+    engine = make_engine()
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert wait_for(lambda: engine.counts()["downloading"] == 2)
+
+    t0 = time.monotonic()
+    engine.stop()
+    assert engine.wait(10)
+    assert time.monotonic() - t0 < 5
+    counts = engine.counts()
+    assert counts["done"] == counts["error"] == counts["downloading"] == 0
+    assert counts["queued"] == 4
+
+
+def test_pause_freezes_progress_until_resume(fake, make_engine):
+    fake(entries=2, size=300000, rate=300000, tick=0.02)
+    engine = make_engine()
+    events = record(engine)
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert wait_for(lambda: any(e == "progress" and (d.get("mb") or 0) > 0 for e, _, d in events))
+
+    engine.pause()
+    assert engine.is_paused()
+    time.sleep(0.3)  # SIGSTOP-dan əvvəl yazılmış sətirlər oxunsun
+    seen = sum(1 for e, _, _ in events if e == "progress")
+    time.sleep(0.6)
+    assert sum(1 for e, _, _ in events if e == "progress") == seen
+    assert engine.counts()["done"] == 0
+
+    engine.resume()
+    assert engine.wait(30)
+    assert engine.counts()["done"] == 2
+
+
+def test_resume_from_journal(fake, make_engine, tmp_path):
+    fake(entries=4, size=100000, rate=200000, tick=0.02)
+    path = str(tmp_path / "journal.jsonl")
+    first = make_engine()
+    journal = Journal(path)
+    first.subscribe(journal)
+    first.prepare_playlist(PLAYLIST_URL, start_threads=1)
+    assert wait_for(lambda: first.counts()["done"] >= 1)
+    first.stop()
+    assert first.wait(10)
+    journal.close()
+    done_before = {idx for idx, info in first.video_info.items() if info["status"] == "done"}
+
+    state = replay(path)
+    assert state is not None and state.resumable()
+    assert state.listed
+    assert {idx for idx, it in state.items.items() if it["status"] == "done"} == done_before
+    assert state.pending() == 4 - len(done_before)
+
+    second = make_engine()
+    second.subscribe(Journal(path))
+    events = record(second)
+    assert second.resume_job(state, start_threads=2) == 4
+    assert second.wait(30)
+    downloaded = {i for e, i, d in events if e == "status" and d["status"] == "downloading"}
+    assert downloaded == set(range(1, 5)) - done_before
+    assert second.counts()["done"] == 4
+    assert replay(path).finished
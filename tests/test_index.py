@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""DownloadIndex: qeydlər, xətalar və növbəti işdə artıq yüklənmiş videoların atlanması."""
+
+from conftest import PLAYLIST_URL
+from ytdownloader.index import DownloadIndex
+
+
+def test_record_is_done_and_forget(tmp_path):
+    index = DownloadIndex(str(tmp_path / "index.db"))
+    out = str(tmp_path / "out")
+    path = tmp_path / "a.mp3"
+    path.write_bytes(b"x")
+    index.record("vid1", "mp3", out, str(path))
+    assert index.is_done("vid1", "mp3", out)
+    assert not index.is_done("vid1", "mp4", out)
+    assert not index.is_done("vid1", "mp3", str(tmp_path / "other"))
+    assert index.find("vid1", "mp3") == str(path)
+
+    path.unlink()  # fayl silinib: yenidən yüklənməlidir
+    assert not index.is_done("vid1", "mp3", out)
+    index.forget("vid1", "mp3", out)
+    assert index.done_paths("mp3", out) == {}
+    index.close()
+
+
+def test_failure_cleared_by_success(tmp_path):
+    index = DownloadIndex(str(tmp_path / "index.db"))
+    index.record_failure("vid1", "Private video")
+    assert index.failures() == {"vid1": "Private video"}
+    index.record("vid1", "mp3", str(tmp_path))
+    assert index.failures() == {}
+    index.close()
+
+
+def test_second_run_skips_downloaded(fake, make_engine, tmp_path):
+    fake(entries=3)
+    index = DownloadIndex(str(tmp_path / "index.db"))
+    first = make_engine(index=index)
+    first.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert first.wait(30)
+    assert first.counts()["done"] == 3
+
+    fake(entries=5)
+    second = make_engine(index=index)
+    started, skipped = [], []
+    second.subscribe(lambda e, idx, d: started.append(idx) if d.get("status") == "downloading" else None)
+    second.subscribe(lambda e, idx, d: skipped.append(idx) if d.get("skipped") else None)
+    second.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert second.wait(30)
+    assert sorted(started) == [4, 5]
+    assert sorted(skipped) == [1, 2, 3]
+    assert second.counts()["done"] == 5
+    index.close()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""Jurnal: yazılan hadisələrin `replay()` ilə bərpası və çökmədən sonrakı yarımçıq sətir."""
+
+import json
+
+from ytdownloader.journal import Journal, replay
+
+
+def feed(journal, *events):
+    for event, idx, data in events:
+        journal(event, idx, data)
+
+
+def test_replay_restores_items(tmp_path):
+    path = str(tmp_path / "j.jsonl")
+    journal = Journal(path)
+    feed(
+        journal,
+        ("job", None, {"url": "https://x/list", "fmt": "mp3", "output_dir": "/out"}),
+        ("queued", 1, {"url": "u1", "title": "A", "video_id": "a", "playlist": True, "duration": 60}),
+        ("queued", 2, {"url": "u2", "title": "B", "video_id": "b"}),
+        ("status", 1, {"status": "downloading"}),
+        ("progress", 1, {"mb": 1.5, "filename": "/out/A.mp3"}),
+        ("status", 1, {"status": "done"}),
+        ("status", 2, {"status": "downloading"}),
+    )
+    journal.close()
+
+    state = replay(path)
+    assert (state.url, state.fmt, state.output_dir) == ("https://x/list", "mp3", "/out")
+    assert not state.listed and state.resumable()
+    assert state.items[1]["status"] == "done"
+    assert state.items[1]["filename"] == "/out/A.mp3"
+    assert state.items[1]["duration"] == 60 and state.items[1]["playlist"]
+    assert state.items[2]["status"] == "downloading"
+    assert state.pending() == 1
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "j.jsonl"
+    lines = [
+        {"t": "job", "url": "u", "fmt": "mp4", "out": "/o"},
+        {"t": "q", "i": 1, "u": "u1", "n": "A", "v": "a"},
+        {"t": "listed"},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in lines) + '{"t": "s", "i": 1, "s": "do', encoding="utf-8")
+    state = replay(str(path))
+    assert state.listed
+    assert state.items[1]["status"] == "queued"
+    assert state.resumable()
+
+
+def test_finished_and_batch_jobs_not_resumable(tmp_path):
+    path = str(tmp_path / "j.jsonl")
+    journal = Journal(path)
+    feed(
+        journal,
+        ("job", None, {"url": "u", "fmt": "mp3", "output_dir": "/o"}),
+        ("queued", 1, {"url": "u1", "title": "A"}),
+        ("status", 1, {"status": "done"}),
+        ("listed", None, {}),
+        ("idle", None, {}),
+    )
+    assert replay(path).finished
+    assert not replay(path).resumable()
+
+    journal = Journal(path)
+    feed(
+        journal,
+        ("job", None, {"url": "toplu", "fmt": "mp3", "output_dir": "/o", "batch": ["l1", "l2"]}),
+        ("queued", 1, {"url": "u1", "title": "A"}),
+    )
+    journal.close()
+    state = replay(path)
+    assert state.batch == ["l1", "l2"]
+    assert state.pending() == 1 and not state.resumable()
+
+
+def test_missing_journal(tmp_path):
+    assert replay(str(tmp_path / "yoxdur.jsonl")) is None
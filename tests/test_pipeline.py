@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""PostProcessStage: bir yükləmədən bir neçə format (PostGroup) və ləğv (ffmpeg-siz, `run` əvəzlənir)."""
+
+import threading
+import time
+
+from ytdownloader.pipeline import CANCELLED, PostGroup, PostJob, PostProcessStage, raw_base, raw_template
+
+
+class FakeStage(PostProcessStage):
+    """ffmpeg çağırmır: `results` — format → rc, `gate` set olunana qədər işlər gözləyir."""
+
+    def __init__(self, results=None, **kw):
+        self.done = []
+        self.cleaned = []
+        self.ran = []
+        self.results = results or {}
+        self.gate = threading.Event()
+        self.gate.set()
+        super().__init__("ffmpeg", lambda job, rc: self.done.append((job.idx, rc)), **kw)
+
+    def run(self, job):
+        self.gate.wait(5)
+        self.ran.append(job.fmt)
+        return self.results.get(job.fmt, 0)
+
+    def remove_leftovers(self, job):
+        self.cleaned.append(job.idx)
+
+
+def group_jobs(idx, formats, base="/tmp/v"):
+    group = PostGroup(len(formats))
+    return [PostJob(idx, f"u{idx}", fmt, base, [base + ".f18.mp4"], group) for fmt in formats]
+
+
+def settle(stage, timeout=5):
+    deadline = time.monotonic() + timeout
+    while stage.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stage.pending == 0
+
+
+def test_group_done_once_after_all_formats():
+    stage = FakeStage(workers=3)
+    stage.start()
+    jobs = group_jobs(1, ["mp4", "mp3", "wav"])
+    for job in jobs:
+        assert stage.submit(job)
+    assert settle(stage)
+    assert sorted(stage.ran) == ["mp3", "mp4", "wav"]
+    assert stage.done == [(1, 0)]
+    assert stage.cleaned == [1]  # xam fayllar bir dəfə, sonuncu formatdan sonra
+    assert set(jobs[0].group.outputs) == {"mp4", "mp3", "wav"}
+    stage.close()
+
+
+def test_group_failure_keeps_raw_files():
+    stage = FakeStage(results={"wav": 1}, workers=2)
+    stage.start()
+    for job in group_jobs(1, ["mp3", "wav"]):
+        stage.submit(job)
+    assert settle(stage)
+    assert stage.done == [(1, 1)]
+    assert stage.cleaned == []
+    stage.close()
+
+
+def test_cancel_pending_finishes_queued_groups():
+    stage = FakeStage(workers=1, queue_size=10)
+    stage.gate.clear()
+    stage.start()
+    for job in group_jobs(1, ["mp3", "wav"]) + group_jobs(2, ["mp3", "wav"]):
+        stage.submit(job)
+    time.sleep(0.1)  # 1-ci iş emalda, qalanları növbədə
+    cancelled = stage.cancel_pending()
+    assert len(cancelled) == 3
+    assert stage.done == [(2, CANCELLED)]
+    stage.gate.set()
+    assert settle(stage)
+    # işləyən üzv bitəndə 1-ci qrup da ləğv kimi bitir
+    assert sorted(stage.done) == [(1, CANCELLED), (2, CANCELLED)]
+    assert not stage.submit(group_jobs(3, ["mp3"])[0])
+    assert stage.done[-1] == (3, CANCELLED) and stage.pending == 0
+    stage.close()
+
+
+def test_blocked_submit_released_by_cancel():
+    stage = FakeStage(workers=1, queue_size=1)
+    stage.gate.clear()
+    stage.start()
+    stage.submit(group_jobs(1, ["mp3"])[0])
+    time.sleep(0.05)
+    stage.submit(group_jobs(2, ["mp3"])[0])  # növbəni doldurur
+    result = []
+    t = threading.Thread(target=lambda: result.append(stage.submit(group_jobs(3, ["mp3"])[0])))
+    t.start()
+    time.sleep(0.1)
+    assert t.is_alive()  # backpressure
+    stage.cancel_pending()
+    t.join(2)
+    # növbəyə düşsə də (drain yer açır) emal olunmur
+    assert not t.is_alive() and len(result) == 1
+    stage.gate.set()
+    assert settle(stage)
+    assert sorted(stage.done) == [(1, 0), (2, CANCELLED), (3, CANCELLED)]
+    assert stage.ran == ["mp3"]
+    stage.close()
+
+
+def test_raw_names():
+    assert raw_template("/o/#01 - %(title)s.%(ext)s") == "/o/#01 - %(title)s.f%(format_id)s.%(ext)s"
+    assert raw_base("/o/#01 - Song.f251.webm") == "/o/#01 - Song"
+    assert raw_base("/o/Song.mp3") is None
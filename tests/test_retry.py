@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""Xəta təsnifatı, təkrar cəhdlər, throttling qoruyucusu və avto paralelin xətaları sayması."""
+
+import threading
+
+import pytest
+
+from conftest import PLAYLIST_URL, wait_for
+from ytdownloader.retry import PERMANENT, THROTTLE, TRANSIENT, CircuitBreaker, RetryPolicy, classify
+from ytdownloader.tuner import ConcurrencyTuner
+
+
+@pytest.mark.parametrize(
+    "line, kind",
+    [
+        ("ERROR: [youtube] x: HTTP Error 429: Too Many Requests", THROTTLE),
+        ("ERROR: [youtube] x: Sign in to confirm you're not a bot", THROTTLE),
+        ("ERROR: [youtube] x: Private video. Sign in if you've been granted access", PERMANENT),
+        ("ERROR: [youtube] x: Video unavailable", PERMANENT),
+        ("ERROR: unable to download video data: HTTP Error 403: Forbidden", TRANSIENT),
+        ("ERROR: Read timed out.", TRANSIENT),
+    ],
+)
+def test_classify(line, kind):
+    assert classify(["[download] 10.0% of 5MiB", line]) == kind
+
+
+def test_policy_limits_and_delay():
+    policy = RetryPolicy(retries=2, base=1.0, cap=4.0, throttle_retries=5)
+    assert policy.allowed(TRANSIENT, 2) and not policy.allowed(TRANSIENT, 3)
+    assert policy.allowed(THROTTLE, 5) and not policy.allowed(THROTTLE, 6)
+    assert not policy.allowed(PERMANENT, 1)
+    for attempt, d in ((1, 1.0), (2, 2.0), (3, 4.0), (10, 4.0)):
+        assert d / 2 <= policy.delay(attempt) <= d
+
+
+def test_breaker_open_probe_close():
+    now = [0.0]
+    changes = []
+    breaker = CircuitBreaker(cooldown=10, on_change=lambda active, cd: changes.append(active), clock=lambda: now[0])
+    assert breaker.acquire() is True
+    wait = breaker.trip()
+    assert 9 <= wait <= 11 and breaker.state == "open"
+    assert breaker.trip() is None  # açıq qoruyucu təkrar açılmır
+
+    now[0] = 20.0
+    assert breaker.acquire() == "probe"
+    got = []
+    t = threading.Thread(target=lambda: got.append(breaker.acquire()))
+    t.start()
+    t.join(0.1)
+    assert t.is_alive()  # sınaq bitənə qədər digərləri gözləyir
+    breaker.ok()
+    t.join(1)
+    assert got == [True] and breaker.state == "closed"
+    assert changes == [True, False]
+
+
+def test_breaker_backoff_doubles():
+    now = [0.0]
+    breaker = CircuitBreaker(cooldown=10, max_cooldown=25, clock=lambda: now[0])
+    breaker.trip()
+    now[0] = 100.0
+    assert breaker.acquire() == "probe"
+    assert 18 <= breaker.trip() <= 22
+    now[0] = 200.0
+    breaker.acquire()
+    assert breaker.trip() <= 25 * 1.1
+
+
+def test_transient_failures_retried(fake, make_engine, tmp_path):
+    state = tmp_path / "state"
+    state.mkdir()
+    fake(entries=4, fail=1, fail_times=1, state=state, error="HTTP Error 503: Service Unavailable")
+    engine = make_engine(retry=RetryPolicy(retries=2, base=0.01))
+    retries = []
+    engine.subscribe(lambda e, idx, d: retries.append((idx, d["kind"])) if e == "retry" else None)
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert engine.wait(30)
+    assert sorted(retries) == [(i, TRANSIENT) for i in range(1, 5)]
+    assert engine.counts()["done"] == 4
+
+
+def test_throttle_trips_breaker(fake, make_engine, tmp_path):
+    state = tmp_path / "state"
+    state.mkdir()
+    fake(entries=3, fail=1, fail_times=1, state=state, error="HTTP Error 429: Too Many Requests")
+    engine = make_engine(retry=RetryPolicy(base=0.01), throttle_cooldown=0.2)
+    throttle = []
+    engine.subscribe(lambda e, idx, d: throttle.append(d["active"]) if e == "throttle" else None)
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=3)
+    assert engine.wait(30)
+    assert throttle[0] is True and throttle[-1] is False
+    assert engine.counts()["done"] == 3
+
+
+class StubEngine:
+    """Tuner üçün mühərrikin lazım olan hissəsi."""
+
+    def __init__(self, threads):
+        self.max_threads = threads
+        self.stop_event = threading.Event()
+        self.q = type("Q", (), {"qsize": lambda self: 100})()
+        self.changes = []
+
+    def is_paused(self):
+        return False
+
+    def set_concurrency(self, n):
+        self.changes.append(n)
+        self.max_threads = n
+
+    def emit(self, *args, **kw):
+        pass
+
+
+@pytest.mark.parametrize(
+    "events",
+    [
+        [("retry", 1, {}), ("retry", 2, {})],
+        [("throttle", None, {"active": True})],
+    ],
+)
+def test_tuner_backs_off_on_retries_and_throttle(events, monkeypatch):
+    monkeypatch.setattr("ytdownloader.tuner.cpu_load", lambda: None)
+    engine = StubEngine(8)
+    tuner = ConcurrencyTuner(engine, ceiling=8, start=8, interval=0.05)
+    for event, idx, data in events:
+        tuner(event, idx, data)
+    tuner.start()
+    try:
+        assert wait_for(lambda: engine.changes, timeout=2)
+    finally:
+        tuner.stop()
+    assert engine.changes[0] == 4
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""VideoQueue: siyasətlər, prioritet, ölçü vahidləri və növbədən çıxarma."""
+
+import pytest
+
+from ytdownloader.cache import estimate_size
+from ytdownloader.scheduler import VideoQueue
+
+MB = 1024 * 1024
+
+
+def make_queue(info, policy="playlist"):
+    q = VideoQueue(info.get, policy)
+    for idx in sorted(info):
+        q.put((idx, f"u{idx}"))
+    return q
+
+
+INFO = {
+    1: {"size": 50 * MB},
+    2: {"size": 5 * MB},
+    3: {},  # ölçü və müddət bilinmir
+    4: {"size": 20 * MB},
+}
+
+
+@pytest.mark.parametrize(
+    "policy, order",
+    [("playlist", [1, 2, 3, 4]), ("shortest", [2, 4, 1, 3]), ("largest", [1, 4, 2, 3])],
+)
+def test_policies(policy, order):
+    assert make_queue(INFO, policy).snapshot() == order
+
+
+def test_duration_only_compared_in_bytes():
+    # 10 dəqiqəlik video (müddətdən təxmin) 1 MB-lıq fayldan böyükdür — saniyə baytla qarışmır
+    info = {1: {"duration": 600}, 2: {"size": 1 * MB}}
+    assert estimate_size(600, "mp4") > 1 * MB
+    assert make_queue(info, "shortest").snapshot() == [2, 1]
+    assert make_queue(info, "largest").snapshot() == [1, 2]
+
+
+def test_priority_and_reprioritize():
+    info = {k: dict(v) for k, v in INFO.items()}
+    q = make_queue(info, "shortest")
+    info[3]["priority"] = 1
+    info[2]["priority"] = -1
+    assert q.reprioritize(3) and q.reprioritize(2)
+    assert q.snapshot() == [3, 4, 1, 2]
+    assert [q.get_nowait()[0] for _ in range(4)] == [3, 4, 1, 2]
+    assert not q.reprioritize(3)
+
+
+def test_set_policy_reorders():
+    q = make_queue(INFO)
+    q.set_policy("largest")
+    assert q.snapshot() == [1, 4, 2, 3]
+    with pytest.raises(ValueError):
+        q.set_policy("random")
+
+
+def test_discard():
+    q = make_queue(INFO)
+    assert q.discard(2)
+    assert not q.discard(2)
+    assert q.qsize() == 3
+    assert [q.get_nowait()[0] for _ in range(3)] == [1, 3, 4]
+    for _ in range(3):
+        q.task_done()
+    q.join()  # çıxarılan video bitmiş sayılır
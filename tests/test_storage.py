@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""Disk yeri rezervləri, atomik köçürmə, scratch qovluğu və mühərrikin yer gözləməsi."""
+
+import collections
+import errno
+import os
+import threading
+import time
+
+from conftest import PLAYLIST_URL, wait_for
+from ytdownloader import storage
+from ytdownloader.storage import DiskBudget, Stager, move_atomic
+
+Usage = collections.namedtuple("Usage", "total used free")
+
+
+def budget(free, min_free=10, **kw):
+    return DiskBudget(min_free, usage=lambda path: Usage(free, 0, free), **kw)
+
+
+def test_reserve_and_release(tmp_path):
+    disk = budget(100)
+    path = str(tmp_path)
+    assert disk.reserve("a", {path: 60}) is None
+    short = disk.reserve("b", {path: 40})
+    assert short == (path, 40, 40)  # 100 − 60 rezerv; 10 ehtiyat qalmır
+    assert disk.active() == 1
+    disk.release("a")
+    assert disk.reserve("b", {path: 40}) is None
+    assert sum(disk.reserved().values()) == 40
+
+
+def test_wait_wakes_on_release_and_wake(tmp_path):
+    disk = budget(100, recheck=30)
+    disk.reserve("a", {str(tmp_path): 50})
+    for trigger in (lambda: disk.release("a"), disk.wake):
+        t = threading.Thread(target=disk.wait)
+        t.start()
+        time.sleep(0.05)
+        trigger()
+        t.join(1)
+        assert not t.is_alive()
+
+
+def test_move_atomic_across_volumes(tmp_path, monkeypatch):
+    src = tmp_path / "a" / "v.mp3"
+    src.parent.mkdir()
+    src.write_bytes(b"data")
+    dest = tmp_path / "b"
+    dest.mkdir()
+    real = os.replace
+    calls = []
+
+    def replace(a, b):
+        calls.append(a)
+        if len(calls) == 1:
+            raise OSError(errno.EXDEV, "cross-device")
+        return real(a, b)
+
+    monkeypatch.setattr(storage.os, "replace", replace)
+    assert move_atomic(str(src), str(dest)) == str(dest / "v.mp3")
+    assert (dest / "v.mp3").read_bytes() == b"data"
+    assert not src.exists()
+    assert os.path.basename(calls[1]).startswith(".")  # gizli .tmp fayldan
+    assert os.listdir(dest) == ["v.mp3"]
+
+
+def test_stager_keeps_partial_files(tmp_path):
+    stager = Stager(str(tmp_path / "scratch"))
+    work = stager.workdir("1")
+    for name in ("v.mp3", "v.mp4.part", ".hidden"):
+        with open(os.path.join(work, name), "w") as f:
+            f.write("x")
+    moved = stager.finalize("1", str(tmp_path / "out"))
+    assert list(moved.values()) == [str(tmp_path / "out" / "v.mp3")]
+    assert sorted(os.listdir(work)) == [".hidden", "v.mp4.part"]
+
+
+def test_engine_scratch_moves_to_output(fake, make_engine, tmp_path):
+    fake(entries=3)
+    engine = make_engine(scratch_dir=str(tmp_path / "scratch"))
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=3)
+    assert engine.wait(30)
+    assert engine.counts()["done"] == 3
+    assert len([n for n in os.listdir(tmp_path / "out") if n.endswith(".mp3")]) == 3
+    assert not any(files for _, _, files in os.walk(tmp_path / "scratch"))
+
+
+def test_engine_waits_for_space_and_stops_promptly(fake, make_engine):
+    fake(entries=3)
+    engine = make_engine(min_free=2 ** 62, disk_recheck=30)
+    disk = []
+    engine.subscribe(lambda e, idx, d: disk.append(d) if e == "disk" else None)
+    engine.prepare_playlist(PLAYLIST_URL, start_threads=2)
+    assert wait_for(lambda: disk)
+    assert disk[0]["active"] and disk[0]["needed"] > 0
+    assert engine.counts()["downloading"] == 0
+
+    t0 = time.monotonic()
+    engine.stop()
+    assert engine.wait(5)
+    assert time.monotonic() - t0 < 2  # recheck intervalını gözləmir
+    assert engine.counts()["queued"] == 3
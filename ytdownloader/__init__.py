@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+"""
+YouTube Ultra Downloader — GUI-dən asılı olmayan mühərrik paketi.
+
+GUI `full_youtube_playlist_installer.py` içindədir; headless rejim üçün:
+
+    python -m ytdownloader --help
+"""
+
+from .core import APP_TITLE, LOG_FILE, append_log, human_to_mb, yt_dlp_yoxla_ve_endir
+from .engine import DownloadEngine, FORMATS
+
+__all__ = [
+    "APP_TITLE",
+    "LOG_FILE",
+    "append_log",
+    "human_to_mb",
+    "yt_dlp_yoxla_ve_endir",
+    "DownloadEngine",
+    "FORMATS",
+]
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+
+"""
+Yükləmə backend-ləri.
+
+* SubprocessBackend — hər video üçün ayrıca `yt-dlp` prosesi; irəliləyiş
+  `--progress-template` protokolu ilə (bax `progress.py`), şablonu bilməyən
+  köhnə yt-dlp-də isə `--newline` çıxışı regex ilə oxunur.
+* InProcessBackend — `yt_dlp.YoutubeDL` proses daxilində, "isti" (təkrar
+  istifadə olunan) instansiyalarla və `progress_hooks` ilə işləyir. PyInstaller
+  binary-sinin hər videoda açılıb bütün extractor-ları yenidən import etməsi
+  aradan qalxır. `yt_dlp` modulu quraşdırılmayıbsa istifadə olunmur.
+
+Hər backend eyni interfeysi verir:
+
+    rc = backend.download(url, fmt, output_template, on_progress, wait_if_paused, raw=False, on_message=None)
+
+`on_progress(record)` tipli `progress.Progress` yazısı alır, `wait_if_paused()`
+pauza nöqtəsidir (dayandırılıbsa `procs.Cancelled` atır). `on_message(line)`
+irəliləyiş olmayan çıxış sətirlərini (ERROR/WARNING) alır — xətanın növü
+onlardan təyin olunur (bax `retry.py`). `raw=True` — konveyer rejimi (bax `pipeline.py`): heç bir
+ffmpeg emalı olmadan yalnız xam axınlar `.f<format_id>` faylları kimi endirilir.
+
+yt-dlp prosesləri `procs.ProcessController` ilə ayrıca proses qrupunda başladılır,
+ona görə pauza/dayandırma siqnalları onların ffmpeg uşaqlarına da çatır.
+"""
+
+import importlib.util
+import queue
+import subprocess
+import threading
+
+from .core import append_log
+from .pipeline import raw_template
+from .procs import Cancelled, ProcessController
+from .progress import PROGRESS_TEMPLATE_ARGS, download_record, parse_line, postprocess_record
+
+# `import yt_dlp` bütün extractor-ları yükləyir (~0.2–0.5 san.) — başlanğıcı
+# ləngitməsin deyə yalnız ilk in-process yükləmədə edilir
+HAVE_YT_DLP = importlib.util.find_spec("yt_dlp") is not None
+
+
+def _yt_dlp():
+    import yt_dlp
+
+    return yt_dlp
+
+
+BACKENDS = ("auto", "subprocess", "inprocess")
+
+
+def format_args(fmt):
+    if fmt == "mp4":
+        return [
+            "-f",
+            "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4",
+            "--merge-output-format",
+            "mp4",
+            "--audio-format",
+            "mp3",
+            "--embed-metadata",
+            "--embed-thumbnail",
+            "--prefer-ffmpeg",
+            "--compat-options",
+            "no-keep-subs",
+        ]
+    return ["-f", "bestaudio/best", "--extract-audio", "--audio-format", fmt]
+
+
+# mp4: video və audio axını ayrıca (birləşdirmə emal mərhələsində)
+RAW_VIDEO_FORMAT = "bestvideo[ext=mp4]/best[ext=mp4],bestaudio[ext=m4a]/bestaudio"
+
+
+def raw_format_args(fmt, output_template):
+    if fmt == "mp4":
+        return [
+            "-f",
+            RAW_VIDEO_FORMAT,
+            "--write-info-json",
+            "--write-thumbnail",
+            "-o",
+            "infojson:" + output_template,
+            "-o",
+            "thumbnail:" + output_template,
+            "--fixup",
+            "never",
+            "-o",
+            raw_template(output_template),
+        ]
+    return ["-f", "bestaudio/best", "--fixup", "never", "-o", raw_template(output_template)]
+
+
+def format_params(fmt):
+    """`format_args`-ın YoutubeDL parametrləri ilə ekvivalenti."""
+    if fmt == "mp4":
+        return {
+            "format": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4",
+            "merge_output_format": "mp4",
+            "writethumbnail": True,
+            "prefer_ffmpeg": True,
+            "postprocessors": [
+                {"key": "FFmpegMetadata"},
+                {"key": "EmbedThumbnail"},
+            ],
+        }
+    return {
+        "format": "bestaudio/best",
+        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": fmt}],
+    }
+
+
+def raw_format_params(fmt):
+    """`raw_format_args`-ın ekvivalenti; çıxış şablonları `set_outtmpl` ilə verilir."""
+    if fmt == "mp4":
+        return {"format": RAW_VIDEO_FORMAT, "writeinfojson": True, "writethumbnail": True, "fixup": "never"}
+    return {"format": "bestaudio/best", "fixup": "never"}
+
+
+class SubprocessBackend:
+    name = "subprocess"
+
+    def __init__(self, yt_dlp_path, procs=None):
+        self.yt_dlp = yt_dlp_path
+        self.procs = procs or ProcessController()
+        self._template_ok = None
+        self._template_lock = threading.Lock()
+
+    def supports_progress_template(self):
+        """`--progress-template` yt-dlp 2021.10-dan var; bir dəfə `--help` ilə yoxlanır."""
+        with self._template_lock:
+            if self._template_ok is None:
+                try:
+                    out = subprocess.run(
+                        [self.yt_dlp, "--help"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=60
+                    ).stdout
+                    self._template_ok = "--progress-template" in out
+                except Exception:
+                    self._template_ok = False
+                if not self._template_ok:
+                    append_log("yt-dlp --progress-template dəstəkləmir, regex parser istifadə olunur.")
+            return self._template_ok
+
+    def args_for(self, fmt):
+        return format_args(fmt)
+
+    def progress_args(self):
+        return PROGRESS_TEMPLATE_ARGS if self.supports_progress_template() else []
+
+    def build_command(self, url, fmt, output_template, raw=False):
+        if raw:
+            return [self.yt_dlp, *raw_format_args(fmt, output_template), *self.progress_args(), "--newline", url]
+        return [self.yt_dlp, *self.args_for(fmt), *self.progress_args(), "-o", output_template, "--newline", url]
+
+    def download(self, url, fmt, output_template, on_progress, wait_if_paused, raw=False, on_message=None):
+        cmd = self.build_command(url, fmt, output_template, raw)
+        proc = None
+        try:
+            proc = self.procs.popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1
+            )
+            if not proc.stdout:
+                raise RuntimeError("yt-dlp stdout açılmadı")
+
+            for line in proc.stdout:
+                # pause halında loopu saxla
+                wait_if_paused()
+                record = parse_line(line)
+                if record:
+                    on_progress(record)
+                elif on_message is not None:
+                    on_message(line)
+            return proc.wait()
+        except Exception:
+            try:
+                if proc:
+                    proc.kill()
+            except Exception:
+                pass
+            raise
+        finally:
+            try:
+                if proc and proc.stdout:
+                    proc.stdout.close()
+            except Exception:
+                pass
+            if proc:
+                self.procs.forget(proc)
+
+    def close(self):
+        pass
+
+
+class _WarmInstance:
+    """Bir YoutubeDL instansiyası + hazırkı yükləmənin callback-ləri."""
+
+    def __init__(self, params):
+        self.on_progress = None
+        self.wait_if_paused = None
+        params = dict(params)
+        params["progress_hooks"] = [self._hook]
+        params["postprocessor_hooks"] = [self._pp_hook]
+        self.ydl = _yt_dlp().YoutubeDL(params)
+
+    def _hook(self, d):
+        if self.wait_if_paused:
+            self.wait_if_paused()
+        if not self.on_progress:
+            return
+        if d.get("status") == "finished" and d.get("filename"):
+            # "artıq yüklənib" halında da fayl adı konveyerə lazımdır
+            total = d.get("total_bytes") or d.get("downloaded_bytes")
+            self.on_progress(download_record(total, total, filename=d["filename"]))
+            return
+        if d.get("status") != "downloading":
+            return
+        self.on_progress(
+            download_record(
+                d.get("downloaded_bytes") or 0,
+                d.get("total_bytes") or d.get("total_bytes_estimate"),
+                d.get("speed"),
+                d.get("eta"),
+                d.get("fragment_index"),
+                d.get("fragment_count"),
+                d.get("filename"),
+            )
+        )
+
+    def _pp_hook(self, d):
+        if not self.on_progress:
+            return
+        if d.get("status") == "started":
+            self.on_progress(postprocess_record(d.get("postprocessor")))
+        elif d.get("status") == "finished":
+            info = d.get("info_dict") or {}
+            if info.get("filepath"):
+                self.on_progress(postprocess_record(d.get("postprocessor"), info["filepath"]))
+
+    def set_outtmpl(self, template, raw=False):
+        outtmpl = self.ydl.params.get("outtmpl")
+        if not isinstance(outtmpl, dict):
+            outtmpl = self.ydl.params["outtmpl"] = {}
+        if raw:
+            outtmpl["default"] = raw_template(template)
+            outtmpl["infojson"] = outtmpl["thumbnail"] = template
+        else:
+            outtmpl["default"] = template
+
+
+class InProcessBackend:
+    """
+    yt_dlp.YoutubeDL ilə proses daxilində yükləmə.
+
+    YoutubeDL instansiyası thread-safe deyil, ona görə hər format üçün isti
+    instansiyalar hovuzu saxlanılır: worker bir instansiyanı götürür, işini
+    bitirib geri qaytarır. Gözlənilməz xəta olarsa həmin video
+    SubprocessBackend ilə yenidən cəhd edilir.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, yt_dlp_path=None, base_params=None):
+        if not HAVE_YT_DLP:
+            raise RuntimeError("yt_dlp modulu quraşdırılmayıb")
+        self.base_params = {"quiet": True, "no_warnings": True, "noprogress": True}
+        self.base_params.update(base_params or {})
+        # proses daxilində pauza hook-da bloklanmaqla olur; nəzarətçi fallback prosesləri üçündür
+        self.procs = ProcessController()
+        self.fallback = SubprocessBackend(yt_dlp_path, self.procs) if yt_dlp_path else None
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+    def params_for(self, fmt, raw=False):
+        params = dict(self.base_params)
+        params.update(raw_format_params(fmt) if raw else format_params(fmt))
+        return params
+
+    def _pool(self, key):
+        with self._pools_lock:
+            return self._pools.setdefault(key, queue.LifoQueue())
+
+    def _acquire(self, key):
+        try:
+            return self._pool(key).get_nowait()
+        except queue.Empty:
+            return _WarmInstance(self.params_for(*key))
+
+    def _release(self, key, inst):
+        inst.on_progress = inst.wait_if_paused = None
+        self._pool(key).put(inst)
+
+    def download(self, url, fmt, output_template, on_progress, wait_if_paused, raw=False, on_message=None):
+        yt_dlp = _yt_dlp()
+        key = (fmt, raw)
+        inst = self._acquire(key)
+        inst.on_progress = on_progress
+        inst.wait_if_paused = wait_if_paused
+        inst.set_outtmpl(output_template, raw)
+        try:
+            return inst.ydl.download([url])
+        except yt_dlp.utils.DownloadError as e:
+            append_log(f"yt-dlp (in-process) xətası: {e}")
+            if on_message is not None:
+                on_message(str(e))
+            return 1
+        except Cancelled:
+            # yükləmə hook-un ortasında kəsildi; instansiyanı təkrar istifadə etmirik
+            inst = None
+            raise
+        except Exception as e:
+            if not self.fallback:
+                raise
+            append_log(f"In-process backend xətası, subprocess ilə təkrar: {e}")
+            # zədələnmiş instansiyanı hovuza qaytarmırıq
+            inst = None
+            return self.fallback.download(url, fmt, output_template, on_progress, wait_if_paused, raw, on_message)
+        finally:
+            if inst is not None:
+                self._release(key, inst)
+
+    def close(self):
+        with self._pools_lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            while True:
+                try:
+                    inst = pool.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    inst.ydl.close()
+                except Exception:
+                    pass
+
+
+def make_backend(name, yt_dlp_path):
+    """
+    "auto" — yt_dlp modulu varsa in-process, yoxdursa subprocess.
+    "inprocess" modul olmadıqda da subprocess-ə düşür (log yazılır).
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Naməlum backend: {name}")
+    if name in ("auto", "inprocess") and HAVE_YT_DLP:
+        return InProcessBackend(yt_dlp_path)
+    if name == "inprocess":
+        append_log("yt_dlp modulu tapılmadı, subprocess backend istifadə olunur.")
+    return SubprocessBackend(yt_dlp_path)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ümumi sürət limiti (bandwidth budget).
+
+`BandwidthScheduler` bütün aktiv yükləmələr üçün bir token bucket saxlayır:
+hər yükləmə irəliləyiş bildirəndə endirdiyi baytları `consume()` ilə
+büdcədən çıxır. Büdcə aşılıbsa, ədalətli payından (limit / aktiv yükləmə
+sayı) çox endirən yükləmə qaytarılan müddət qədər saxlanılır — subprocess
+backend-də prosesi SIGSTOP ilə, in-process backend-də hook-u bloklamaqla
+(bax `procs.ProcessController.hold`). Büdcədə boş yer varsa (bəzi
+yükləmələr yavaşdır və ya ffmpeg emalındadır) qalanlar payından artıq
+endirə bilər, beləliklə limit doldurulur, amma aşılmır.
+
+Pay avtomatik yenidən bölünür: yükləmə `open()` ilə başlayır, xam fayllar
+endiriləndə (emala keçəndə) və ya bitəndə `close()` olunur.
+
+Limit sabit ola bilər ("5M") və ya günün saatına görə cədvəl:
+
+    "09:00-18:00=2M,*=10M"      — iş saatlarında 2 MiB/s, qalan vaxt 10 MiB/s
+    "23:00-07:00=0,*=1.5M"      — gecə limitsiz (0), gündüz 1.5 MiB/s
+"""
+
+import re
+import threading
+import time
+
+from .core import append_log
+
+BURST = 0.5  # bucket tutumu: bu qədər saniyəlik limit
+MAX_HOLD = 2.0  # bir dəfəlik saxlama müddətinin yuxarı həddi
+UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+RATE_RE = re.compile(r"^\s*(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>[KMG]?)(?:i?B)?(?:/s)?\s*$", re.IGNORECASE)
+WINDOW_RE = re.compile(r"^\s*(?P<h1>\d{1,2}):(?P<m1>\d{2})\s*-\s*(?P<h2>\d{1,2}):(?P<m2>\d{2})\s*$")
+
+
+def parse_rate(text):
+    """"2M", "500K", "1.5MiB/s", "300000" → bayt/san; "0", "none", "-" → None (limitsiz)."""
+    text = str(text).strip()
+    if text.lower() in ("", "0", "none", "-", "unlimited"):
+        return None
+    m = RATE_RE.match(text)
+    if not m:
+        raise ValueError(f"Yanlış sürət: {text!r} (nümunə: 500K, 2M)")
+    rate = float(m.group("num")) * UNITS[m.group("unit").upper()]
+    return rate or None
+
+
+def format_rate(rate):
+    if rate is None:
+        return "limitsiz"
+    if rate >= UNITS["M"]:
+        return f"{rate / UNITS['M']:.1f} MiB/s"
+    return f"{rate / UNITS['K']:.0f} KiB/s"
+
+
+class RateSchedule:
+    """Günün vaxtına görə limit: ilk uyğun pəncərə qalib gəlir, heç biri uyğun deyilsə `default`."""
+
+    def __init__(self, windows=(), default=None):
+        self.windows = list(windows)  # [(başlanğıc dəq., son dəq., rate)]
+        self.default = default
+
+    def rate(self, now=None):
+        t = time.localtime(now)
+        minute = t.tm_hour * 60 + t.tm_min
+        for start, end, rate in self.windows:
+            # gecə yarısını keçən pəncərə: 23:00-07:00
+            inside = start <= minute < end if start < end else minute >= start or minute < end
+            if inside:
+                return rate
+        return self.default
+
+    def describe(self):
+        parts = [f"{s // 60:02d}:{s % 60:02d}-{e // 60:02d}:{e % 60:02d}={format_rate(r)}" for s, e, r in self.windows]
+        if self.default is not None or not parts:
+            parts.append(f"*={format_rate(self.default)}")
+        return ", ".join(parts)
+
+
+def parse_schedule(text):
+    """"5M" və ya "09:00-18:00=2M,*=10M" → RateSchedule. Xəta olarsa ValueError."""
+    windows = []
+    default = None
+    for item in filter(None, (s.strip() for s in str(text).split(","))):
+        if "=" not in item:
+            default = parse_rate(item)
+            continue
+        when, rate = item.split("=", 1)
+        rate = parse_rate(rate)
+        if when.strip() == "*":
+            default = rate
+            continue
+        m = WINDOW_RE.match(when)
+        if not m:
+            raise ValueError(f"Yanlış vaxt aralığı: {when!r} (nümunə: 09:00-18:00)")
+        start = int(m.group("h1")) * 60 + int(m.group("m1"))
+        end = int(m.group("h2")) * 60 + int(m.group("m2"))
+        if start >= 24 * 60 or end > 24 * 60 or start == end:
+            raise ValueError(f"Yanlış vaxt aralığı: {when!r}")
+        windows.append((start, end, rate))
+    return RateSchedule(windows, default)
+
+
+class _Flow:
+    __slots__ = ("last", "tokens", "t")
+
+    def __init__(self, tokens, t):
+        self.last = 0
+        self.tokens = tokens
+        self.t = t
+
+
+class BandwidthScheduler:
+    def __init__(self, schedule, clock=time.monotonic):
+        if not isinstance(schedule, RateSchedule):
+            schedule = parse_schedule(schedule)
+        self.schedule = schedule
+        self.clock = clock
+        self._flows = {}
+        self._lock = threading.Lock()
+        self._rate = schedule.rate()
+        # boş başlayır: başlanğıcda burst olmasın
+        self._tokens = 0.0
+        self._t = clock()
+        append_log(f"Sürət limiti: {schedule.describe()} (hazırda {format_rate(self._rate)}).")
+
+    def rate(self):
+        return self._rate
+
+    def active(self):
+        with self._lock:
+            return len(self._flows)
+
+    def share(self):
+        with self._lock:
+            return self._rate / len(self._flows) if self._rate and self._flows else self._rate
+
+    def open(self, key):
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            share = self._rate / (len(self._flows) + 1) if self._rate else 0.0
+            self._flows[key] = _Flow(share * BURST, now)
+
+    def close(self, key):
+        with self._lock:
+            self._flows.pop(key, None)
+
+    def _refill(self, now):
+        rate = self.schedule.rate()
+        if rate != self._rate:
+            append_log(f"Sürət limiti dəyişdi (cədvəl): {format_rate(self._rate)} → {format_rate(rate)}")
+            self._rate = rate
+            self._tokens = min(self._tokens, (rate or 0.0) * BURST)
+        if rate:
+            self._tokens = min(rate * BURST, self._tokens + rate * (now - self._t))
+        self._t = now
+
+    def consume(self, key, downloaded):
+        """
+        `downloaded` — yükləmənin cari faylda indiyə qədər endirdiyi bayt (kumulyativ).
+        Yükləmənin saxlanılmalı olduğu müddəti (san.) qaytarır; 0 — davam etsin.
+        """
+        with self._lock:
+            flow = self._flows.get(key)
+            if flow is None or downloaded is None:
+                return 0.0
+            # yeni fayl (mp4: video, sonra audio) — sayğac sıfırdan başlayır
+            n = downloaded - flow.last if downloaded >= flow.last else downloaded
+            flow.last = downloaded
+            now = self.clock()
+            self._refill(now)
+            rate = self._rate
+            if not rate or n <= 0:
+                return 0.0
+            share = rate / len(self._flows)
+            flow.tokens = min(share * BURST, flow.tokens + share * (now - flow.t)) - n
+            flow.t = now
+            self._tokens -= n
+            if self._tokens >= 0:
+                # büdcədə boş yer var: paydan artıq istifadə borc sayılmır
+                flow.tokens = max(flow.tokens, 0.0)
+                return 0.0
+            if flow.tokens >= 0:
+                # öz payı daxilindədir — büdcəni paydan çox endirənlər bərpa edir
+                return 0.0
+            return min(MAX_HOLD, max(-self._tokens / rate, -flow.tokens / share))
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+"""
+Toplu iş: bir neçə playlist və video linki bir ümumi növbədə.
+
+Linklər eyni anda (LISTERS qədər yt-dlp `--flat-playlist` prosesi) oxunur,
+entry-lər video id-yə görə birləşdirilir: hər unikal video mühərrikə bir dəfə
+düşür və ilk göründüyü playlistin qovluğuna yüklənir. Bitəndə fayl onu
+tələb edən digər playlist qovluqlarına öz sıra nömrəsi ilə hardlink (alınmasa
+kopya) kimi yerləşdirilir — şəbəkə trafiki unikal videoların sayı qədərdir.
+
+Playlist qovluğu `output_dir/<playlist adı>`-dır; tək video linkləri birbaşa
+`output_dir`-ə düşür. İndeks hər qovluğu ayrıca qeyd edir: növbəti işdə başqa
+qovluqda artıq olan video yüklənmir, yalnız yerləşdirilir.
+
+    job = BatchJob(engine, read_batch_file("linkler.txt"))
+    job.run(start_threads=8)   # siyahılar oxunana qədər bloklanır
+    engine.wait()
+"""
+
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+from .cache import playlist_key, slim_entry
+from .log import append_log
+from .playlist import entry_url, is_playlist_entry, iter_entries
+
+LISTERS = 4
+NAME_MAX = 100
+UNSAFE_RE = re.compile(r'[\x00-\x1f<>:"/\\|?*]+')
+POSITION_RE = re.compile(r"^#\d+ - ")
+
+
+def split_urls(text):
+    """Mətndəki linklər (boşluq, vergül və ya sətirlə ayrılmış); `#` ilə başlayan sətirlər şərhdir."""
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        urls += [u for u in re.split(r"[\s,]+", line) if u]
+    return list(dict.fromkeys(urls))
+
+
+def read_batch_file(path):
+    """Fayldakı linklər; "-" — stdin."""
+    if path == "-":
+        return split_urls(sys.stdin.read())
+    with open(path, encoding="utf-8") as f:
+        return split_urls(f.read())
+
+
+def safe_name(text):
+    name = UNSAFE_RE.sub("_", text or "").strip(" .")
+    return name[:NAME_MAX].rstrip(" .") or "playlist"
+
+
+def materialize(src, dest):
+    """
+    `dest`-i `src`-in hardlink-i (əlavə yer tutmur), alınmasa kopyası kimi
+    yaradır: "link", "copy" və ya artıq varsa None. Kopya əvvəl gizli
+    müvəqqəti fayla yazılır ki, qovluqda yarımçıq fayl görünməsin.
+    """
+    if os.path.exists(dest):
+        return None
+    try:
+        os.link(src, dest)
+        return "link"
+    except FileExistsError:
+        return None
+    except OSError:
+        # fərqli həcm, FAT/exFAT, şəbəkə diski və s.
+        pass
+    tmp = os.path.join(os.path.dirname(dest), "." + os.path.basename(dest) + ".tmp")
+    try:
+        shutil.copyfile(src, tmp)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return "copy"
+
+
+class BatchJob:
+    """
+    Mühərrik listener-i və siyahı oxuyucusu. `pool` — video id → idx (ümumi
+    növbədəki yazı), `targets` — idx → hələ yerləşdirilməmiş (qovluq, sıra)
+    cütləri. Listener növbəti işin "cleared" hadisəsində özünü ayırır.
+    """
+
+    def __init__(self, engine, urls, listers=LISTERS):
+        self.engine = engine
+        self.urls = list(dict.fromkeys(urls))
+        self.listers = max(1, listers)
+        self.lock = threading.Lock()
+        self.pool = {}
+        self.targets = {}
+        self.finished = {}  # idx → "done" / "error"
+        self.folders = {}  # qovluq adı → link
+        self.errors = []  # oxuna bilməyən linklər: (link, xəta)
+        self.failed = {}
+        self.stats = {"entries": 0, "link": 0, "copy": 0, "missed": 0}
+
+    # ---------------- Siyahılar ----------------
+    def run(self, start_threads=None):
+        """Bütün linkləri oxuyub növbəyə qoyur; unikal videoların sayı."""
+        engine = self.engine
+        label = self.urls[0] if len(self.urls) == 1 else f"toplu iş ({len(self.urls)} link)"
+        engine.begin_feed(label, start_threads, batch=self.urls)
+        engine.subscribe(self)
+        if engine.index and not engine.retry_failed:
+            self.failed = engine.index.failures()
+        pending = queue.Queue()
+        for url in self.urls:
+            pending.put(url)
+        threads = [
+            threading.Thread(target=self._lister, args=(pending,), daemon=True)
+            for _ in range(min(self.listers, len(self.urls)))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine.end_feed()
+
+        unique = len(self.pool)
+        append_log(
+            f"Toplu iş: {len(self.urls)} link, {self.stats['entries']} entry, {unique} unikal video "
+            f"({self.stats['entries'] - unique} təkrar yüklənməyəcək)."
+        )
+        if unique == 0 and self.errors:
+            # heç nə oxunmadı — tək linkdəki kimi çağırana ötürülür
+            raise self.errors[0][1]
+        return unique
+
+    def _lister(self, pending):
+        while not self.engine.stop_event.is_set():
+            try:
+                url = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self._enumerate(url)
+            except subprocess.CalledProcessError as e:
+                append_log(f"Toplu iş: link oxunmadı: {url}: {e.output}", "error")
+                self.errors.append((url, e))
+            except Exception as e:
+                append_log(f"Toplu iş: link oxunmadı: {url}: {e}", "error")
+                self.errors.append((url, subprocess.CalledProcessError(1, url, output=str(e))))
+
+    def _entries(self, url):
+        engine = self.engine
+        cached = engine.cache.fresh(url) if engine.cache else None
+        if cached is not None:
+            yield from cached
+            return
+        collected = [] if engine.cache else None
+        entries = iter_entries(engine.yt_dlp, url, engine.stop_event)
+        try:
+            for e in entries:
+                if collected is not None:
+                    collected.append(slim_entry(e))
+                yield e
+        finally:
+            entries.close()
+        if collected and not engine.stop_event.is_set():
+            try:
+                engine.cache.put(url, collected)
+            except Exception as e:
+                append_log(f"Playlist keşi yazıla bilmədi: {e}")
+
+    def _enumerate(self, url):
+        folder = None
+        count = new = 0
+        for pos, e in enumerate(self._entries(url), 1):
+            if self.engine.stop_event.is_set():
+                return
+            if folder is None:
+                folder = self._folder(url, e)
+            count += 1
+            new += self._add(e, folder, pos)
+        index = self.engine.index
+        if index and folder is not None and not self.engine.stop_event.is_set():
+            index.mark_synced(url, self.engine.fmt, folder, new)
+        append_log(f"Toplu iş: {count} entry oxundu ({new} yüklənəcək): {url}")
+
+    def _folder(self, url, e):
+        root = self.engine.output_dir
+        if not is_playlist_entry(e):
+            return root
+        key = playlist_key(url)
+        name = safe_name(e.get("playlist_title") or e.get("playlist") or key.replace("list:", ""))
+        with self.lock:
+            base, n = name, 1
+            # eyni adlı fərqli playlistlər bir qovluğa qarışmasın
+            while self.folders.setdefault(name, key) != key:
+                n += 1
+                name = f"{base} ({n})"
+        folder = os.path.join(root, name)
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def _present(self, vid, folder):
+        index = self.engine.index
+        return bool(index and vid) and all(index.is_done(vid, f, folder) for f in self.engine.formats)
+
+    def _stored(self, vid):
+        """Bütün formatlarda başqa qovluqda artıq yüklənibsə True."""
+        index = self.engine.index
+        return bool(index and vid) and all(index.find(vid, f) for f in self.engine.formats)
+
+    def _add(self, e, folder, pos):
+        """Entry-ni hovuza əlavə edir; yüklənəcək yeni video idisə 1."""
+        vid = e.get("id")
+        key = vid or entry_url(e)
+        playlist = is_playlist_entry(e)
+        target = (folder, pos if playlist else None)
+        with self.lock:
+            self.stats["entries"] += 1
+            idx = self.pool.get(key)
+            first = idx is None
+            done = None
+            if first:
+                idx = self.pool[key] = len(self.pool) + 1
+            else:
+                done = self.finished.get(idx)
+                if done is None:
+                    self.targets.setdefault(idx, []).append(target)
+                elif done == "error":
+                    self.stats["missed"] += 1
+        if first:
+            status = "queued"
+            if self._present(vid, folder):
+                status = "done"
+            elif self._stored(vid):
+                # başqa qovluqda var: yüklənmir, yalnız yerləşdirilir
+                status = "done"
+                with self.lock:
+                    self.targets.setdefault(idx, []).append(target)
+            elif vid in self.failed:
+                status = "error"
+            self.engine.add_video(
+                idx, entry_url(e), e.get("title") or f"Video {idx}", playlist, vid, status=status,
+                skipped=status == "done", duration=e.get("duration"), size=e.get("filesize_approx"),
+                output_dir=folder, position=pos if playlist else None,
+            )
+            return 1 if status == "queued" else 0
+        if done == "done":
+            self._place(idx, [target])
+        return 0
+
+    # ---------------- Yerləşdirmə ----------------
+    def __call__(self, event, idx, data):
+        if event == "cleared":
+            self.engine.unsubscribe(self)
+            return
+        if event == "idle":
+            if self.stats["link"] or self.stats["copy"] or self.stats["missed"]:
+                append_log(
+                    f"Toplu iş: {self.stats['link']} hardlink, {self.stats['copy']} kopya yerləşdirildi"
+                    + (f", {self.stats['missed']} yerləşdirilmədi (video yüklənmədi)." if self.stats["missed"] else ".")
+                )
+            return
+        status = data.get("status") if event == "status" else None
+        if status not in ("done", "error"):
+            return
+        with self.lock:
+            self.finished[idx] = status
+            targets = self.targets.pop(idx, [])
+            if status == "error":
+                self.stats["missed"] += len(targets)
+        if targets and status == "done":
+            self._place(idx, targets)
+
+    def _sources(self, info):
+        """{format: fayl} — videonun mövcud faylları."""
+        sources = dict(info.get("outputs") or {})
+        if not sources and info.get("filepath"):
+            sources[self.engine.formats[0]] = info["filepath"]
+        index = self.engine.index
+        for fmt in self.engine.formats:
+            path = sources.get(fmt)
+            if (not path or not os.path.exists(path)) and index and info.get("video_id"):
+                sources[fmt] = index.find(info["video_id"], fmt)
+        return {fmt: path for fmt, path in sources.items() if path and os.path.exists(path)}
+
+    def _place(self, idx, targets):
+        engine = self.engine
+        info = engine.video_info.get(idx, {})
+        sources = self._sources(info)
+        if not sources:
+            append_log("Toplu iş: yerləşdirmək üçün fayl tapılmadı.", "error", idx=idx)
+            with self.lock:
+                self.stats["missed"] += len(targets)
+            return
+        for folder, pos in targets:
+            for fmt, src in sources.items():
+                name = POSITION_RE.sub("", os.path.basename(src))
+                if pos:
+                    name = f"#{pos:02d} - {name}"
+                dest = os.path.join(folder, name)
+                try:
+                    how = materialize(src, dest)
+                except OSError as e:
+                    append_log(f"Toplu iş: {dest} yaradılmadı: {e}", "error", idx=idx)
+                    continue
+                if how:
+                    with self.lock:
+                        self.stats[how] += 1
+                if engine.index:
+                    try:
+                        engine.index.record(info.get("video_id"), fmt, folder, dest, info.get("title"), info.get("url"))
+                    except Exception as e:
+                        append_log(f"İndeks yazıla bilmədi: {e}", "error", idx=idx)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+Playlist metadata keşi.
+
+Hər playlist (URL və ya `list=` ID-si ilə) üçün son oxunmuş entry siyahısı —
+id, başlıq, müddət, təxmini ölçü — SQLite-da saxlanılır. TTL bitməyibsə
+playlist yt-dlp çağırılmadan keşdən dərhal açılır. Yeniləmədə köhnə və yeni
+siyahı müqayisə olunur: əlavə olunan/silinən id-lər qaytarılır, köhnə
+entry-lərin metadata-sı isə yeni siyahıda çatışmayan sahələri doldurur.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+CACHE_FILE = os.path.join(os.getcwd(), "ytdownloader_cache.db")
+DEFAULT_TTL = 3600
+
+# ölçü məlum deyilsə müddətə görə təxmin üçün orta bitreytlər (bayt/saniyə)
+BYTES_PER_SECOND = {"mp4": 2500 * 1000 // 8, "mp3": 192 * 1000 // 8, "wav": 1411 * 1000 // 8}
+
+# yt-dlp entry-sindən saxladığımız sahələr
+ENTRY_KEYS = (
+    "id", "title", "url", "webpage_url", "_type", "playlist_index", "duration", "filesize_approx", "playlist_title",
+)
+
+
+def playlist_key(url):
+    try:
+        q = parse_qs(urlparse(url).query)
+    except ValueError:
+        return url
+    if q.get("list"):
+        return "list:" + q["list"][0]
+    return url.strip()
+
+
+def estimate_size(duration, fmt):
+    """Təxmini fayl ölçüsü (bayt); müddət bilinmirsə None."""
+    if not duration:
+        return None
+    return int(duration * BYTES_PER_SECOND.get(fmt, BYTES_PER_SECOND["mp4"]))
+
+
+def slim_entry(e):
+    slim = {k: e[k] for k in ENTRY_KEYS if e.get(k) is not None}
+    if "filesize_approx" not in slim and e.get("filesize"):
+        slim["filesize_approx"] = e["filesize"]
+    return slim
+
+
+class PlaylistCache:
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS playlists ("
+                " key TEXT PRIMARY KEY, url TEXT, fetched_at REAL NOT NULL, entries TEXT NOT NULL)"
+            )
+
+    def get(self, url):
+        """(entries, fetched_at) və ya None — TTL nəzərə alınmır."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entries, fetched_at FROM playlists WHERE key = ?", (playlist_key(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def fresh(self, url):
+        """TTL daxilindədirsə keşlənmiş entry-lər, yoxsa None."""
+        if not self.ttl or self.ttl <= 0:
+            return None
+        cached = self.get(url)
+        if cached is None or time.time() - cached[1] > self.ttl:
+            return None
+        return cached[0]
+
+    def put(self, url, entries):
+        """Yeni siyahını yazır və (əlavə olunan id-lər, silinən id-lər) qaytarır."""
+        old = self.get(url)
+        old_ids = {e.get("id") for e in old[0]} if old else set()
+        new_ids = {e.get("id") for e in entries}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists VALUES (?, ?, ?, ?)",
+                (playlist_key(url), url, time.time(), json.dumps(entries, ensure_ascii=False, separators=(",", ":"))),
+            )
+        added = [i for i in (e.get("id") for e in entries) if i not in old_ids] if old else []
+        removed = sorted(old_ids - new_ids) if old else []
+        return added, removed
+
+    def invalidate(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM playlists WHERE key = ?", (playlist_key(url),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,547 @@
+# -*- coding: utf-8 -*-
+
+"""
+Headless (X11-siz) batch rejimi — cron və serverlər üçün.
+
+    python -m ytdownloader URL -f mp3 -j 16 -o /data/music
+    python -m ytdownloader --batch linkler.txt -f mp3 -o /data/music   # hər playlist öz qovluğunda
+    python full_youtube_playlist_installer.py --headless URL ...
+
+Bir neçə maşında (bax `coordinator.py`, `node.py`):
+
+    python -m ytdownloader --serve --host 0.0.0.0 URL -f mp3     # koordinator
+    python -m ytdownloader --worker http://HOST:8765 -j 8 -o /data  # hər maşında
+"""
+
+import argparse
+import subprocess
+import sys
+import threading
+import time
+
+from .core import append_log, yt_dlp_yoxla_ve_endir
+from .backends import BACKENDS, make_backend
+from .bandwidth import BandwidthScheduler, parse_schedule
+from .batch import BatchJob, read_batch_file
+from .cache import CACHE_FILE, DEFAULT_TTL, PlaylistCache
+from .coordinator import COORDINATOR_FILE, DEFAULT_PORT, LEASE_TTL, Coordinator, CoordinatorServer, JobStore
+from .engine import DownloadEngine, FORMATS, MAX_THREADS, SYNC_BREAK_AFTER, format_key, parse_formats
+from .index import INDEX_FILE, DownloadIndex
+from .journal import JOURNAL_FILE, Journal, replay
+from .log import BACKUPS, LEVELS, LOG_FILE, MAX_BYTES, configure_logging
+from .metrics import METRICS_FILE, Metrics, MetricsServer
+from .node import POLL_WAIT, CoordinatorClient, CoordinatorError, WorkerNode
+from .retry import MAX_RETRIES, RETRY_BASE, THROTTLE_COOLDOWN, RetryPolicy
+from .scheduler import POLICIES
+from .storage import FINAL_WRITES, MB, MIN_FREE, RECHECK
+
+STATUS_TEXT = {"downloading": "Yüklənir", "done": "Bitdi", "error": "Xəta"}
+
+
+def rate_schedule(text):
+    try:
+        return parse_schedule(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def format_list(text):
+    try:
+        return format_key(parse_formats(text))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="ytdownloader", description="YouTube playlist/video yükləyici (headless rejim)")
+    p.add_argument("url", nargs="?", help="Playlist və ya video linki (--resume ilə lazım deyil)")
+    p.add_argument(
+        "--batch",
+        default=None,
+        metavar="FILE",
+        help="Linklər faylı (hər sətirdə bir; '-' — stdin): siyahılar paralel oxunur, təkrar videolar bir dəfə "
+        "yüklənir və hər playlistin qovluğuna hardlink/kopya kimi yerləşdirilir",
+    )
+    p.add_argument(
+        "-f",
+        "--format",
+        type=format_list,
+        default="mp4",
+        help=f"Çıxış formatı: {', '.join(FORMATS)} və ya vergüllə bir neçəsi, məs. mp4,mp3,wav — video bir dəfə "
+        "endirilir, formatlar ffmpeg ilə paralel çıxarılır (default: mp4)",
+    )
+    p.add_argument("-j", "--threads", type=int, default=8, help=f"Paralel yükləmə sayı (1..{MAX_THREADS})")
+    p.add_argument(
+        "--auto-threads",
+        action="store_true",
+        help="Paralel sayını sürət, xəta və CPU yükünə görə avtomatik tənzimlə (-j yuxarı hədd olur)",
+    )
+    p.add_argument(
+        "--limit-rate",
+        type=rate_schedule,
+        default=None,
+        metavar="RATE",
+        help="Bütün yükləmələr üçün ümumi sürət limiti, aktivlər arasında bölünür: 5M, 500K və ya "
+        "günün saatına görə cədvəl, məs. \"09:00-18:00=2M,*=10M\" (0 — limitsiz)",
+    )
+    p.add_argument(
+        "--order",
+        choices=POLICIES,
+        default="playlist",
+        help="Növbə sırası: playlist — playlist sırası, shortest — qısa videolar əvvəl, "
+        "largest — uzun videolar əvvəl (sonda tək qalan uzun yükləmə olmur)",
+    )
+    p.add_argument(
+        "--retries",
+        type=int,
+        default=MAX_RETRIES,
+        help="Keçici xətada (timeout, 5xx, bağlantı) təkrar cəhd sayı (default: %(default)s; 0 — təkrar yoxdur)",
+    )
+    p.add_argument(
+        "--retry-delay",
+        type=float,
+        default=RETRY_BASE,
+        metavar="SEC",
+        help="İlk təkrardan əvvəl gözləmə; hər dəfə ikiqat artır, jitter ilə (default: %(default)s)",
+    )
+    p.add_argument(
+        "--throttle-cooldown",
+        type=float,
+        default=THROTTLE_COOLDOWN,
+        metavar="SEC",
+        help="HTTP 429 / throttling görüləndə bütün worker-lərin yeni yükləmə götürməməsi müddəti "
+        "(default: %(default)s, təkrarlandıqca ikiqat artır)",
+    )
+    p.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Əvvəlki işlərdə qalıcı xəta ilə bitmiş (gizli, silinmiş) videoları yenə cəhd et",
+    )
+    p.add_argument("-o", "--output", default=None, help="Çıxış qovluğu (default: cari qovluq)")
+    p.add_argument(
+        "--scratch",
+        default=None,
+        metavar="DIR",
+        help="Yükləmə və emal bu (məs. sürətli/lokal) qovluqda aparılır, hazır fayllar çıxış qovluğuna atomik köçürülür",
+    )
+    p.add_argument(
+        "--min-free",
+        type=float,
+        default=MIN_FREE / MB,
+        metavar="MB",
+        help="Diskdə həmişə boş qalmalı yer: video təxmini ölçüsü ilə birlikdə sığmırsa gözləyir "
+        "(default: %(default).0f, 0 — yalnız təxmini ölçü, -1 — yoxlama söndürülür)",
+    )
+    p.add_argument(
+        "--disk-recheck",
+        type=float,
+        default=RECHECK,
+        metavar="SAN",
+        help="Yer gözləyərkən diskin neçə saniyədən bir yoxlanması — kənarda boşaldılan yer bu qədər gec "
+        "görülür; Ctrl-C gözləməni dərhal kəsir (default: %(default)s)",
+    )
+    p.add_argument(
+        "--final-writes",
+        type=int,
+        default=FINAL_WRITES,
+        metavar="N",
+        help="Eyni diskə eyni anda köçürülən video sayı, --scratch ilə (default: %(default)s)",
+    )
+    p.add_argument("--yt-dlp", dest="yt_dlp", default=None, help="yt-dlp icra faylının yolu")
+    p.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="auto",
+        help="auto: yt_dlp modulu varsa proses daxilində, yoxdursa hər video üçün ayrıca yt-dlp prosesi",
+    )
+    p.add_argument(
+        "--single-stage",
+        action="store_true",
+        help="Konveyeri söndür: hər worker ffmpeg emalını da özü edir (yt-dlp-nin öz postprocessor-ları)",
+    )
+    p.add_argument(
+        "--post-workers",
+        type=int,
+        default=None,
+        help="Emal mərhələsində paralel ffmpeg prosesi (default: CPU nüvələri sayı)",
+    )
+    p.add_argument("--index", default=INDEX_FILE, help="Yüklənmiş videoların SQLite indeksi (default: %(default)s)")
+    p.add_argument("--no-index", action="store_true", help="İndeksə baxma və yazma — hər şeyi yenidən yüklə")
+    p.add_argument(
+        "--only-new",
+        action="store_true",
+        help=f"Yalnız son sinxrondan bəri yeni videolar: {SYNC_BREAK_AFTER} ardıcıl məlum video görüləndə "
+        "siyahı oxunması dayanır (yeni videoları əvvəldə verən kanal linkləri üçün)",
+    )
+    p.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Siyahını keşə baxmadan yenidən oxu və yalnız əvvəlki siyahıda olmayan videoları yüklə; "
+        "silinənlər indeksdə qeyd olunur",
+    )
+    p.add_argument("--cache", default=CACHE_FILE, help="Playlist metadata keşi (default: %(default)s)")
+    p.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help="Keşlənmiş siyahı neçə saniyə təzə sayılır (default: %(default)s; 0 — həmişə yenidən oxu, "
+        "amma keşi yenilə)",
+    )
+    p.add_argument("--journal", default=JOURNAL_FILE, help="İş jurnalı (default: %(default)s)")
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Jurnaldakı yarımçıq işi davam etdir (yarımçıq videolar .part faylından davam edir)",
+    )
+    p.add_argument(
+        "--clean-parts",
+        action="store_true",
+        help="Dayandırıldıqda (Ctrl-C) yarımçıq .part fayllarını sil (default: saxla ki, --resume davam etsin)",
+    )
+    p.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Prometheus metrikalarını http://127.0.0.1:PORT/metrics ünvanında ver (/summary — JSON)",
+    )
+    p.add_argument(
+        "--metrics-json",
+        default=METRICS_FILE,
+        help="İşin sonunda mərhələ vaxtları xülasəsi (default: %(default)s; boş — yazma)",
+    )
+    p.add_argument("--log-file", default=LOG_FILE, help="Log faylı (default: %(default)s)")
+    p.add_argument(
+        "--log-format", choices=("text", "json"), default="text", help="json — hər sətir video sahələri ilə bir JSON"
+    )
+    p.add_argument(
+        "--log-level", choices=tuple(LEVELS), default="info", help="debug — hər irəliləyiş sətri də loga yazılır"
+    )
+    p.add_argument(
+        "--log-max-mb",
+        type=float,
+        default=MAX_BYTES / 1024 / 1024,
+        help="Log bu ölçünü keçəndə fırladılır (default: %(default)s MB; 0 — ölçüyə görə yox)",
+    )
+    p.add_argument("--log-rotate-hours", type=float, default=None, help="Log bu qədər saatdan bir fırladılır")
+    p.add_argument(
+        "--log-backups", type=int, default=BACKUPS, help="Saxlanılan köhnə log faylı sayı (default: %(default)s)"
+    )
+    dist = p.add_argument_group("bir neçə maşın (koordinator və worker node-lar)")
+    dist.add_argument(
+        "--serve",
+        action="store_true",
+        help="Koordinator rejimi: iş növbəsini saxla və HTTP ilə node-lara icarəyə ver (URL verilərsə iş kimi əlavə olunur)",
+    )
+    dist.add_argument(
+        "--worker",
+        metavar="COORDINATOR_URL",
+        default=None,
+        help="Node rejimi: videoları koordinatordan icarəyə götür (URL verilərsə əvvəlcə iş kimi göndərilir)",
+    )
+    dist.add_argument("--host", default="127.0.0.1", help="Koordinatorun dinlədiyi ünvan (default: %(default)s)")
+    dist.add_argument("--port", type=int, default=DEFAULT_PORT, help="Koordinatorun portu (default: %(default)s)")
+    dist.add_argument(
+        "--coordinator-db", default=COORDINATOR_FILE, help="Koordinatorun SQLite bazası (default: %(default)s)"
+    )
+    dist.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=LEASE_TTL,
+        metavar="SEC",
+        help="İcarə müddəti: bu qədər heartbeat gəlməsə video başqa node-a verilir (default: %(default)s)",
+    )
+    dist.add_argument("--token", default=None, help="Koordinatorla node-lar arasında ortaq gizli açar")
+    dist.add_argument("--node-name", default=None, help="Node adı (default: host-pid)")
+    dist.add_argument(
+        "--exit-when-done", action="store_true", help="Koordinator bütün işlər bitəndə çıxsın (default: Ctrl-C-yə qədər)"
+    )
+    p.add_argument("-q", "--quiet", action="store_true", help="Yalnız yekun nəticəni çap et")
+    return p
+
+
+PHASE_TEXT = (("queue_wait", "növbə"), ("spawn", "başlanğıc"), ("ttfb", "ilk bayt"), ("download", "yükləmə"),
+              ("post_wait", "emal növbəsi"), ("post", "emal"))
+
+
+def format_phases(stats):
+    """Mərhələlərin orta/p95 vaxtları bir sətirdə."""
+    parts = []
+    for key, label in PHASE_TEXT:
+        st = stats.get(key) or {}
+        if st.get("count"):
+            parts.append(f"{label} {st['mean']:.1f}s (p95 {st['p95']:.1f}s)")
+    mbps = stats.get("mbps") or {}
+    if mbps.get("count"):
+        parts.append(f"sürət orta {mbps['mean']:.2f} MB/s")
+    return "Mərhələlər: " + (", ".join(parts) if parts else "məlumat yoxdur")
+
+
+class ConsoleReporter:
+    def __init__(self, engine, quiet=False, stream=None):
+        self.engine = engine
+        self.quiet = quiet
+        self.stream = stream or sys.stdout
+
+    def __call__(self, event, idx, data):
+        if self.quiet:
+            return
+        if event == "concurrency":
+            print(f"[avto] paralel {data['previous']} → {data['workers']}: {data['reason']}", file=self.stream, flush=True)
+            return
+        if event == "utilization":
+            label = "cəmi" if data.get("final") else "yük"
+            text = (
+                f"[{label}] yükləmə {data['download']:.0%}, emal {data['post']:.0%}, "
+                f"gözləmə {data['blocked']:.0%}, növbə {data['queue']}/{data['queue_max']}"
+            )
+            if data.get("bottleneck"):
+                text += f" — darboğaz: {data['bottleneck']}"
+            print(text, file=self.stream, flush=True)
+            return
+        if event == "throttle":
+            if data["active"]:
+                text = f"[throttling] host sorğuları məhdudlaşdırır — {data['cooldown']:.0f} san. yeni yükləmə yoxdur"
+            else:
+                text = "[throttling] bitdi, yükləmələr davam edir"
+            print(text, file=self.stream, flush=True)
+            return
+        if event == "disk":
+            if data["active"]:
+                text = (
+                    f"[disk] {data['path']}: yer çatmır (lazım {data['needed'] / MB:.0f} MB, "
+                    f"boş {data['free'] / MB:.0f} MB) — yer boşalana qədər gözlənilir"
+                )
+            else:
+                text = "[disk] yer var, yükləmələr davam edir"
+            print(text, file=self.stream, flush=True)
+            return
+        if event == "retry":
+            info = self.engine.video_info.get(idx, {})
+            print(
+                f"[{idx}/{self.engine.total_videos}] Təkrar cəhd {data['attempt']} ({data['kind']}, "
+                f"{data['delay']:.0f} san. sonra): {info.get('title', '')}",
+                file=self.stream,
+                flush=True,
+            )
+            return
+        if event != "status" or data.get("status") == "queued":
+            return
+        info = self.engine.video_info.get(idx, {})
+        text = "Artıq var" if data.get("skipped") else STATUS_TEXT.get(data.get("status"), data.get("status"))
+        line = f"[{idx}/{self.engine.total_videos}] {text}: {info.get('title', '')}"
+        if data.get("status") == "error" and info.get("error"):
+            line += f" — {info['error']}"
+        print(line, file=self.stream, flush=True)
+
+
+def serve(args, yt_dlp):
+    """Koordinator rejimi: Ctrl-C-yə (və ya --exit-when-done ilə işlər bitənə) qədər."""
+    store = JobStore(args.coordinator_db)
+    coordinator = Coordinator(store, yt_dlp, ttl=args.lease_ttl).start()
+    try:
+        server = CoordinatorServer(coordinator, args.port, args.host, token=args.token).start()
+    except OSError as e:
+        print(f"Koordinator portu açılmadı ({args.port}): {e}", file=sys.stderr)
+        coordinator.close()
+        store.close()
+        return 2
+    if args.url:
+        coordinator.submit(args.url, args.format)
+    print(f"Koordinator: http://{args.host}:{server.port}", flush=True)
+    last = status = None
+    try:
+        while True:
+            time.sleep(1.0)
+            status = coordinator.status()
+            line = "; ".join(
+                f"iş #{j['id']}: {j['counts']['done']} bitdi, {j['counts']['error']} xəta, "
+                f"{j['counts']['leased']} icarədə, {j['counts']['queued']} növbədə"
+                for j in status["jobs"]
+            )
+            line += f" — node: {len(status['workers'])}"
+            if line != last and not args.quiet:
+                print(line, flush=True)
+                last = line
+            if args.exit_when_done and status["jobs"] and store.next_job() is None:
+                break
+    except KeyboardInterrupt:
+        print("Dayandırıldı.", file=sys.stderr)
+    finally:
+        server.close()
+        coordinator.close()
+        store.close()
+    failed = sum(j["counts"]["error"] for j in status["jobs"]) if status else 0
+    return 0 if failed == 0 else 1
+
+
+def run_node(node, threads):
+    """Node-u fon thread-ində işlədir ki, Ctrl-C əsas thread-də tutulsun."""
+    t = threading.Thread(target=node.run, args=(threads,), daemon=True)
+    t.start()
+    try:
+        while t.is_alive():
+            t.join(0.5)
+    except KeyboardInterrupt:
+        # node bitməmiş icarələri koordinatora qaytarsın
+        node.stop()
+        t.join(POLL_WAIT + node.client.timeout + node.engine.procs.grace)
+        raise
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    configure_logging(
+        path=args.log_file,
+        fmt=args.log_format,
+        level=args.log_level,
+        max_bytes=int(args.log_max_mb * 1024 * 1024),
+        rotate_seconds=args.log_rotate_hours * 3600 if args.log_rotate_hours else None,
+        backups=args.log_backups,
+    )
+
+    if args.serve and args.worker:
+        parser.error("--serve və --worker birlikdə olmaz")
+    if args.resume and (args.serve or args.worker):
+        parser.error("--resume koordinator/node rejimində mənasızdır (işin vəziyyəti koordinatorun bazasındadır)")
+    if args.batch and (args.resume or args.serve or args.worker):
+        parser.error("--batch yalnız adi rejimdə işləyir (--resume, --serve, --worker ilə olmaz)")
+    if args.changed_only and (args.batch or args.serve or args.worker):
+        parser.error("--changed-only tək playlist linki ilə işləyir (--batch, --serve, --worker ilə olmaz)")
+
+    urls = None
+    if args.batch:
+        try:
+            urls = read_batch_file(args.batch)
+        except OSError as e:
+            print(f"Linklər faylı oxunmadı: {e}", file=sys.stderr)
+            return 2
+        if args.url:
+            urls.insert(0, args.url)
+        if not urls:
+            print("Linklər faylında link yoxdur.", file=sys.stderr)
+            return 2
+
+    state = None
+    if args.resume:
+        state = replay(args.journal)
+        if state is None or not state.resumable():
+            if state is not None and state.batch and not state.finished:
+                print("Son iş toplu iş idi: eyni --batch faylı ilə yenidən başladın — bitmiş videolar atlanacaq.")
+            if not args.url:
+                print("Davam etdiriləcək yarımçıq iş yoxdur.")
+                return 0
+            state = None
+    elif not args.url and not urls and not (args.serve or args.worker):
+        parser.error("link lazımdır (və ya --batch, --resume)")
+
+    yt_dlp = args.yt_dlp or yt_dlp_yoxla_ve_endir()
+    if not yt_dlp:
+        print("yt-dlp tapılmadı və endirilə bilmədi.", file=sys.stderr)
+        return 2
+    if args.serve:
+        return serve(args, yt_dlp)
+
+    multi = len(parse_formats(args.format)) > 1
+    if multi and args.single_stage:
+        print("Bir neçə format konveyer tələb edir (--single-stage ilə birlikdə olmaz).", file=sys.stderr)
+        return 2
+    if args.only_new and args.no_index:
+        print("--only-new indeks tələb edir (--no-index ilə birlikdə olmaz).", file=sys.stderr)
+        return 2
+    index = None if args.no_index else DownloadIndex(args.index)
+    cache = PlaylistCache(args.cache, ttl=args.cache_ttl)
+    backend = make_backend(args.backend, yt_dlp)
+    engine = DownloadEngine(
+        yt_dlp,
+        output_dir=args.output,
+        fmt=args.format,
+        threads=args.threads,
+        backend=backend,
+        index=index,
+        only_new=args.only_new,
+        changed_only=args.changed_only,
+        cache=cache,
+        auto_tune=args.auto_threads,
+        pipeline=False if args.single_stage else True if multi else None,
+        post_workers=args.post_workers,
+        clean_parts=args.clean_parts,
+        bandwidth=BandwidthScheduler(args.limit_rate) if args.limit_rate else None,
+        order=args.order,
+        retry=RetryPolicy(retries=max(0, args.retries), base=args.retry_delay),
+        retry_failed=args.retry_failed,
+        throttle_cooldown=args.throttle_cooldown,
+        scratch_dir=args.scratch,
+        min_free=int(args.min_free * MB) if args.min_free >= 0 else None,
+        final_writes=args.final_writes,
+        disk_recheck=max(0.1, args.disk_recheck),
+    )
+    if multi and engine.post is None:
+        print("Bir neçə format üçün ffmpeg lazımdır, tapılmadı.", file=sys.stderr)
+        return 2
+    engine.subscribe(ConsoleReporter(engine, quiet=args.quiet))
+    journal = Journal(args.journal)
+    engine.subscribe(journal)
+    metrics = Metrics(engine, path=args.metrics_json or None)
+    engine.subscribe(metrics)
+    server = None
+    if args.metrics_port is not None:
+        try:
+            server = MetricsServer(metrics, args.metrics_port).start()
+        except OSError as e:
+            print(f"Metrika portu açılmadı ({args.metrics_port}): {e}", file=sys.stderr)
+    append_log(
+        f"Headless rejim başladıldı. Backend: {backend.name}, konveyer: {'bəli' if engine.post else 'xeyr'}"
+    )
+
+    node = None
+    try:
+        if args.worker:
+            node = WorkerNode(engine, CoordinatorClient(args.worker, args.token), args.node_name)
+            if args.url:
+                node.client.submit(args.url, args.format)
+            run_node(node, args.threads)
+        # worker-lər siyahının 1-ci entry-si gələn kimi işə düşür
+        elif state is not None:
+            engine.resume_job(state, start_threads=args.threads)
+        elif urls:
+            BatchJob(engine, urls).run(start_threads=args.threads)
+        else:
+            engine.prepare_playlist(args.url, start_threads=args.threads)
+        if engine.total_videos == 0 and node is None:
+            if args.only_new or args.changed_only:
+                print("Yeni video yoxdur.")
+                return 0
+            print("Heç bir video tapılmadı.", file=sys.stderr)
+            return 2
+        engine.wait()
+    except subprocess.CalledProcessError as e:
+        print(f"yt-dlp playlisti oxuya bilmədi:\n{e.output}", file=sys.stderr)
+        append_log(f"yt-dlp xətası: {e.output}")
+        return 2
+    except CoordinatorError as e:
+        print(f"Koordinatora qoşulmaq olmadı: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        engine.stop()
+        # worker-lər proseslərin çıxmasını (və .part təmizliyini) bitirsin
+        engine.wait(engine.procs.grace + 1)
+        print("Dayandırıldı.", file=sys.stderr)
+        return 130
+    finally:
+        if server is not None:
+            server.close()
+        backend.close()
+        journal.close()
+        cache.close()
+        if index:
+            index.close()
+
+    if node is not None:
+        print(f"Node {node.name}: {node.results['done']} bitdi, {node.results['error']} xəta.")
+        return 0 if node.results["error"] == 0 else 1
+    counts = engine.counts()
+    print(f"{counts['done']}/{engine.total_videos} tamamlandı, {counts['error']} xəta.")
+    if not args.quiet:
+        print(format_phases(metrics.phase_stats()))
+    return 0 if counts["error"] == 0 and counts["queued"] == 0 else 1
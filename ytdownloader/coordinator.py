@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bir neçə maşın/konteyner üçün iş növbəsi: koordinator və onun HTTP API-si.
+
+Koordinator playlisti özü oxuyur (`playlist.iter_entries`) və videoları
+SQLite bazasında (`COORDINATOR_FILE`) saxlayır; worker node-lar (bax
+`node.py`) videoları "icarəyə" (lease) götürür:
+
+    queued ──lease──▶ leased ──complete──▶ done / error
+                        │
+                        └─ lease_until keçdi (node öldü) ──▶ queued
+
+Node icarədəki videolar üçün `heartbeat` göndərir — müddət uzanır. Müddəti
+keçən videolar reaper tərəfindən növbəyə qaytarılır; MAX_LEASES dəfə
+qaytarılan video (node-ları "öldürən" video) xəta sayılır. Koordinator
+yenidən başladılanda baza olduğu kimi qalır, yarımçıq siyahı oxunması
+kəsildiyi entry-dən davam edir.
+
+API (JSON, `CoordinatorServer`):
+
+    GET  /status                                          → işlər, sayğaclar, node-lar
+    POST /jobs      {"url", "fmt"}                        → {"id"}
+    POST /job       {"worker"}                            → {"job": {...} | null}
+    POST /lease     {"worker", "job", "count", "wait"}    → {"items", "done", "counts"}
+    POST /heartbeat {"worker", "job", "items"}            → {"lost"}
+    POST /complete  {"worker", "job", "idx", "status", "error"} → {"ok"}
+    POST /release   {"worker", "job", "items"}            → {}
+
+`/lease` boş növbədə `wait` saniyəyə qədər gözləyir (long-poll) — yeni
+entry gəlməsi, icarənin qayıtması və ya işin bitməsi onu oyadır. "done" —
+siyahı tam oxunub və növbədə/icarədə video qalmayıb. `token` verilərsə
+hər sorğuda `X-Coordinator-Token` başlığı tələb olunur.
+"""
+
+import hmac
+import http.server
+import json
+import os
+import socketserver
+import sqlite3
+import subprocess
+import threading
+import time
+
+from .engine import format_key, parse_formats
+from .log import append_log
+from .playlist import entry_url, is_playlist_entry, iter_entries
+
+COORDINATOR_FILE = os.path.join(os.getcwd(), "ytdownloader_coordinator.db")
+DEFAULT_PORT = 8765
+LEASE_TTL = 60.0
+MAX_LEASES = 5
+MAX_LEASE_BATCH = 100
+MAX_WAIT = 30.0
+REAP_INTERVAL = 2.0
+LISTING_BATCH = 200
+TOKEN_HEADER = "X-Coordinator-Token"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    url         TEXT NOT NULL,
+    fmt         TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    listed      INTEGER NOT NULL DEFAULT 0,
+    error       TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id      INTEGER NOT NULL,
+    idx         INTEGER NOT NULL,
+    url         TEXT NOT NULL,
+    title       TEXT,
+    video_id    TEXT,
+    playlist    INTEGER NOT NULL DEFAULT 0,
+    duration    REAL,
+    size        REAL,
+    status      TEXT NOT NULL DEFAULT 'queued',
+    worker      TEXT,
+    lease_until REAL,
+    leases      INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    updated_at  REAL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (job_id, status, idx);
+CREATE INDEX IF NOT EXISTS items_lease ON items (status, lease_until);
+"""
+
+ITEM_FIELDS = ("idx", "url", "title", "video_id", "playlist", "duration", "size")
+
+
+class JobStore:
+    """SQLite üzərində işlər və videolar; bağlantı thread-lər arasında lock altında paylaşılır."""
+
+    def __init__(self, path=COORDINATOR_FILE, max_leases=MAX_LEASES):
+        self.path = path
+        self.max_leases = max_leases
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    # ---------------- işlər ----------------
+    def add_job(self, url, fmt):
+        with self._lock, self._conn:
+            cur = self._conn.execute("INSERT INTO jobs (url, fmt, created_at) VALUES (?, ?, ?)", (url, fmt, time.time()))
+            return cur.lastrowid
+
+    def job(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT id, url, fmt, listed, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "url": row[1], "fmt": row[2], "listed": bool(row[3]), "error": row[4]}
+
+    def jobs(self):
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT id FROM jobs ORDER BY id")]
+        return [self.job(i) for i in ids]
+
+    def unlisted(self):
+        """[(job_id, url, növbəti entry)] — siyahısı tam oxunmamış işlər."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, url, COALESCE((SELECT MAX(idx) FROM items WHERE job_id = jobs.id), 0) + 1 "
+                "FROM jobs WHERE listed = 0 ORDER BY id"
+            ).fetchall()
+
+    def next_job(self):
+        """Bitməmiş ən köhnə işin id-si (siyahı oxunur və ya növbədə/icarədə video var)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE listed = 0 OR EXISTS (SELECT 1 FROM items WHERE job_id = jobs.id "
+                "AND status IN ('queued', 'leased')) ORDER BY id LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def add_items(self, job_id, items):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO items (job_id, idx, url, title, video_id, playlist, duration, size, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, *(it.get(k) for k in ITEM_FIELDS), now) for it in items],
+            )
+
+    def finish_listing(self, job_id, error=None):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET listed = 1, error = ? WHERE id = ?", (error, job_id))
+
+    def counts(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+        counts = dict.fromkeys(("queued", "leased", "done", "error"), 0)
+        counts.update(rows)
+        return counts
+
+    def drained(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT listed, (SELECT COUNT(*) FROM items WHERE job_id = jobs.id AND status IN ('queued', 'leased')) "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return row is None or (bool(row[0]) and row[1] == 0)
+
+    # ---------------- icarələr ----------------
+    def lease(self, worker, job_id, count, ttl):
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT idx, url, title, video_id, playlist, duration, size FROM items "
+                "WHERE job_id = ? AND status = 'queued' ORDER BY idx LIMIT ?",
+                (job_id, count),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE items SET status = 'leased', worker = ?, lease_until = ?, leases = leases + 1, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                [(worker, now + ttl, now, job_id, r[0]) for r in rows],
+            )
+        return [dict(zip(ITEM_FIELDS, r)) for r in rows]
+
+    def heartbeat(self, worker, job_id, idxs, ttl):
+        """İcarələri uzadır; artıq bu node-a məxsus olmayan idx-ləri qaytarır."""
+        until = time.time() + ttl
+        lost = []
+        with self._lock, self._conn:
+            for idx in idxs:
+                cur = self._conn.execute(
+                    "UPDATE items SET lease_until = ? WHERE job_id = ? AND idx = ? AND status = 'leased' AND worker = ?",
+                    (until, job_id, idx, worker),
+                )
+                if cur.rowcount == 0:
+                    lost.append(idx)
+        return lost
+
+    def complete(self, worker, job_id, idx, status, error=None):
+        """
+        "done" həmişə qəbul olunur (icarəsi itmiş node-un bitirdiyi video da
+        bitib); "error" yalnız icarə hələ bu node-dadırsa.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if status == "done":
+                cur = self._conn.execute(
+                    "UPDATE items SET status = 'done', worker = ?, error = NULL, updated_at = ? "
+                    "WHERE job_id = ? AND idx = ? AND status != 'done'",
+                    (worker, now, job_id, idx),
+                )
+            else:
+                cur = self._conn.execute(
+                    "UPDATE items SET status = 'error', error = ?, updated_at = ? "
+                    "WHERE job_id = ? AND idx = ? AND status = 'leased' AND worker = ?",
+                    (error, now, job_id, idx, worker),
+                )
+        return cur.rowcount > 0
+
+    def release(self, worker, job_id, idxs):
+        """Node dayandı: icarələr xəta sayılmadan növbəyə qayıdır."""
+        with self._lock, self._conn:
+            cur = self._conn.executemany(
+                "UPDATE items SET status = 'queued', worker = NULL, lease_until = NULL, leases = MAX(leases - 1, 0) "
+                "WHERE job_id = ? AND idx = ? AND status = 'leased' AND worker = ?",
+                [(job_id, idx, worker) for idx in idxs],
+            )
+        return cur.rowcount
+
+    def requeue_expired(self):
+        """Müddəti keçmiş icarələri növbəyə qaytarır; (qaytarılan, xəta sayılan) sayı."""
+        now = time.time()
+        with self._lock, self._conn:
+            failed = self._conn.execute(
+                "UPDATE items SET status = 'error', error = ?, updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND leases >= ?",
+                (f"icarə {self.max_leases} dəfə bitdi (node-lar cavab vermədi)", now, now, self.max_leases),
+            ).rowcount
+            requeued = self._conn.execute(
+                "UPDATE items SET status = 'queued', worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ?",
+                (now, now),
+            ).rowcount
+        return requeued, failed
+
+    def leased_by_worker(self):
+        with self._lock:
+            return dict(
+                self._conn.execute("SELECT worker, COUNT(*) FROM items WHERE status = 'leased' GROUP BY worker")
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Coordinator:
+    """
+    JobStore + siyahı oxunması + icarə müddəti nəzarəti. `changed` şərti
+    növbədə dəyişiklik olanda oyadılır — `/lease` long-poll-u onu gözləyir.
+    """
+
+    def __init__(self, store, yt_dlp, ttl=LEASE_TTL):
+        self.store = store
+        self.yt_dlp = yt_dlp
+        self.ttl = ttl
+        self.changed = threading.Condition()
+        self.stop_event = threading.Event()
+        self.workers = {}  # ad → {"seen", "done", "errors"}
+        self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+
+    def start(self):
+        for job_id, url, first in self.store.unlisted():
+            append_log(f"Koordinator: iş #{job_id} siyahısı {first}-ci entry-dən davam edir.")
+            self._start_listing(job_id, url, first)
+        self._reaper.start()
+        return self
+
+    def close(self):
+        self.stop_event.set()
+        self._notify()
+
+    def _notify(self):
+        with self.changed:
+            self.changed.notify_all()
+
+    # ---------------- işlər ----------------
+    def submit(self, url, fmt):
+        """Yeni iş; link boşdursa və ya format tanınmırsa ValueError (node-lara çatmamış)."""
+        if not isinstance(url, str) or not url.strip():
+            raise ValueError("link lazımdır")
+        fmt = format_key(parse_formats(fmt or "mp4"))
+        url = url.strip()
+        job_id = self.store.add_job(url, fmt)
+        append_log(f"Koordinator: yeni iş #{job_id} ({fmt}): {url}")
+        self._start_listing(job_id, url)
+        return job_id
+
+    def _start_listing(self, job_id, url, first=1):
+        threading.Thread(target=self._list, args=(job_id, url, first), daemon=True).start()
+
+    def _list(self, job_id, url, first):
+        # ilk video dərhal icarəyə verilə bilsin: partiya 1, 2, 4, ... LISTING_BATCH
+        batch, limit, total = [], 1, 0
+        error = None
+        try:
+            for i, e in enumerate(iter_entries(self.yt_dlp, url, self.stop_event, start=first), first):
+                batch.append({
+                    "idx": i,
+                    "url": entry_url(e),
+                    "title": e.get("title") or f"Video {i}",
+                    "video_id": e.get("id"),
+                    "playlist": int(is_playlist_entry(e)),
+                    "duration": e.get("duration"),
+                    "size": e.get("filesize_approx"),
+                })
+                if len(batch) >= limit:
+                    self.store.add_items(job_id, batch)
+                    total += len(batch)
+                    batch, limit = [], min(LISTING_BATCH, limit * 2)
+                    self._notify()
+        except subprocess.CalledProcessError as e:
+            error = e.output or str(e)
+            append_log(f"Koordinator: iş #{job_id} siyahısı oxunmadı: {error}", "error")
+        if batch:
+            self.store.add_items(job_id, batch)
+            total += len(batch)
+        if self.stop_event.is_set():
+            return
+        self.store.finish_listing(job_id, error)
+        append_log(f"Koordinator: iş #{job_id} siyahısı oxundu ({total} video).")
+        self._notify()
+
+    # ---------------- node sorğuları ----------------
+    def _seen(self, worker, done=0, errors=0):
+        w = self.workers.setdefault(worker, {"seen": 0.0, "done": 0, "errors": 0})
+        w["seen"] = time.time()
+        w["done"] += done
+        w["errors"] += errors
+
+    def next_job(self, worker):
+        self._seen(worker)
+        job_id = self.store.next_job()
+        return self.store.job(job_id) if job_id is not None else None
+
+    def lease(self, worker, job_id, count, wait=0.0):
+        self._seen(worker)
+        count = max(0, min(MAX_LEASE_BATCH, int(count)))
+        deadline = time.monotonic() + max(0.0, min(MAX_WAIT, float(wait)))
+        with self.changed:
+            while True:
+                items = self.store.lease(worker, job_id, count, self.ttl) if count else []
+                done = not items and self.store.drained(job_id)
+                remaining = deadline - time.monotonic()
+                if items or done or remaining <= 0 or self.stop_event.is_set():
+                    break
+                self.changed.wait(remaining)
+        return {"items": items, "done": done, "counts": self.store.counts(job_id), "ttl": self.ttl}
+
+    def heartbeat(self, worker, job_id, idxs):
+        self._seen(worker)
+        lost = self.store.heartbeat(worker, job_id, idxs, self.ttl)
+        if lost:
+            append_log(f"Koordinator: {worker} {len(lost)} videonun icarəsini itirib.", "warning")
+        return {"lost": lost}
+
+    def complete(self, worker, job_id, idx, status, error=None):
+        ok = self.store.complete(worker, job_id, idx, status, error)
+        self._seen(worker, done=int(ok and status == "done"), errors=int(ok and status != "done"))
+        self._notify()
+        return {"ok": ok}
+
+    def release(self, worker, job_id, idxs):
+        self._seen(worker)
+        released = self.store.release(worker, job_id, idxs)
+        if released:
+            append_log(f"Koordinator: {worker} {released} videonu növbəyə qaytardı.")
+            self._notify()
+        return {"released": released}
+
+    def status(self):
+        jobs = []
+        for job in self.store.jobs():
+            job["counts"] = self.store.counts(job["id"])
+            jobs.append(job)
+        leased = self.store.leased_by_worker()
+        now = time.time()
+        workers = [
+            {"name": name, "idle": round(now - w["seen"], 1), "done": w["done"], "errors": w["errors"],
+             "leased": leased.get(name, 0)}
+            for name, w in sorted(self.workers.items())
+        ]
+        return {"jobs": jobs, "workers": workers}
+
+    def _reap_loop(self):
+        while not self.stop_event.wait(min(REAP_INTERVAL, self.ttl / 4)):
+            try:
+                requeued, failed = self.store.requeue_expired()
+            except Exception as e:
+                append_log(f"Koordinator: icarə yoxlanışı alınmadı: {e}", "error")
+                continue
+            if requeued or failed:
+                append_log(
+                    f"Koordinator: müddəti keçmiş {requeued} icarə növbəyə qaytarıldı, {failed} video xəta sayıldı.",
+                    "warning",
+                )
+                self._notify()
+
+
+def _field(body, key):
+    """Sorğunun məcburi sahəsi; yoxdursa ValueError (→ 400)."""
+    if not isinstance(body, dict) or body.get(key) is None:
+        raise ValueError(f"'{key}' sahəsi lazımdır")
+    return body[key]
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class CoordinatorServer:
+    """Koordinatorun JSON API-si (bax modulun təsviri)."""
+
+    def __init__(self, coordinator, port=DEFAULT_PORT, host="127.0.0.1", token=None):
+        self.coordinator = coordinator
+        c = coordinator
+        routes = {
+            "/jobs": lambda b: {"id": c.submit(_field(b, "url"), b.get("fmt") or "mp4")},
+            "/job": lambda b: {"job": c.next_job(b["worker"])},
+            "/lease": lambda b: c.lease(b["worker"], b["job"], b.get("count", 1), b.get("wait", 0)),
+            "/heartbeat": lambda b: c.heartbeat(b["worker"], b["job"], b.get("items") or []),
+            "/complete": lambda b: c.complete(b["worker"], b["job"], b["idx"], b["status"], b.get("error")),
+            "/release": lambda b: c.release(b["worker"], b["job"], b.get("items") or []),
+        }
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def _reply(self, code, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _authorized(self):
+                # sabit vaxtlı müqayisə: cavab vaxtından token təxmin olunmasın
+                given = (self.headers.get(TOKEN_HEADER) or "").encode("utf-8")
+                if token and not hmac.compare_digest(given, token.encode("utf-8")):
+                    self._reply(403, {"error": "token yanlışdır"})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path.split("?")[0] != "/status":
+                    self._reply(404, {"error": "naməlum ünvan"})
+                    return
+                self._reply(200, c.status())
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                route = routes.get(self.path.split("?")[0])
+                if route is None:
+                    self._reply(404, {"error": "naməlum ünvan"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    result = route(body)
+                except (KeyError, TypeError, ValueError) as e:
+                    self._reply(400, {"error": f"yanlış sorğu: {e}"})
+                    return
+                self._reply(200, result)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _Server((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        append_log(f"Koordinator: http://{self.httpd.server_address[0]}:{self.port}")
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ümumi köməkçi funksiyalar: ölçü çevirmə, yt-dlp yoxlanışı (log — `log.py`, alətlər — `tools.py`).
+
+Bu modul Tkinter-dən asılı deyil — həm GUI, həm də headless rejim istifadə edir.
+"""
+
+import platform
+import re
+
+from .log import LOG_FILE, append_log  # noqa: F401 — köhnə import yolu
+from .tools import discover, download_yt_dlp
+
+# winsound yalnız Windows üçün
+if platform.system().lower() == "windows":
+    try:
+        import winsound
+    except Exception:
+        winsound = None
+else:
+    winsound = None
+
+APP_TITLE = "YouTube Ultra Downloader v2.1"
+
+PCT_RE = re.compile(
+    r"(?P<pct>\d{1,3}(?:\.\d+)?)%\s+of\s+(?P<total>\d+(?:\.\d+)?)(?P<unit>KiB|MiB|GiB|KB|MB|GB)",
+    re.IGNORECASE,
+)
+PCT_APPROX_RE = re.compile(
+    r"(?P<pct>\d{1,3}(?:\.\d+)?)%\s+of\s+~?\s*(?P<total>\d+(?:\.\d+)?)(?P<unit>KiB|MiB|GiB|KB|MB|GB)",
+    re.IGNORECASE,
+)
+PCT_ALT_RE = re.compile(r"download\s+(?P<pct>\d{1,3}(?:\.\d+)?)%", re.IGNORECASE)
+
+
+def human_to_mb(value: float, unit: str) -> float:
+    unit = unit.lower()
+    v = float(value)
+    if unit in ("kib", "kb"):
+        return v / 1024.0
+    if unit in ("mib", "mb"):
+        return v
+    if unit in ("gib", "gb"):
+        return v * 1024.0
+    return v
+
+
+def parse_progress_line(line):
+    """Bir yt-dlp `--newline` sətrindən (percent, mb) qaytarır; tapılmasa None."""
+    m = PCT_RE.search(line) or PCT_APPROX_RE.search(line) or PCT_ALT_RE.search(line)
+    if not m:
+        return None
+    try:
+        pct = float(m.group("pct"))
+    except Exception:
+        pct = 0.0
+
+    downloaded_mb = None
+    try:
+        if m.re is not PCT_ALT_RE:
+            total_mb = human_to_mb(float(m.group("total")), m.group("unit"))
+            downloaded_mb = total_mb * (pct / 100.0)
+    except Exception:
+        downloaded_mb = None
+    return pct, downloaded_mb
+
+
+def play_sound_notification():
+    try:
+        if winsound:
+            winsound.MessageBeep(winsound.MB_ICONINFORMATION)
+        else:
+            print("\a")
+    except Exception:
+        pass
+
+
+def yt_dlp_yoxla_ve_endir():
+    """yt-dlp-nin yolu: proqram qovluğu, PATH (keşlə — bax `tools.py`), yoxdursa endirilir."""
+    entry = discover("yt-dlp")
+    if entry is not None:
+        return entry["path"]
+    exe_path = download_yt_dlp()
+    if exe_path is None:
+        print("yt-dlp endirilə bilmədi.")
+    return exe_path
@@ -0,0 +1,1028 @@
+# -*- coding: utf-8 -*-
+
+"""
+GUI-dən asılı olmayan yükləmə mühərriki.
+
+Növbə, worker thread-lər, yt-dlp prosesinin idarəsi və irəliləyiş izlənməsi
+burada yaşayır. GUI (və ya headless CLI) mühərrikə `subscribe` ilə qoşulub
+hadisələri alır:
+
+    ("job",      None, {"url", "fmt", "output_dir", "resume"[, "batch"]})
+    ("queued",   idx, {"title", "url", "playlist", "video_id", "duration", "size"})
+    ("status",   idx, {"status"[, "skipped"]}) # downloading / done / error
+    ("progress", idx, {"percent", "mb", "speed", "eta", "phase", "filename"})
+    ("finished", idx, {"returncode"})
+    ("listed",   None, {["added", "removed"]}) # playlist tam oxundu (+ keşə görə fərq, id siyahıları)
+    ("cleared",  None, {})
+    ("idle",     None, {})                    # bütün worker-lər çıxdı
+    ("concurrency", None, {"workers", "previous", "reason", "mbps", "errors", "load"})
+    ("utilization", None, {"download", "post", "blocked", "queue", "queue_max", "bottleneck", "final"})
+    ("retry",    idx, {"attempt", "delay", "kind", "error"}) # video yenidən növbəyə qayıdacaq
+    ("throttle", None, {"active", "cooldown"})  # throttling qoruyucusu açıldı/bağlandı
+    ("disk",     None, {"active"[, "path", "needed", "free"]}) # diskdə yer çatmır / yenə var
+
+Status sayğacları (`counts()`) hər keçiddə artımla yenilənir, ona görə
+sorğu O(1)-dir. İrəliləyiş sətirləri ümumi lock götürmür: hər videonun
+`video_info` yazısına yalnız onu yükləyən worker toxunur.
+
+`index` (DownloadIndex) verilərsə artıq yüklənmiş videolar növbəyə düşmür,
+uğurla bitənlər isə indeksə yazılır. `journal.Journal` listener-i bu
+hadisələri diskə yazır, `resume_job()` isə yarımçıq işi oradan bərpa edir.
+`cache` (PlaylistCache) verilərsə TTL daxilində playlist yt-dlp çağırılmadan
+keşdən açılır; hər videonun müddəti və təxmini ölçüsü `video_info`-da olur.
+`changed_only=True` olduqda siyahı keşə baxmadan yenidən oxunur və yalnız
+əvvəlki siyahıda olmayan (əlavə olunan) entry-lər növbəyə düşür; silinənlər
+indeksdə `mark_removed` ilə qeyd olunur.
+`auto_tune=True` olduqda `threads` yuxarı həddir: işçi sayını `ConcurrencyTuner`
+ölçülmüş sürət, xəta və CPU yükünə görə `set_concurrency()` ilə dəyişir.
+
+ffmpeg tapılarsa (və ya `pipeline=True`) konveyer rejimi işləyir: worker-lər
+yalnız xam axınları endirir, birləşdirmə/transkod `pipeline.PostProcessStage`-də
+CPU nüvələri qədər ffmpeg prosesində gedir. "idle" hər iki mərhələ boşalanda
+göndərilir; mərhələ yükləri `utilization` hadisəsi ilə bildirilir.
+
+Pauza və dayandırma `procs.ProcessController` vasitəsilə bütün yt-dlp/ffmpeg
+proses qruplarına siqnal kimi çatır (SIGSTOP/SIGCONT, SIGTERM→SIGKILL);
+worker-lər, pauza nöqtələri və `wait()` hadisələrdə bloklanır, poll etmir.
+Dayandırılan videolar "queued" statusuna qayıdır; `clean_parts=True` olduqda
+onların `.part` faylları silinir (default: saxlanılır ki, bərpa davam etsin).
+`bandwidth` (bandwidth.BandwidthScheduler) verilərsə ümumi sürət limiti aktiv
+yükləmələr arasında bölünür; emal mərhələsindəki videolar pay tutmur.
+
+Növbə FIFO deyil, `scheduler.VideoQueue`-dur: `order` siyasəti (playlist,
+shortest, largest) flat-playlist-in müddət/ölçü sahələrinə görə sıralayır,
+`set_priority()` isə növbədəki videonu işləyərkən önə/sona keçirir.
+
+`fmt` bir neçə format ola bilər ("mp4+mp3+wav", bax `parse_formats`): konveyer
+rejimində video bir dəfə xam axınlar kimi endirilir, hər format emal
+mərhələsində ayrıca ffmpeg prosesində paralel çıxarılır — şəbəkə trafiki
+format sayından asılı olmur. İndeksdə hər format ayrıca qeyd olunur.
+
+Uğursuz yükləmənin növü yt-dlp çıxışından təyin olunur (`retry.classify`):
+keçici xətalar `retry` (RetryPolicy) üzrə eksponensial gözləmə + jitter ilə
+yenidən növbəyə düşür, qalıcı xətalar indeksə yazılır və sonrakı işlərdə
+atlanır (`retry_failed=True` — yenə cəhd et). HTTP 429 kimi throttling
+`breaker`-i (CircuitBreaker) açır: cooldown bitənə qədər heç bir worker yeni
+video götürmür.
+
+Hər video başlamazdan əvvəl təxmini ölçüsü qədər yer `disk` (storage.DiskBudget)
+üzrə rezerv olunur; yer çatmırsa worker başqa videoların bitməsini və ya
+diskin boşalmasını gözləyir, rezerv video "downloading"-dən çıxanda buraxılır.
+`scratch_dir` verilərsə yükləmə və emal orada, hər video üçün ayrıca alt
+qovluqda gedir, hazır fayllar `output_dir`-ə atomik köçürülür (storage.Stager);
+eyni həcmə eyni anda `final_writes` köçürmə yazır.
+"""
+
+import collections
+import glob
+
+import os
+import re
+import subprocess
+import threading
+
+from .log import append_log, log_enabled
+from .backends import SubprocessBackend
+from .cache import estimate_size, slim_entry
+from .index import file_present
+from .pipeline import PostGroup, PostJob, PostProcessStage, StageMeter, UtilizationReporter, find_ffmpeg, raw_base, raw_files
+from .playlist import entry_url, is_playlist_entry, iter_entries
+from .procs import Cancelled, ProcessController
+from .retry import PERMANENT, THROTTLE, THROTTLE_COOLDOWN, CircuitBreaker, RetryPolicy, classify, last_error
+from .scheduler import PIN_TOP, VideoQueue
+from .storage import FINAL_WRITES, MIN_FREE, RECHECK, UNKNOWN_SIZE, DiskBudget, Stager, VolumeLimiter
+from .tuner import ConcurrencyTuner
+
+FORMATS = ("mp4", "mp3", "wav")
+MAX_THREADS = 50
+STATUSES = ("queued", "downloading", "done", "error")
+# "yalnız yenilər" rejimində bu qədər ardıcıl məlum video görüləndə siyahı oxunması dayanır
+SYNC_BREAK_AFTER = 10
+# xətanın təsnifatı üçün saxlanılan son çıxış sətirləri
+MESSAGE_TAIL = 30
+
+
+def parse_formats(fmt):
+    """"mp4+mp3", "mp4,mp3" və ya ["mp4", "mp3"] → ("mp4", "mp3") — FORMATS sırası ilə, təkrarsız."""
+    items = fmt if isinstance(fmt, (list, tuple)) else re.split(r"[+,\s]+", fmt or "")
+    chosen = {f.strip().lower() for f in items if f.strip()}
+    unknown = chosen - set(FORMATS)
+    if unknown or not chosen:
+        raise ValueError(f"Naməlum format: {', '.join(sorted(unknown)) or fmt!r}")
+    return tuple(f for f in FORMATS if f in chosen)
+
+
+def format_key(formats):
+    return "+".join(formats)
+
+
+class DownloadEngine:
+    def __init__(self, yt_dlp, output_dir=None, fmt="mp4", threads=8, backend=None, index=None, only_new=False,
+                 cache=None, auto_tune=False, pipeline=None, post_workers=None, clean_parts=False,
+                 bandwidth=None, order="playlist", retry=None, retry_failed=False,
+                 throttle_cooldown=THROTTLE_COOLDOWN, scratch_dir=None, min_free=MIN_FREE,
+                 final_writes=FINAL_WRITES, changed_only=False, disk_recheck=RECHECK):
+        self.yt_dlp = yt_dlp
+        self.backend = backend or SubprocessBackend(yt_dlp)
+        self.index = index
+        self.cache = cache
+        self.only_new = only_new
+        self.changed_only = changed_only
+        self.output_dir = output_dir or os.getcwd()
+        self.fmt = fmt
+        self.max_threads = threads
+        self.auto_tune = auto_tune
+        self.tuner = None
+        self.clean_parts = clean_parts
+        self.bandwidth = bandwidth
+        self.retry = retry or RetryPolicy()
+        self.retry_failed = retry_failed
+        self.breaker = CircuitBreaker(throttle_cooldown, on_change=self._throttle_changed)
+        # backend-in proses nəzarətçisi ffmpeg emalı ilə paylaşılır
+        self.procs = getattr(self.backend, "procs", None) or ProcessController()
+        # min_free=None — disk yoxlaması söndürülür; yer gözləyən video diski `disk_recheck` san.-dən bir yoxlayır
+        self.disk = DiskBudget(min_free, recheck=disk_recheck) if min_free is not None else None
+        self.disk_short = None  # (qovluq, lazım, boş) — yer gözlənilərkən
+        self.limiter = VolumeLimiter(final_writes)
+        self.set_scratch(scratch_dir)
+
+        # konveyer: None — ffmpeg varsa avtomatik
+        ffmpeg = find_ffmpeg() if pipeline is not False else None
+        if pipeline and not ffmpeg:
+            append_log("ffmpeg tapılmadı — konveyer rejimi söndürüldü.")
+        self.post = None
+        if ffmpeg:
+            self.post = PostProcessStage(
+                ffmpeg,
+                self._post_done,
+                on_start=self._post_start,
+                on_settled=self._maybe_idle,
+                workers=post_workers,
+                procs=self.procs,
+            )
+        self.download_meter = StageMeter(threads)
+        self.reporter = None
+
+        # iş üçün struktur
+        self.q = VideoQueue(lambda idx: self.video_info.get(idx), order)
+        self.stop_event = threading.Event()
+        self.pause_event = threading.Event()
+        # pause_event-in əksi: pauza nöqtələri bunun üzərində bloklanır
+        self.unpaused = threading.Event()
+        self.unpaused.set()
+        self.listing_done = threading.Event()
+        self.listing_done.set()
+        self.threads = []
+        self.video_info = {}
+        self.lock = threading.Lock()
+        self.total_videos = 0
+        self._active_workers = 0
+        self._idle = threading.Event()
+        self._idle_sent = False
+        self._counts = dict.fromkeys(STATUSES, 0)
+        self._retry_timers = {}  # idx → təkrar cəhdi gözləyən Timer
+
+        self._listeners = []
+
+    @property
+    def formats(self):
+        return parse_formats(self.fmt)
+
+    @property
+    def source_format(self):
+        """Bir dəfə endirilən mənbə: mp4 seçilibsə video+audio, yoxsa yalnız audio."""
+        formats = self.formats
+        return "mp4" if "mp4" in formats else formats[0]
+
+    # ---------------- Hadisələr ----------------
+    def subscribe(self, callback):
+        """callback(event, idx, data) — worker thread-lərindən çağırıla bilər."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def emit(self, event, idx=None, **data):
+        for cb in list(self._listeners):
+            try:
+                cb(event, idx, data)
+            except Exception as e:
+                append_log(f"Listener xətası ({event}): {e}")
+
+    def set_status(self, idx, status):
+        with self.lock:
+            info = self.video_info.get(idx)
+            if info is not None:
+                old = info["status"]
+                if old in self._counts:
+                    self._counts[old] -= 1
+                info["status"] = status
+                self._counts[status] = self._counts.get(status, 0) + 1
+        if self.disk is not None and status != "downloading":
+            self.disk.release(idx)
+        self.emit("status", idx, status=status)
+
+    # ---------------- Playlist hazırlığı ----------------
+    def add_video(self, idx, url, title, playlist=False, video_id=None, status="queued", skipped=False,
+                  duration=None, size=None, output_dir=None, position=None):
+        """
+        Yalnız "queued" status-lu video növbəyə düşür. `skipped=True` — video
+        artıq yüklənib (indeksdə var) və bitmiş kimi göstərilir. `size` (bayt)
+        verilməyibsə müddətə və formata görə təxmin olunur. `output_dir` və
+        `position` (fayl adındakı sıra nömrəsi) verilməyibsə `self.output_dir`
+        və `idx` işlənir (toplu işdə idx bütün playlistlər üzrə ümumidir).
+        """
+        if size is None:
+            size = estimate_size(duration, self.source_format)
+        with self.lock:
+            old = self.video_info.get(idx)
+            if old is not None:
+                self._counts[old["status"]] -= 1
+            else:
+                self.total_videos += 1
+            self.video_info[idx] = {
+                "url": url,
+                "title": title,
+                "playlist": playlist,
+                "video_id": video_id,
+                "status": status,
+                "duration": duration,
+                "size": size,
+                "percent": 100.0 if status == "done" else 0.0,
+                "mb": 0.0,
+                "priority": old.get("priority", 0) if old is not None else 0,
+                "output_dir": output_dir,
+                "position": position,
+            }
+            self._counts[status] += 1
+        self.emit(
+            "queued", idx, title=title, url=url, playlist=playlist, video_id=video_id, duration=duration, size=size
+        )
+        if status == "queued":
+            self.q.put((idx, url))
+        elif skipped:
+            self.emit("status", idx, status=status, skipped=True)
+        else:
+            self.emit("status", idx, status=status)
+
+    def _begin_job(self, url, start_threads, resume=False, batch=None):
+        self.clear()
+        self.breaker.reset()
+        self.stop_event.clear()
+        self.listing_done.clear()
+        if batch:
+            self.emit("job", url=url, fmt=self.fmt, output_dir=self.output_dir, resume=resume, batch=batch)
+        else:
+            self.emit("job", url=url, fmt=self.fmt, output_dir=self.output_dir, resume=resume)
+        if start_threads is not None:
+            self.start(start_threads)
+
+    def prepare_playlist(self, url, start_threads=None):
+        """
+        Linki yt-dlp ilə axın şəklində oxuyub videoları gəldikcə növbəyə qoyur.
+
+        `start_threads` verilərsə worker-lər siyahı oxunmağa başlamazdan əvvəl
+        işə düşür və 1-ci video dərhal yüklənir. Siyahı bitənə qədər worker-lər
+        boş növbədə çıxmır. Heç bir video gəlmədən yt-dlp xəta ilə bitərsə
+        CalledProcessError çağırana ötürülür.
+
+        İndeksdə olan videolar atlanır. `only_new` rejimində onlar siyahıya
+        heç əlavə olunmur və SYNC_BREAK_AFTER ardıcıl məlum video görüləndə
+        oxunma dayanır — yeni videoları əvvəldə verən kanal/lent linklərində
+        sinxronun qiyməti yalnız yeni videoların sayına bağlı olur.
+        """
+        self._begin_job(url, start_threads)
+        skipped = self._enumerate(url)
+        new_count = self.total_videos - (0 if self.only_new else skipped)
+        if self.index and not self.stop_event.is_set():
+            self.index.mark_synced(url, self.fmt, self.output_dir, new_count)
+        append_log(f"{self.total_videos} video aşkarlandı ({skipped} artıq yüklənib, {new_count} yeni).")
+        return self.total_videos
+
+    def begin_feed(self, url, start_threads=None, batch=None):
+        """
+        Siyahısı kənardan verilən iş (koordinator node-u, bax `node.py`; toplu
+        iş, bax `batch.py` — `batch` onun linkləridir): videolar `add_video` ilə
+        gəlir, worker-lər `end_feed()`-ə qədər boş növbədə çıxmır.
+        """
+        self._begin_job(url, start_threads, batch=batch)
+
+    def end_feed(self):
+        self._listing_finished()
+        self.emit("listed")
+
+    def _enumerate(self, url, first=1):
+        """Siyahını `first`-ci entry-dən oxuyub növbəyə qoyur; atlanan (indeksdə olan) videoların sayını qaytarır."""
+        known = self._done_paths() if self.index else {}
+        failed = self.index.failures() if self.index and not self.retry_failed else {}
+        # dəyişiklik rejimində fərq üçün siyahı həmişə yenidən oxunur
+        cached = self.cache.fresh(url) if self.cache and not self.changed_only else None
+        previous = {}
+        collected = None
+        if cached is not None:
+            append_log(f"Playlist keşdən açıldı ({len(cached)} entry), yt-dlp çağırılmadı.")
+            entries = iter(cached[first - 1:])
+        else:
+            entries = iter_entries(self.yt_dlp, url, self.stop_event, start=first)
+            if self.cache:
+                old = self.cache.get(url)
+                if old:
+                    previous = {e.get("id"): e for e in old[0]}
+                # yalnız tam siyahı keşə yazılır
+                if first == 1:
+                    collected = []
+        if self.changed_only and first == 1:
+            if previous:
+                append_log(f"Dəyişiklik rejimi: əvvəlki siyahıdakı {len(previous)} entry növbəyə qoyulmayacaq.")
+            else:
+                append_log("Dəyişiklik rejimi: keşdə əvvəlki siyahı yoxdur — bütün entry-lər emal olunur.")
+        skipped = streak = failed_count = unchanged = 0
+        complete = False
+        try:
+            for i, e in enumerate(entries, first):
+                if self.stop_event.is_set():
+                    break
+                vid = e.get("id")
+                old = previous.get(vid)
+                if old is not None:
+                    # flat entry-də olmayan metadata-nı köhnə yazıdan götürürük
+                    for k in ("duration", "filesize_approx"):
+                        if e.get(k) is None and old.get(k) is not None:
+                            e[k] = old[k]
+                if collected is not None:
+                    collected.append(slim_entry(e))
+                if self.changed_only and old is not None:
+                    unchanged += 1
+                    continue
+                done = vid in known and file_present(known[vid])
+                if done:
+                    skipped += 1
+                    streak += 1
+                    if self.only_new:
+                        if streak >= SYNC_BREAK_AFTER:
+                            append_log(f"{streak} ardıcıl məlum video — siyahı oxunması dayandırıldı.")
+                            break
+                        continue
+                else:
+                    streak = 0
+                # əvvəlki işdə qalıcı xəta (gizli/silinmiş video): yenidən cəhd edilmir
+                failed_before = not done and vid in failed
+                if failed_before:
+                    failed_count += 1
+                self.add_video(
+                    i,
+                    entry_url(e),
+                    e.get("title") or f"Video {i}",
+                    is_playlist_entry(e),
+                    vid,
+                    status="done" if done else "error" if failed_before else "queued",
+                    skipped=done,
+                    duration=e.get("duration"),
+                    size=e.get("filesize_approx"),
+                )
+            else:
+                complete = True
+        finally:
+            if cached is None:
+                entries.close()
+            self._listing_finished()
+        if failed_count:
+            append_log(f"{failed_count} video əvvəlki qalıcı xəta səbəbindən atlandı.")
+        if unchanged:
+            append_log(f"{unchanged} dəyişməmiş entry atlandı (dəyişiklik rejimi).")
+        if self.stop_event.is_set():
+            return skipped
+        diff = {}
+        if collected is not None and complete:
+            try:
+                added, removed = self.cache.put(url, collected)
+            except Exception as e:
+                append_log(f"Playlist keşi yazıla bilmədi: {e}")
+            else:
+                if previous:
+                    diff = {"added": added, "removed": removed}
+                    append_log(f"Keşlə fərq: {len(added)} yeni, {len(removed)} silinmiş entry.")
+                    self._mark_removed(url, added, removed, previous)
+        self.emit("listed", **diff)
+        return skipped
+
+    def _mark_removed(self, url, added, removed, previous):
+        for vid in removed:
+            title = previous.get(vid, {}).get("title") or vid
+            append_log(f"Playlistdən silinib: {title}", "debug", video_id=vid)
+        if self.index and (added or removed):
+            try:
+                self.index.mark_removed(url, removed, added)
+            except Exception as e:
+                append_log(f"İndeks yazıla bilmədi: {e}", "error")
+
+    def _done_paths(self):
+        """{video_id: fayl} — seçilmiş formatların hamısında artıq yüklənmiş videolar."""
+        maps = [self.index.done_paths(f, self.output_dir) for f in self.formats]
+        first, rest = maps[0], maps[1:]
+        return {vid: path for vid, path in first.items() if all(vid in m for m in rest)}
+
+    def resume_job(self, state, start_threads=None):
+        """
+        Jurnaldan bərpa olunmuş işi (`journal.JobState`) yenidən növbəyə qoyur.
+        Bitmiş/xətalı videolar olduğu kimi göstərilir, qalanları yüklənir;
+        siyahı tam oxunmamışdısa, qalan hissə kəsildiyi yerdən davam edir.
+        """
+        self.fmt = state.fmt or self.fmt
+        self.output_dir = state.output_dir or self.output_dir
+        self._begin_job(state.url, start_threads, resume=True)
+
+        queued = partial = 0
+        for idx in sorted(state.items):
+            it = state.items[idx]
+            status = it["status"] if it["status"] in ("done", "error") else "queued"
+            self.add_video(
+                idx, it["url"], it["title"], it["playlist"], it["video_id"], status=status,
+                duration=it.get("duration"), size=it.get("size"),
+            )
+            if status == "queued":
+                queued += 1
+                if it.get("filename") and os.path.exists(it["filename"] + ".part"):
+                    partial += 1
+        append_log(
+            f"İş bərpa olundu: {len(state.items)} video, {queued} növbədə, "
+            f"{partial} yarımçıq .part faylından davam edəcək."
+        )
+
+        if state.listed:
+            self._listing_finished()
+            self.emit("listed")
+        else:
+            try:
+                self._enumerate(state.url, first=max(state.items, default=0) + 1)
+            except subprocess.CalledProcessError as e:
+                append_log(f"Siyahının qalanı oxunmadı: {e.output}")
+        return self.total_videos
+
+    def _listing_finished(self):
+        self.listing_done.set()
+        # boş növbədə gözləyən worker-lər oyanıb çıxsın
+        self._wake_workers()
+
+    def clear(self):
+        with self.lock:
+            self.video_info.clear()
+            self._counts = dict.fromkeys(STATUSES, 0)
+        self.q.clear()
+        self._cancel_retries()
+        if self.disk is not None:
+            self.disk.clear()
+            self.disk_short = None
+        self.total_videos = 0
+        self.emit("cleared")
+        append_log("Tree və queue təmizləndi.")
+
+    # ---------------- İdarəetmə ----------------
+    def start(self, threads=None):
+        if threads is not None:
+            self.max_threads = threads
+        try:
+            self.max_threads = max(1, min(MAX_THREADS, int(self.max_threads)))
+        except Exception:
+            self.max_threads = 4
+
+        self.stop_event.clear()
+        self.resume()
+        self.threads = [t for t in self.threads if t.is_alive()]
+
+        if self.tuner is not None:
+            self.tuner.stop()
+            self.unsubscribe(self.tuner)
+            self.tuner = None
+        if self.auto_tune:
+            self.tuner = ConcurrencyTuner(self, ceiling=self.max_threads)
+            self.subscribe(self.tuner)
+            append_log(
+                f"Yükləmələr başladı. Paralel: avto ({self.tuner.start_workers}..{self.tuner.ceiling}), format: {self.fmt}"
+            )
+            self.max_threads = self.tuner.start_workers
+        else:
+            append_log(f"Yükləmələr başladı. Paralel: {self.max_threads}, format: {self.fmt}")
+        if len(self.formats) > 1 and self.post is None:
+            append_log(f"Bir neçə format ffmpeg konveyeri tələb edir — yalnız {self.formats[0]} yüklənəcək.", "warning")
+
+        with self.lock:
+            self._idle_sent = False
+            self._idle.clear()
+        self.download_meter = StageMeter(self.max_threads)
+        if self.post is not None:
+            self.post.reset_meters()
+            self.post.start()
+            if self.reporter is not None:
+                self.reporter.stop()
+            self.reporter = UtilizationReporter(self)
+            self.reporter.start()
+            append_log(f"Konveyer: emal mərhələsi {self.post.workers} ffmpeg prosesi, növbə {self.post.q.maxsize}.")
+        self._spawn(self.max_threads)
+        if self.tuner is not None:
+            self.tuner.start()
+
+    def _spawn(self, count):
+        for _ in range(count):
+            with self.lock:
+                self._active_workers += 1
+            t = threading.Thread(target=self.worker_loop, daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def set_concurrency(self, n):
+        """İşləyən işçi sayını dəyişir: çatışmayanlar işə salınır, artıqlar cari videodan sonra çıxır."""
+        n = max(1, min(MAX_THREADS, int(n)))
+        with self.lock:
+            self.max_threads = n
+            running = self._active_workers > 0 and not self.stop_event.is_set()
+            missing = n - self._active_workers if running else 0
+        self.download_meter.set_slots(n)
+        if missing > 0:
+            self._spawn(missing)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.tuner is not None:
+            self.tuner.stop()
+        # təmizləyirik queue-ni
+        self.q.clear()
+        self._cancel_retries()
+        self._wake_workers()
+        self.breaker.wake()
+        if self.disk is not None:
+            # işləyən videoların rezervləri artıq lazım deyil; yer gözləyən worker-lər
+            # növbəti yoxlamanı gözləmədən oyanıb çıxır
+            self.disk.clear()
+            self.disk.wake()
+            self.disk_short = None
+        # işləyən yt-dlp/ffmpeg prosesləri dərhal SIGTERM alır; pauzadakı worker-lər oyanır
+        killed = self.procs.terminate_all()
+        self.pause_event.clear()
+        self.unpaused.set()
+        if killed:
+            append_log(f"{killed} proses dayandırılır (SIGTERM, {self.procs.grace:.0f} san. sonra SIGKILL).")
+        if self.post is not None:
+            # xam faylları yüklənmiş, emalı başlamamış videolar CANCELLED ilə bitir:
+            # `_complete` onları (qrupun son üzvü bitəndə) növbəyə qaytarır
+            self.post.cancel_pending()
+            self._maybe_idle()
+        append_log("Bütün yükləmələr dayandırıldı.")
+
+    def pause(self):
+        self.pause_event.set()
+        self.unpaused.clear()
+        stopped = self.procs.pause()
+        append_log(f"Pauza: {stopped} proses dayandırıldı (SIGSTOP).")
+
+    def resume(self):
+        was_paused = self.pause_event.is_set()
+        self.pause_event.clear()
+        self.procs.resume()
+        self.unpaused.set()
+        if was_paused:
+            append_log("Davam: proseslər davam etdirildi (SIGCONT).")
+
+    def is_paused(self):
+        return self.pause_event.is_set()
+
+    def wait(self, timeout=None):
+        """Bütün worker-lər (və emal mərhələsi) bitənə qədər gözləyir (headless rejim üçün)."""
+        if not self.threads:
+            return True
+        # "idle" hadisəsi göndərildikdən sonra set olunur — avto rejimdə sonradan yaranan worker-lər də daxil
+        return self._idle.wait(timeout)
+
+    def counts(self):
+        with self.lock:
+            return dict(self._counts)
+
+    # ---------------- Yükləmə ----------------
+    def worker_loop(self):
+        while not self.stop_event.is_set():
+            with self.lock:
+                surplus = self._active_workers > self.max_threads
+                if surplus:
+                    self._active_workers -= 1
+            if surplus:
+                append_log("Worker thread çıxır (paralel sayı azaldıldı).")
+                return
+            # throttling qoruyucusu açıqdırsa yeni video götürülmür
+            permit = self.breaker.acquire(self.stop_event)
+            if not permit:
+                break
+            item = self._next_item()
+            if item is None:
+                if permit == "probe":
+                    self.breaker.release()
+                break
+            idx, url = item
+            try:
+                if self._admit(idx):
+                    self.run_download(idx, url)
+            except Exception as e:
+                append_log(f"Error download: {e}", "error", idx=idx)
+                self.set_status(idx, "error")
+            finally:
+                self.q.task_done()
+                if permit == "probe":
+                    self.breaker.release()
+        append_log("Worker thread çıxır.")
+        with self.lock:
+            self._active_workers -= 1
+            last = self._active_workers == 0
+        if last:
+            self._maybe_idle()
+
+    def _next_item(self):
+        """
+        Növbədən növbəti video; işləməyə ehtiyac qalmayıbsa (dayandırılıb və ya
+        siyahı bitib, növbə boşdur, təkrar cəhd gözləyən yoxdur) None. Timeout
+        yoxdur: worker `put`, `stop()`, siyahının və təkrarların bitməsi ilə oyanır.
+        """
+        # təkrar cəhdi gözləyən videolar varsa worker-lər çıxmır
+        return self.q.take(
+            lambda: self.stop_event.is_set() or (self.listing_done.is_set() and not self._retry_timers)
+        )
+
+    def _wake_workers(self):
+        self.q.wake()
+
+    # ---------------- Növbə sırası ----------------
+    def set_order(self, policy):
+        """Növbə siyasətini dəyişir (scheduler.POLICIES); növbədəki videolar dərhal yenidən sıralanır."""
+        self.q.set_policy(policy)
+        append_log(f"Növbə sırası: {policy}")
+
+    def set_priority(self, idx, priority):
+        """
+        Videonun prioritetini dəyişir: böyük əvvəl, 0 — siyasətə görə, mənfi — sona.
+        Növbədəki video yerini dərhal dəyişir (True); deyilsə prioritet yenidən növbəyə düşəndə tətbiq olunur.
+        """
+        info = self.video_info.get(idx)
+        if info is None:
+            return False
+        info["priority"] = int(priority)
+        moved = self.q.reprioritize(idx)
+        if moved:
+            append_log(f"Prioritet dəyişdi: {priority}", idx=idx)
+        return moved
+
+    def withdraw(self, idx):
+        """
+        Videonu növbədən götürür (məs. icarəsi başqa node-a keçib); növbədə
+        deyilsə False. Status "queued" qalır — video bu işdə yüklənmir.
+        """
+        removed = self.q.discard(idx)
+        if removed:
+            append_log("Video növbədən götürüldü.", idx=idx)
+        return removed
+
+    def pin(self, idx):
+        """Videonu növbənin ən başına qoyur (ən son pin olunan ən əvvəl çıxır)."""
+        with self.lock:
+            top = max((i.get("priority", 0) for i in self.video_info.values()), default=0)
+        return self.set_priority(idx, max(top + 1, PIN_TOP))
+
+    def _maybe_idle(self):
+        # "idle" yalnız yükləmə worker-ləri çıxıb emal növbəsi də boşalanda, bir dəfə
+        with self.lock:
+            idle = self._active_workers == 0 and not self._idle_sent
+            if idle and self.post is not None and self.post.pending > 0:
+                idle = False
+            if idle:
+                self._idle_sent = True
+        if not idle:
+            return
+        if self.reporter is not None:
+            self.reporter.stop()
+            self.reporter.report(final=True)
+        self.emit("idle")
+        self._idle.set()
+
+    # ---------------- Disk yeri ----------------
+    def _disk_needs(self, idx):
+        """{qovluq: bayt} — videonun yükləmə və emal üçün tələb etdiyi təxmini yer."""
+        info = self.video_info.get(idx, {})
+        source = info.get("size") or UNKNOWN_SIZE
+        duration = info.get("duration")
+        outputs = sum(estimate_size(duration, f) or source for f in self.formats)
+        # emal vaxtı mənbə (xam axınlar) və hazır formatlar diskdə birlikdə olur
+        if self.stager is None:
+            return {self.dest_dir(idx): source + outputs}
+        return {self.stager.scratch: source + outputs, self.dest_dir(idx): outputs}
+
+    def _admit(self, idx):
+        """
+        Videonun yerini rezerv edir; yer çatmırsa digər videoların bitməsini və
+        ya diskin boşalmasını gözləyir. Dayandırılıbsa False.
+        """
+        if self.disk is None:
+            return True
+        needs = self._disk_needs(idx)
+        while not self.stop_event.is_set():
+            try:
+                self.wait_if_paused()
+            except Cancelled:
+                return False
+            try:
+                short = self.disk.reserve(idx, needs)
+            except OSError as e:
+                append_log(f"Disk yoxlanılmadı: {e}", "warning", idx=idx)
+                return True
+            if short is None:
+                if self.disk_short is not None:
+                    self.disk_short = None
+                    append_log("Diskdə yer var, yükləmələr davam edir.")
+                    self.emit("disk", active=False)
+                return True
+            # digər videolar işləyirsə onların rezervi buraxılanda yenə yoxlanır — bu normal haldır
+            if self.disk_short is None and not self.disk.active():
+                path, needed, free = short
+                self.disk_short = short
+                append_log(
+                    f"Diskdə yer çatmır: {path} — lazım {needed / 2**20:.0f} MB, boş {free / 2**20:.0f} MB "
+                    f"(ehtiyat {self.disk.min_free / 2**20:.0f} MB). Yer boşalana qədər gözlənilir.",
+                    "warning",
+                    idx=idx,
+                )
+                self.emit("disk", active=True, path=path, needed=needed, free=free)
+            self.disk.wait()
+        return False
+
+    def recheck_disk(self):
+        """Yer gözləyən videolar diski dərhal yoxlasın (kənarda yer boşaldılanda)."""
+        if self.disk is not None:
+            self.disk.wake()
+
+    def dest_dir(self, idx):
+        """Videonun son qovluğu: toplu işdə hər playlistin öz qovluğu var."""
+        return self.video_info.get(idx, {}).get("output_dir") or self.output_dir
+
+    def set_scratch(self, scratch_dir):
+        """Müvəqqəti qovluq (iş başlamazdan əvvəl); None — yükləmə birbaşa `output_dir`-ə."""
+        self.stager = Stager(scratch_dir, self.limiter) if scratch_dir else None
+
+    def _work_key(self, idx):
+        info = self.video_info.get(idx, {})
+        return info.get("video_id") or f"idx{idx}"
+
+    def _finalize(self, idx, info):
+        """Müvəqqəti qovluqdakı hazır faylları son qovluğa köçürür; uğursuzdursa False."""
+        try:
+            moved = self.stager.finalize(self._work_key(idx), self.dest_dir(idx))
+        except OSError as e:
+            info["error"] = f"Son qovluğa köçürülmədi: {e}"
+            append_log(info["error"], "error", idx=idx)
+            return False
+        finals = list(moved.values())
+
+        def remap(path):
+            if path in moved:
+                return moved[path]
+            # tək-mərhələli rejimdə irəliləyiş sətrindəki ad konvertasiyadan əvvəlki ola bilər
+            return finals[0] if len(finals) == 1 else path
+
+        if info.get("outputs"):
+            info["outputs"] = {fmt: remap(path) for fmt, path in info["outputs"].items()}
+        if info.get("filepath"):
+            info["filepath"] = remap(info["filepath"])
+        return True
+
+    def output_template(self, idx):
+        info = self.video_info.get(idx, {})
+        directory = self.dest_dir(idx)
+        if self.stager is not None:
+            # video öz alt qovluğunda: yarımçıq fayllar dayandırıb-davam edəndə tapılır
+            directory = self.stager.workdir(self._work_key(idx))
+        # əgər playlistdən gəlirsə, fayl adının əvvəlində sıra nömrəsi olsun
+        if idx and info.get("playlist"):
+            return os.path.join(directory, f"#{info.get('position') or idx:02d} - %(title)s.%(ext)s")
+        return os.path.join(directory, "%(title)s.%(ext)s")
+
+    def wait_if_paused(self):
+        """Pauza nöqtəsi: davam/dayandırma hadisəsinə qədər bloklanır; dayandırılıbsa Cancelled."""
+        self.unpaused.wait()
+        if self.stop_event.is_set():
+            raise Cancelled()
+
+    def run_download(self, idx, video_url):
+        # pause halında gözləyirik
+        try:
+            self.wait_if_paused()
+        except Cancelled:
+            return
+
+        info = self.video_info.get(idx, {})
+        info.update(percent=0.0, mb=0.0, speed=None, eta=None, phase="download")
+        self.set_status(idx, "downloading")
+        self.emit("progress", idx, percent=0.0, mb=0.0, speed=None, eta=None, phase="download")
+        append_log("Başladı", idx=idx, url=video_url)
+        raw = self.post is not None
+        log_progress = log_enabled("debug")
+        seen = []
+        messages = collections.deque(maxlen=MESSAGE_TAIL)
+        bandwidth = self.bandwidth
+
+        def on_progress(rec):
+            # lock-suz: bu sətrə yalnız cari worker yazır
+            if rec.percent is not None:
+                info["percent"] = rec.percent
+            mb = rec.mb
+            if mb is not None:
+                info["mb"] = mb
+            info["speed"], info["eta"], info["phase"] = rec.speed, rec.eta, rec.phase
+            if rec.filename:
+                info["filepath"] = rec.filename
+                if raw and rec.phase == "download":
+                    seen.append(rec.filename)
+            self.emit(
+                "progress",
+                idx,
+                percent=rec.percent,
+                mb=mb,
+                speed=rec.speed,
+                eta=rec.eta,
+                phase=rec.phase,
+                filename=rec.filename,
+            )
+            if log_progress:
+                append_log(
+                    "İrəliləyiş", "debug", idx=idx, phase=rec.phase, pct=rec.percent, mb=mb, speed=rec.speed, eta=rec.eta
+                )
+            if bandwidth is not None and rec.phase == "download":
+                hold = bandwidth.consume(idx, rec.downloaded)
+                if hold > 0:
+                    # subprocess: prosesi dondururuq; in-process: hook-u saxlayırıq
+                    self.procs.hold(hold, self.stop_event)
+
+        self.download_meter.enter()
+        if bandwidth is not None:
+            bandwidth.open(idx)
+        try:
+            return_code = self.backend.download(
+                video_url, self.source_format if raw else self.formats[0], self.output_template(idx), on_progress,
+                self.wait_if_paused, raw=raw,
+                on_message=messages.append,
+            )
+        except Cancelled:
+            return_code = -1
+        except Exception as e:
+            self.set_status(idx, "error")
+            append_log(f"Exception download: {e}", "error", idx=idx, url=video_url)
+            return
+        finally:
+            if bandwidth is not None:
+                bandwidth.close(idx)
+            self.download_meter.leave()
+
+        if return_code != 0 and self.stop_event.is_set() and self.clean_parts:
+            self._remove_parts(idx, [info.get("filepath")] + seen)
+        if return_code == 0:
+            self.breaker.ok()
+        elif not self.stop_event.is_set() and self._handle_failure(idx, video_url, list(messages)):
+            return
+        if raw and return_code == 0:
+            base = raw_base(seen[-1]) if seen else None
+            if base is None:
+                append_log("Xam fayl adı bilinmir, emal mümkün deyil.", "error", idx=idx)
+                return_code = 1
+            else:
+                info["phase"] = "postqueue"
+                self.emit("progress", idx, percent=None, mb=None, speed=None, eta=None, phase="postqueue")
+                # hər format ayrıca ffmpeg işidir; emal növbəsi doludursa burada gözləyirik (backpressure)
+                formats = self.formats
+                inputs = raw_files(base, seen)
+                group = PostGroup(len(formats)) if len(formats) > 1 else None
+                # stop()-dan sonra submit işi rədd edir (CANCELLED): qrupun bütün üzvləri yenə bitmiş sayılır
+                for fmt in formats:
+                    self.post.submit(PostJob(idx, video_url, fmt, base, inputs, group))
+                return
+        self._complete(idx, video_url, return_code)
+
+    # ---------------- Təkrar cəhdlər ----------------
+    def _handle_failure(self, idx, video_url, messages):
+        """Uğursuz yükləmə: təkrar planlaşdırılıbsa True; qalıcı xəta indeksə yazılır."""
+        kind = classify(messages)
+        error = last_error(messages)
+        if kind == THROTTLE:
+            self.breaker.trip()
+        else:
+            self.breaker.ok()
+        info = self.video_info.get(idx, {})
+        attempt = info.get("attempts", 0) + 1
+        if self.retry.allowed(kind, attempt):
+            info["attempts"] = attempt
+            # throttling-də gözləməni qoruyucu edir: video dərhal növbəyə qayıdır
+            delay = 0.0 if kind == THROTTLE else self.retry.delay(attempt)
+            self.set_status(idx, "queued")
+            self.emit("retry", idx, attempt=attempt, delay=delay, kind=kind, error=error)
+            append_log(
+                "Təkrar cəhd", "warning", idx=idx, url=video_url, kind=kind, attempt=attempt, delay=round(delay, 1),
+                error=error,
+            )
+            self._schedule_retry(idx, video_url, delay)
+            return True
+        info["error"] = error
+        info["error_kind"] = kind
+        if kind == PERMANENT and self.index:
+            try:
+                self.index.record_failure(info.get("video_id"), error, video_url)
+            except Exception as e:
+                append_log(f"İndeks yazıla bilmədi: {e}", "error", idx=idx)
+        append_log("Xəta", "error", idx=idx, url=video_url, kind=kind, attempts=attempt, error=error)
+        return False
+
+    def _schedule_retry(self, idx, video_url, delay):
+        with self.lock:
+            if self.stop_event.is_set():
+                return
+            timer = threading.Timer(delay, self._requeue, (idx, video_url))
+            timer.daemon = True
+            self._retry_timers[idx] = timer
+        timer.start()
+
+    def _requeue(self, idx, video_url):
+        with self.lock:
+            if idx not in self._retry_timers:
+                return  # ləğv olunub (stop/clear)
+            # əvvəl növbəyə, sonra sayğacdan: worker boş növbə + sıfır təkrar görüb çıxmasın
+            self.q.put((idx, video_url))
+            del self._retry_timers[idx]
+            last = not self._retry_timers
+        if last:
+            self._wake_workers()
+
+    def _cancel_retries(self):
+        with self.lock:
+            timers, self._retry_timers = list(self._retry_timers.values()), {}
+        for timer in timers:
+            timer.cancel()
+
+    def _throttle_changed(self, active, cooldown):
+        if active:
+            append_log(f"Throttling aşkarlandı: {cooldown:.0f} san. yeni yükləmə başlamayacaq.", "warning")
+        else:
+            append_log("Throttling qoruyucusu bağlandı, yükləmələr davam edir.")
+        self.emit("throttle", active=active, cooldown=round(cooldown, 1))
+
+    def _post_start(self, job):
+        info = self.video_info.get(job.idx)
+        if info is not None:
+            info["phase"] = "postprocess"
+        self.emit("progress", job.idx, percent=None, mb=None, speed=None, eta=None, phase="postprocess")
+
+    def _post_done(self, job, rc):
+        info = self.video_info.get(job.idx)
+        if info is not None and rc == 0:
+            outputs = job.group.outputs if job.group is not None else {job.fmt: job.output}
+            info["outputs"] = outputs
+            info["filepath"] = outputs.get(self.source_format, job.output)
+        self._complete(job.idx, job.url, rc)
+
+    def _remove_parts(self, idx, filenames):
+        removed = 0
+        for name in set(filter(None, filenames)):
+            for f in glob.glob(glob.escape(name) + ".part*") + glob.glob(glob.escape(name) + ".ytdl"):
+                try:
+                    os.remove(f)
+                    removed += 1
+                except OSError:
+                    pass
+        if removed:
+            append_log(f"{removed} yarımçıq fayl silindi.", idx=idx)
+
+    def _complete(self, idx, video_url, return_code):
+        info = self.video_info.get(idx, {})
+        if return_code != 0 and self.stop_event.is_set():
+            # istifadəçi dayandırdı: xəta deyil, video növbədə qalır
+            self.set_status(idx, "queued")
+            append_log("Dayandırıldı", idx=idx, url=video_url, rc=return_code)
+            return
+        if return_code == 0 and self.stager is not None and not self._finalize(idx, info):
+            # fayllar müvəqqəti qovluqda qalır
+            return_code = 1
+        if return_code == 0:
+            info["percent"] = 100.0
+            if self.index:
+                outputs = info.get("outputs") or {self.formats[0]: info.get("filepath")}
+                try:
+                    for fmt, path in outputs.items():
+                        self.index.record(info.get("video_id"), fmt, self.dest_dir(idx), path, info.get("title"), video_url)
+                except Exception as e:
+                    append_log(f"İndeks yazıla bilmədi: {e}", "error", idx=idx)
+            self.set_status(idx, "done")
+        else:
+            self.set_status(idx, "error")
+        append_log(
+            "Bitdi",
+            "info" if return_code == 0 else "error",
+            idx=idx,
+            url=video_url,
+            rc=return_code,
+            mb=round(info.get("mb") or 0.0, 2),
+        )
+        self.emit("finished", idx, returncode=return_code)
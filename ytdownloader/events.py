@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Worker-lərdən UI-yə irəliləyiş kanalı.
+
+Worker-lər `channel(event, idx, data)` ilə hadisəni deque-yə atır — heç bir
+ümumi lock götürülmür (deque.append atomikdir). UI öz thread-ində sabit
+kadr tezliyi ilə `drain()` çağırır: hər sətir üçün yalnız son dəyər saxlanılır,
+ümumi sayğaclar (bitən / xəta / MB) isə artımla yenilənir. Beləliklə bir UI
+"tick"-inin qiyməti playlistin ölçüsündən yox, son tick-dən bəri dəyişən
+sətirlərin sayından asılıdır.
+"""
+
+import collections
+
+
+class Frame:
+    """Bir drain nəticəsi: yeni sətirlər, sətir yenilənmələri, uğurla bitənlər."""
+
+    def __init__(self):
+        self.cleared = False
+        self.added = []
+        self.updates = {}
+        self.finished_ok = 0
+
+    def __bool__(self):
+        return bool(self.cleared or self.added or self.updates or self.finished_ok)
+
+
+class ProgressChannel:
+    def __init__(self):
+        self._events = collections.deque()
+        self._row_mb = {}
+        self.total_mb = 0.0
+
+    def __call__(self, event, idx, data):
+        self._events.append((event, idx, data))
+
+    def pending(self):
+        return len(self._events)
+
+    def drain(self, max_events=None):
+        """Yığılmış hadisələri birləşdirir; yalnız UI thread-indən çağırılmalıdır."""
+        frame = Frame()
+        events = self._events
+        n = len(events) if max_events is None else min(max_events, len(events))
+        for _ in range(n):
+            event, idx, data = events.popleft()
+            if event == "cleared":
+                frame = Frame()
+                frame.cleared = True
+                self._row_mb.clear()
+                self.total_mb = 0.0
+            elif event == "queued":
+                frame.added.append((idx, data))
+            elif event == "status":
+                row = frame.updates.setdefault(idx, {})
+                row["status"] = data.get("status")
+                if data.get("skipped"):
+                    row["skipped"] = True
+            elif event == "progress":
+                row = frame.updates.setdefault(idx, {})
+                if data.get("percent") is not None:
+                    row["percent"] = data["percent"]
+                row["speed"] = data.get("speed")
+                row["eta"] = data.get("eta")
+                row["phase"] = data.get("phase", "download")
+                mb = data.get("mb")
+                if mb is not None:
+                    row["mb"] = mb
+                    self.total_mb += mb - self._row_mb.get(idx, 0.0)
+                    self._row_mb[idx] = mb
+            elif event == "finished":
+                if data.get("returncode") == 0:
+                    frame.finished_ok += 1
+        return frame
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+Yüklənmiş videoların daimi SQLite indeksi.
+
+Açar (video id, format, çıxış qovluğu)-dur; yazı yalnız yükləmə rc=0 ilə
+bitəndə edilir. Növbəti işə salınmada `prepare_playlist` indeksə baxıb artıq
+yüklənmiş videoları "bitdi" kimi işarələyir və növbəyə qoymur — böyük, az
+dəyişən playlistlərin gecəlik sinxronu yalnız yeni videoları endirir.
+
+Playlistdən silinmiş videolar (keşlə fərq, bax `cache.PlaylistCache.put`)
+`removed` cədvəlində qeyd olunur; fayl və `downloads` yazısı toxunulmaz qalır,
+video siyahıya qayıdarsa qeyd silinir.
+
+Qalıcı xəta ilə bitən videolar (gizli, silinmiş — bax `retry.classify`)
+`failures` cədvəlinə yazılır və növbəti işlərdə yenidən cəhd edilmir; uğurlu
+yükləmə həmin yazını silir.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+INDEX_FILE = os.path.join(os.getcwd(), "ytdownloader_index.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    video_id    TEXT NOT NULL,
+    fmt         TEXT NOT NULL,
+    output_dir  TEXT NOT NULL,
+    filepath    TEXT,
+    title       TEXT,
+    url         TEXT,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (video_id, fmt, output_dir)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    source_url  TEXT NOT NULL,
+    fmt         TEXT NOT NULL,
+    output_dir  TEXT NOT NULL,
+    synced_at   REAL NOT NULL,
+    new_count   INTEGER NOT NULL,
+    PRIMARY KEY (source_url, fmt, output_dir)
+);
+CREATE TABLE IF NOT EXISTS removed (
+    source_url  TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    removed_at  REAL NOT NULL,
+    PRIMARY KEY (source_url, video_id)
+);
+CREATE TABLE IF NOT EXISTS failures (
+    video_id    TEXT PRIMARY KEY,
+    reason      TEXT,
+    url         TEXT,
+    failed_at   REAL NOT NULL
+);
+"""
+
+
+def norm_dir(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class DownloadIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        # worker thread-ləri eyni bağlantını lock altında paylaşır
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def record(self, video_id, fmt, output_dir, filepath=None, title=None, url=None):
+        if not video_id:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, fmt, norm_dir(output_dir), filepath, title, url, time.time()),
+            )
+            self._conn.execute("DELETE FROM failures WHERE video_id = ?", (video_id,))
+
+    def record_failure(self, video_id, reason=None, url=None):
+        if not video_id:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?)", (video_id, reason, url, time.time())
+            )
+
+    def failures(self):
+        """{video_id: səbəb} — qalıcı xəta ilə bitmiş videolar (format/qovluqdan asılı deyil)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT video_id, reason FROM failures").fetchall()
+        return dict(rows)
+
+    def forget(self, video_id, fmt, output_dir):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM downloads WHERE video_id = ? AND fmt = ? AND output_dir = ?",
+                (video_id, fmt, norm_dir(output_dir)),
+            )
+
+    def done_paths(self, fmt, output_dir):
+        """{video_id: filepath} — bir (format, qovluq) üçün bütün bitmiş videolar."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, filepath FROM downloads WHERE fmt = ? AND output_dir = ?",
+                (fmt, norm_dir(output_dir)),
+            ).fetchall()
+        return dict(rows)
+
+    def is_done(self, video_id, fmt, output_dir):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filepath FROM downloads WHERE video_id = ? AND fmt = ? AND output_dir = ?",
+                (video_id, fmt, norm_dir(output_dir)),
+            ).fetchone()
+        return row is not None and file_present(row[0])
+
+    def find(self, video_id, fmt):
+        """Videonun bu formatda istənilən qovluqdakı mövcud faylı (ən yenisi); yoxdursa None."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filepath FROM downloads WHERE video_id = ? AND fmt = ? ORDER BY finished_at DESC",
+                (video_id, fmt),
+            ).fetchall()
+        for (path,) in rows:
+            if path and os.path.exists(path):
+                return path
+        return None
+
+    def mark_synced(self, source_url, fmt, output_dir, new_count):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?, ?)",
+                (source_url, fmt, norm_dir(output_dir), time.time(), new_count),
+            )
+
+    def last_sync(self, source_url, fmt, output_dir):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM syncs WHERE source_url = ? AND fmt = ? AND output_dir = ?",
+                (source_url, fmt, norm_dir(output_dir)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_removed(self, source_url, removed, added=()):
+        """Siyahıdan silinən id-ləri qeyd edir, yenidən əlavə olunanların qeydini silir."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO removed VALUES (?, ?, ?)", [(source_url, v, now) for v in removed if v]
+            )
+            self._conn.executemany(
+                "DELETE FROM removed WHERE source_url = ? AND video_id = ?", [(source_url, v) for v in added if v]
+            )
+
+    def removed(self, source_url):
+        """Playlistdən silinmiş kimi qeyd olunmuş video id-ləri."""
+        with self._lock:
+            rows = self._conn.execute("SELECT video_id FROM removed WHERE source_url = ?", (source_url,)).fetchall()
+        return {r[0] for r in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def file_present(filepath):
+    # yol qeydə alınmayıbsa (köhnə yt-dlp) indeksə etibar edirik
+    return not filepath or os.path.exists(filepath)
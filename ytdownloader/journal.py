@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""
+Çökməyə davamlı iş jurnalı.
+
+Jurnal mühərrikin hadisələrinə qulaq asan, yalnız sona yazılan JSON-lines
+faylıdır. Hər sətir bir vəziyyət keçididir:
+
+    {"t": "job", "url": ..., "fmt": ..., "out": ...}   # yeni iş (fayl yenidən yaradılır)
+                                                        # toplu işdə + "batch": [link, ...]
+    {"t": "q", "i": 3, "u": url, "n": title, "p": 1, "v": video_id, "d": duration, "z": size}
+    {"t": "s", "i": 3, "s": "downloading" | "done" | "error"}
+    {"t": "b", "i": 3, "b": bytes, "f": filename}       # yüklənmiş bayt (seyrəldilmiş)
+    {"t": "listed"}                                     # playlist tam oxundu
+    {"t": "fin"}                                        # iş bitdi, bərpa lazım deyil
+
+Proqram bağlananda, çökəndə və ya elektrik kəsiləndə `replay()` faylı oxuyub
+yarımçıq işi qaytarır; `DownloadEngine.resume_job()` onu yenidən siyahıya salmadan
+növbəyə qoyur. Yarımçıq videolar eyni fayl adı ilə yenidən başladığı üçün
+yt-dlp `.part` faylından davam edir.
+
+Toplu iş (bax `batch.py`) buradan bərpa olunmur — hər videonun hansı
+qovluqlara lazım olduğu jurnalda yoxdur; eyni linklərlə yenidən başladılır,
+indeks bitmiş videoları atlayır, `.part` faylları isə yerində qalır.
+"""
+
+import json
+import os
+import threading
+import time
+
+JOURNAL_FILE = os.path.join(os.getcwd(), "ytdownloader_journal.jsonl")
+
+# bayt yazılarını seyrəltmək üçün: hər video üçün ən azı bu qədər irəliləyiş və ya vaxt
+BYTES_STEP = 4 * 1024 * 1024
+BYTES_INTERVAL = 2.0
+# flush tezliyi: çökmədə ən çox son FLUSH_INTERVAL saniyənin yazıları itir,
+# status keçidləri isə dərhal flush olunur
+FLUSH_INTERVAL = 0.05
+FSYNC_INTERVAL = 1.0
+MB = 1024.0 * 1024.0
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class JobState:
+    def __init__(self, url, fmt, output_dir):
+        self.url = url
+        self.fmt = fmt
+        self.output_dir = output_dir
+        self.listed = False
+        self.finished = False
+        self.batch = None
+        self.items = {}
+
+    def pending(self):
+        return sum(1 for it in self.items.values() if it["status"] not in ("done", "error"))
+
+    def resumable(self):
+        return not self.finished and not self.batch and (self.pending() > 0 or not self.listed)
+
+
+def replay(path=JOURNAL_FILE):
+    """Jurnaldakı son işin vəziyyəti; jurnal yoxdursa və ya boşdursa None."""
+    try:
+        f = open(path, encoding="utf-8")
+    except OSError:
+        return None
+    state = None
+    loads = json.loads
+    with f:
+        for line in f:
+            try:
+                rec = loads(line)
+            except ValueError:
+                # çökmə zamanı yarımçıq yazılmış son sətir
+                continue
+            t = rec.get("t")
+            if t == "b":
+                it = state.items.get(rec["i"]) if state else None
+                if it is not None:
+                    it["bytes"] = rec.get("b", 0)
+                    if rec.get("f"):
+                        it["filename"] = rec["f"]
+            elif t == "s":
+                it = state.items.get(rec["i"]) if state else None
+                if it is not None:
+                    it["status"] = rec["s"]
+            elif t == "q":
+                if state is not None:
+                    state.items[rec["i"]] = {
+                        "url": rec["u"],
+                        "title": rec.get("n", ""),
+                        "playlist": bool(rec.get("p")),
+                        "video_id": rec.get("v"),
+                        "duration": rec.get("d"),
+                        "size": rec.get("z"),
+                        "status": rec.get("s", "queued"),
+                        "bytes": 0,
+                        "filename": None,
+                    }
+            elif t == "job":
+                state = JobState(rec.get("url"), rec.get("fmt"), rec.get("out"))
+                state.batch = rec.get("batch")
+            elif t == "listed" and state is not None:
+                state.listed = True
+            elif t == "fin" and state is not None:
+                state.finished = True
+    return state
+
+
+class Journal:
+    """Mühərrik listener-i: `engine.subscribe(Journal())`."""
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self._f = None
+        self._lock = threading.Lock()
+        self._last_fsync = 0.0
+        self._last_flush = 0.0
+        self._last_bytes = {}
+        self._open_items = set()
+        self._listed = False
+
+    def __call__(self, event, idx, data):
+        if event == "job":
+            self._begin(data)
+        elif self._f is None:
+            return
+        elif event == "queued":
+            rec = {"t": "q", "i": idx, "u": data.get("url"), "n": data.get("title"), "v": data.get("video_id")}
+            if data.get("playlist"):
+                rec["p"] = 1
+            if data.get("duration"):
+                rec["d"] = data["duration"]
+            if data.get("size"):
+                rec["z"] = data["size"]
+            self._open_items.add(idx)
+            self._write(rec)
+        elif event == "status":
+            status = data.get("status")
+            if status in ("done", "error"):
+                self._open_items.discard(idx)
+                self._last_bytes.pop(idx, None)
+            self._write({"t": "s", "i": idx, "s": status}, sync=status != "downloading" and not data.get("skipped"))
+        elif event == "progress":
+            self._progress(idx, data)
+        elif event == "listed":
+            self._listed = True
+            self._write({"t": "listed"}, sync=True)
+        elif event == "idle":
+            if self._listed and not self._open_items:
+                self._write({"t": "fin"}, sync=True)
+                self.close()
+
+    def _begin(self, data):
+        header = {"t": "job", "url": data.get("url"), "fmt": data.get("fmt"), "out": data.get("output_dir")}
+        if data.get("batch"):
+            header["batch"] = data["batch"]
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+            # yeni iş: köhnə jurnalı atomik şəkildə əvəzləyirik
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(_encode(header) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._f = open(self.path, "a", encoding="utf-8")
+            self._last_bytes.clear()
+            self._open_items.clear()
+            self._listed = False
+
+    def _progress(self, idx, data):
+        mb = data.get("mb")
+        filename = data.get("filename")
+        if mb is None and not filename:
+            return
+        now = time.monotonic()
+        done = int((mb or 0.0) * MB)
+        last = self._last_bytes.get(idx)
+        if last is not None and not filename:
+            last_done, last_t = last
+            if done - last_done < BYTES_STEP and now - last_t < BYTES_INTERVAL:
+                return
+        self._last_bytes[idx] = (done, now)
+        rec = {"t": "b", "i": idx, "b": done}
+        if filename:
+            rec["f"] = filename
+        self._write(rec)
+
+    def _write(self, rec, sync=False):
+        line = _encode(rec) + "\n"
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(line)
+            now = time.monotonic()
+            if sync or now - self._last_flush >= FLUSH_INTERVAL:
+                self._f.flush()
+                self._last_flush = now
+                if sync and now - self._last_fsync >= FSYNC_INTERVAL:
+                    os.fsync(self._f.fileno())
+                    self._last_fsync = now
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                try:
+                    self._f.flush()
+                    os.fsync(self._f.fileno())
+                except OSError:
+                    pass
+                self._f.close()
+                self._f = None
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+Virtual video siyahısı.
+
+`ListModel` bütün sətirləri sadə dict-lərdə saxlayır (Tk-dan asılı deyil),
+`VirtualList` isə ttk.Treeview-da yalnız görünən pəncərə qədər sətir yaradır
+və scroll/yenilənmədə həmin "slot"-ları yenidən doldurur. Beləliklə 50 000
+videoluq siyahı da Tk tərəfində ~30 item-dir: doldurma, scroll və hər tick-in
+qiyməti siyahının ölçüsündən asılı olmur.
+
+Status üzrə filtr üçün hər status-un idx çoxluğu artımla saxlanılır — filtr
+yalnız o çoxluğu sıralayır, qalan sətirlərə toxunmur. Görünüş (`view()`)
+tənbəl hesablanır və yalnız sıra/filtrə təsir edən dəyişiklikdə yenilənir.
+"""
+
+try:
+    import tkinter as tk
+    from tkinter import ttk
+except ImportError:
+    tk = ttk = None
+
+STATUS_LABELS = {"queued": "Gözləyir", "downloading": "Yüklənir", "done": "✅ Bitdi", "error": "Xəta"}
+PHASE_LABELS = {"merge": "Birləşdirilir", "postprocess": "Emal olunur", "postqueue": "Emal növbəsində"}
+STATUS_ORDER = {"downloading": 0, "queued": 1, "error": 2, "done": 3}
+FIELDS = ("percent", "mb", "speed", "eta", "phase")
+
+SORT_KEYS = {
+    "title": lambda r: r["title"].casefold(),
+    "status": lambda r: STATUS_ORDER.get(r["status"], 9),
+    "percent": lambda r: r["percent"] or 0.0,
+    "mb": lambda r: r["mb"] or 0.0,
+    "speed": lambda r: r["speed"] or 0.0,
+    "eta": lambda r: float("inf") if r["eta"] is None else r["eta"],
+}
+
+
+def format_speed(bps):
+    if not bps:
+        return ""
+    return f"{bps / 1048576.0:.2f} MB/s"
+
+
+def format_eta(sec):
+    if sec is None:
+        return ""
+    sec = int(sec)
+    return f"{sec // 60:02d}:{sec % 60:02d}"
+
+
+def row_values(row):
+    """Bir sətrin Treeview dəyərləri — yalnız görünən sətirlər üçün çağırılır."""
+    status = row["status"]
+    if row["skipped"]:
+        label = "⏭ Artıq var"
+    elif status == "downloading" and row["phase"] in PHASE_LABELS:
+        label = PHASE_LABELS[row["phase"]]
+    else:
+        label = STATUS_LABELS.get(status, status)
+    percent = "100%" if status == "done" else f"{row['percent'] or 0.0:.1f}%"
+    if status in ("done", "error"):
+        speed = eta = ""
+    else:
+        speed, eta = format_speed(row["speed"]), format_eta(row["eta"])
+    return (row["label"], label, percent, f"{row['mb'] or 0.0:.2f}", speed, eta)
+
+
+class ListModel:
+    def __init__(self):
+        self.rows = {}
+        self.sort_column = None
+        self.reverse = False
+        self.status_filter = None
+        self.version = 0
+        self._order = []
+        self._in_order = True
+        self._buckets = {s: set() for s in STATUS_ORDER}
+        self._view = self._order
+
+    def __len__(self):
+        return len(self.view())
+
+    def clear(self):
+        self.rows.clear()
+        self._order = []
+        self._in_order = True
+        for b in self._buckets.values():
+            b.clear()
+        self._invalidate()
+
+    def add(self, idx, data):
+        title = data.get("title", "")
+        old = self.rows.get(idx)
+        if old is not None:
+            self._buckets[old["status"]].discard(idx)
+        else:
+            if self._order and idx < self._order[-1]:
+                self._in_order = False
+            self._order.append(idx)
+        self.rows[idx] = {
+            "title": title,
+            "label": f"#{idx} - {title}" if data.get("playlist") else title,
+            "status": "queued",
+            "skipped": False,
+            "phase": None,
+            "percent": 0.0,
+            "mb": 0.0,
+            "speed": None,
+            "eta": None,
+        }
+        self._buckets["queued"].add(idx)
+        # filtr/sıra yoxdursa görünüş elə _order-in özüdür
+        if old is not None or not self._in_order or self.sort_column or self.status_filter == "queued":
+            self._invalidate()
+        else:
+            self.version += 1
+
+    def update(self, idx, changes):
+        row = self.rows.get(idx)
+        if row is None:
+            return
+        status = changes.get("status")
+        if status is not None and status != row["status"]:
+            old = row["status"]
+            self._buckets.setdefault(old, set()).discard(idx)
+            self._buckets.setdefault(status, set()).add(idx)
+            row["status"] = status
+            if self.status_filter in (old, status) or self.sort_column == "status":
+                self._invalidate()
+        if changes.get("skipped"):
+            row["skipped"] = True
+        if status == "done":
+            row["percent"] = 100.0
+        for k in FIELDS:
+            if k in changes:
+                row[k] = changes[k]
+        if self.sort_column is not None and self.sort_column in changes:
+            self._invalidate()
+        self.version += 1
+
+    def apply(self, frame):
+        """events.Frame-i modelə tətbiq edir."""
+        if frame.cleared:
+            self.clear()
+        for idx, data in frame.added:
+            self.add(idx, data)
+        for idx, changes in frame.updates.items():
+            self.update(idx, changes)
+
+    def set_sort(self, column, reverse=False):
+        self.sort_column = column if column in SORT_KEYS else None
+        self.reverse = reverse
+        self._invalidate()
+
+    def set_filter(self, status):
+        self.status_filter = status
+        self._invalidate()
+
+    def count(self, status):
+        return len(self._buckets.get(status, ()))
+
+    def view(self):
+        """Görünən sıradakı idx-lər (filtr və sıralama tətbiq olunmuş)."""
+        if self._view is None:
+            if not self._in_order:
+                self._order.sort()
+                self._in_order = True
+            src = self._buckets.get(self.status_filter, ()) if self.status_filter else self._order
+            if self.sort_column:
+                key, rows = SORT_KEYS[self.sort_column], self.rows
+                self._view = sorted(src, key=lambda i: key(rows[i]), reverse=self.reverse)
+            elif self.status_filter:
+                self._view = sorted(src)
+            else:
+                self._view = self._order
+        return self._view
+
+    def window(self, first, count):
+        rows = self.rows
+        return [(i, rows[i]) for i in self.view()[first:first + count]]
+
+    def _invalidate(self):
+        self._view = None
+        self.version += 1
+
+
+class _Slot:
+    __slots__ = ("iid", "idx", "values", "attached")
+
+    def __init__(self, iid):
+        self.iid = iid
+        self.idx = None
+        self.values = None
+        self.attached = False
+
+
+class VirtualList:
+    """ListModel-in görünən hissəsini göstərən Treeview + scrollbar."""
+
+    ROW_HEIGHT = 20
+    HEADING_HEIGHT = 24
+
+    def __init__(self, parent, model, columns, widths):
+        self.model = model
+        self.first = 0
+        self.selected = None
+        self._slots = []
+        self._drawn = None
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse", height=1)
+        for c, w in zip(columns, widths):
+            self.tree.heading(c, text=c.title(), command=lambda c=c: self.sort_by(c))
+            self.tree.column(c, width=w, anchor="center")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.vsb = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.vsb.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(1 - len(self._slots)))
+        self.tree.bind("<Next>", lambda e: self.scroll(len(self._slots) - 1))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._resize(1)
+
+    # ---------------- slot-lar ----------------
+    def _row_height(self):
+        try:
+            return int(ttk.Style().lookup("Treeview", "rowheight")) or self.ROW_HEIGHT
+        except (ValueError, tk.TclError):
+            return self.ROW_HEIGHT
+
+    def _resize(self, count):
+        while len(self._slots) < count:
+            iid = f"s{len(self._slots)}"
+            self.tree.insert("", "end", iid=iid, values=())
+            self.tree.detach(iid)
+            self._slots.append(_Slot(iid))
+        while len(self._slots) > count:
+            self.tree.delete(self._slots.pop().iid)
+        self._drawn = None
+
+    def _on_configure(self, event):
+        count = max(1, (event.height - self.HEADING_HEIGHT) // self._row_height() + 1)
+        if count != len(self._slots):
+            self._resize(count)
+            self.refresh()
+
+    # ---------------- scroll ----------------
+    def yview(self, *args):
+        n = len(self.model)
+        if args and args[0] == "moveto":
+            self.first = int(float(args[1]) * n)
+        elif args and args[0] == "scroll":
+            step = int(args[1])
+            self.first += step * (len(self._slots) - 1 if args[2] == "pages" else 1)
+        self.refresh()
+
+    def scroll(self, units):
+        self.first += units
+        self.refresh()
+        # Treeview-un öz (daxili) scroll-u işləməsin
+        return "break"
+
+    def _on_wheel(self, event):
+        delta = event.delta
+        # Windows: ±120-nin qatları, macOS: kiçik tam ədədlər
+        units = -delta // 120 if abs(delta) >= 120 else (-1 if delta > 0 else 1)
+        return self.scroll(units * 3)
+
+    # ---------------- sıra / filtr / seçim ----------------
+    def sort_by(self, column):
+        # artan → azalan → playlist sırası
+        m = self.model
+        if m.sort_column != column:
+            m.set_sort(column)
+        elif not m.reverse:
+            m.set_sort(column, reverse=True)
+        else:
+            m.set_sort(None)
+        self.first = 0
+        self.refresh()
+
+    def set_filter(self, status):
+        self.model.set_filter(status)
+        self.first = 0
+        self.refresh()
+
+    def _on_select(self, event=None):
+        for slot in self._slots:
+            if slot.attached and slot.iid in self.tree.selection():
+                self.selected = slot.idx
+                return
+
+    # ---------------- çəkmə ----------------
+    def refresh(self):
+        """Görünən slot-ları modeldən doldurur; dəyişməyən slot-lara toxunmur."""
+        view = self.model.view()
+        n = len(view)
+        self.first = max(0, min(self.first, n - len(self._slots) + 1))
+        state = (self.model.version, self.first, len(self._slots))
+        if state == self._drawn:
+            return
+        self._drawn = state
+
+        rows = self.model.rows
+        tree = self.tree
+        selected_iid = None
+        for i, slot in enumerate(self._slots):
+            pos = self.first + i
+            if pos < n:
+                idx = view[pos]
+                values = row_values(rows[idx])
+                if not slot.attached:
+                    tree.move(slot.iid, "", i)
+                    slot.attached = True
+                if values != slot.values:
+                    tree.item(slot.iid, values=values)
+                    slot.values = values
+                slot.idx = idx
+                if idx == self.selected:
+                    selected_iid = slot.iid
+            elif slot.attached:
+                tree.detach(slot.iid)
+                slot.attached = False
+                slot.idx = None
+
+        current = tree.selection()
+        if selected_iid is None:
+            if current:
+                tree.selection_remove(*current)
+        elif current != (selected_iid,):
+            tree.selection_set(selected_iid)
+
+        if n:
+            self.vsb.set(self.first / n, min(1.0, (self.first + len(self._slots)) / n))
+        else:
+            self.vsb.set(0.0, 1.0)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asinxron log yazıcısı.
+
+`append_log()` faylı açıb-bağlamır: yazını (zaman, səviyyə, mətn, sahələr)
+lock-suz deque-yə qoyur və dərhal qayıdır. Tək fon thread-i ilk yazı ilə
+oyanır, FLUSH_INTERVAL qədər yığır (BATCH yazı yığılanda dərhal) və hamısını
+bir `write` ilə fayla yazır; log yoxdursa heç oyanmır. Worker-lər heç vaxt diskdə gözləmir; növbə MAX_PENDING-i
+keçərsə yeni yazılar atılır və atılanların sayı sonradan loga düşür.
+
+Fayl `max_bytes` ölçüsünü və ya `rotate_seconds` yaşını keçəndə fırladılır:
+`ytdownloader_log.txt` → `.1` → `.2` ... (`backups` qədər saxlanılır).
+
+Format:
+    text — `[2024-01-01 12:00:00] Başladı idx=3 url=...` (əvvəlki kimi)
+    json — hər sətir bir JSON: {"ts", "level", "msg", + sahələr (idx, url, rc, ...)}
+
+    append_log("Bitdi", idx=3, url=url, rc=0)
+"""
+
+import atexit
+import collections
+import datetime
+import json
+import os
+import threading
+import time
+
+LOG_FILE = os.path.join(os.getcwd(), "ytdownloader_log.txt")
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+FLUSH_INTERVAL = 0.5
+BATCH = 1000
+MAX_PENDING = 100000
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 3
+
+
+def _format_text(ts, level, text, fields):
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    line = f"[{stamp}] {text}"
+    if fields:
+        line += "".join(f" {k}={v}" for k, v in fields.items())
+    return line
+
+
+def _format_json(ts, level, text, fields):
+    rec = {"ts": datetime.datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"), "level": level, "msg": text}
+    rec.update(fields)
+    return json.dumps(rec, ensure_ascii=False, default=str)
+
+
+class AsyncLogger:
+    def __init__(self, path=LOG_FILE, fmt="text", level="info", max_bytes=MAX_BYTES, rotate_seconds=None,
+                 backups=BACKUPS, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.format = _format_json if fmt == "json" else _format_text
+        self.level = LEVELS[level]
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pending = collections.deque()
+        self._wake = threading.Event()  # növbədə yazı var
+        self._urgent = threading.Event()  # yığım pəncərəsini gözləmə
+        self._closed = False
+        self._f = None
+        self._size = 0
+        self._opened_at = None
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def enabled(self, level):
+        return LEVELS[level] >= self.level
+
+    def log(self, text, level="info", **fields):
+        if LEVELS[level] < self.level or self._closed:
+            return
+        if len(self._pending) >= MAX_PENDING:
+            self.dropped += 1
+            return
+        # deque.append atomikdir — lock yoxdur
+        self._pending.append((time.time(), level, text, fields))
+        # is_set lock-suz oxunur: Event-in lock-u yalnız yazıcı yatmışkən götürülür
+        if not self._wake.is_set():
+            self._wake.set()
+        if len(self._pending) >= BATCH and not self._urgent.is_set():
+            self._urgent.set()
+
+    def flush(self, timeout=5.0):
+        """İndiyə qədər növbəyə qoyulanların hamısı yazılana qədər gözləyir."""
+        if self._closed:
+            return True
+        # marker: yazıcı ona çatanda ondan əvvəlkilər artıq yazılıb
+        done = threading.Event()
+        self._pending.append(done)
+        self._wake.set()
+        self._urgent.set()
+        return done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._wake.set()
+        self._urgent.set()
+        self._thread.join(5.0)
+
+    # ---------------- yazıcı thread ----------------
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # clear drenajdan əvvəl: bundan sonra gələn yazı növbəti dövrü oyadır
+            self._wake.clear()
+            self._urgent.wait(self.flush_interval)
+            self._urgent.clear()
+            self._drain()
+            if self._closed:
+                self._drain()
+                if self._f is not None:
+                    self._f.close()
+                    self._f = None
+                return
+
+    def _drain(self):
+        lines = []
+        markers = []
+        pending = self._pending
+        while pending:
+            item = pending.popleft()
+            if isinstance(item, threading.Event):
+                markers.append(item)
+                continue
+            ts, level, text, fields = item
+            try:
+                lines.append(self.format(ts, level, text, fields))
+            except Exception as e:
+                lines.append(f"log formatı xətası: {e}")
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(self.format(time.time(), "warning", f"Log növbəsi dolu idi: {dropped} yazı atıldı", {}))
+        if lines:
+            self._write("\n".join(lines) + "\n")
+        for done in markers:
+            done.set()
+
+    def _write(self, data):
+        try:
+            if self._f is None:
+                self._open()
+            if self._should_rotate(len(data)):
+                self._rotate()
+            self._f.write(data)
+            self._f.flush()
+            self._size += len(data.encode("utf-8"))
+        except Exception:
+            # log yazıla bilmirsə (disk dolu, icazə) proqram işini davam etdirir
+            if self._f is not None:
+                try:
+                    self._f.close()
+                except Exception:
+                    pass
+            self._f = None
+
+    def _open(self):
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._size = self._f.tell()
+        # son fırlatmanın vaxtı ≈ `.1` faylına son yazılma; qısa ömürlü (cron) proseslər üçün də işləyir
+        try:
+            self._opened_at = os.path.getmtime(self.path + ".1") if self._size else time.time()
+        except OSError:
+            self._opened_at = time.time()
+
+    def _should_rotate(self, incoming):
+        if self.max_bytes and self._size and self._size + incoming > self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._opened_at >= self.rotate_seconds
+
+    def _rotate(self):
+        self._f.close()
+        self._f = None
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+        self._opened_at = time.time()
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def configure_logging(**options):
+    """Log parametrlərini dəyişir (path, fmt, level, max_bytes, rotate_seconds, backups)."""
+    global _logger
+    with _logger_lock:
+        old, _logger = _logger, AsyncLogger(**options)
+    if old is not None:
+        old.close()
+    return _logger
+
+
+def get_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = AsyncLogger()
+    return _logger
+
+
+def append_log(text, level="info", **fields):
+    (_logger or get_logger()).log(text, level, **fields)
+
+
+def log_enabled(level):
+    return (_logger or get_logger()).enabled(level)
+
+
+@atexit.register
+def _close_logger():
+    if _logger is not None:
+        _logger.close()
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+"""
+Hər video üçün mərhələ vaxtları və ümumi metrikalar.
+
+`Metrics` mühərrikin listener-idir (`engine.subscribe(metrics)`) və hadisələrin
+vaxtından hər videonun həyat dövrünü qurur:
+
+    queue_wait  növbəyə düşmə → yükləmənin başlaması
+    spawn       başlama → backend-in ilk çıxışı (proses + extractor)
+    ttfb        başlama → ilk endirilmiş bayt
+    download    başlama → şəbəkə hissəsinin sonu
+    post_wait   xam fayllar hazır → ffmpeg emalının başlaması (konveyer)
+    post        birləşdirmə/transkod (tək mərhələdə yt-dlp-nin öz postprocessor-ları)
+    total       başlama → bitmə
+
+Sayğaclar (video nəticələri, baytlar, təkrar cəhdlər) və histogramlar
+(mərhələ vaxtları, effektiv MB/s) artımla yenilənir. İxrac:
+
+  * `prometheus()` — Prometheus text formatı; `MetricsServer` onu
+    http://127.0.0.1:<port>/metrics ünvanında verir (/summary — JSON);
+  * `summary()` — JSON; "idle" hadisəsində `path` faylına yazılır;
+  * GUI-də "Statistika" pəncərəsi `phase_stats()`-dan oxuyur.
+"""
+
+import bisect
+import http.server
+import json
+import os
+import socketserver
+import threading
+import time
+
+from .core import append_log
+
+METRICS_FILE = os.path.join(os.getcwd(), "ytdownloader_metrics.json")
+PHASES = ("queue_wait", "spawn", "ttfb", "download", "post_wait", "post", "total")
+PHASE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+MBPS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100)
+MB = 1024.0 * 1024.0
+
+
+class Histogram:
+    """Prometheus-üslubu kumulyativ histogram + faizlər üçün xam nümunələr."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # sonuncu: +Inf
+        self.sum = 0.0
+        self.samples = []
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.samples.append(value)
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    def stats(self):
+        if not self.samples:
+            return {"count": 0}
+        s = sorted(self.samples)
+        n = len(s)
+        return {
+            "count": n,
+            "mean": self.sum / n,
+            "p50": s[(n - 1) // 2],
+            "p95": s[min(n - 1, int(n * 0.95))],
+            "max": s[-1],
+        }
+
+    def prometheus(self, name, labels=""):
+        lines = []
+        total = 0
+        sep = "," if labels else ""
+        for le, c in zip(self.buckets, self.counts):
+            total += c
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {total}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        braces = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{braces} {self.sum:.6f}")
+        lines.append(f"{name}_count{braces} {self.count}")
+        return lines
+
+
+class _Timeline:
+    __slots__ = ("queued", "start", "first_output", "first_byte", "download_end", "post_start", "mb", "cur",
+                 "retries")
+
+    def __init__(self, queued):
+        self.queued = queued
+        self.start = self.first_output = self.first_byte = None
+        self.download_end = self.post_start = None
+        self.mb = 0.0  # əvvəlki faylların cəmi + cari fayl
+        self.cur = 0.0
+        self.retries = 0
+
+
+class Metrics:
+    def __init__(self, engine=None, path=METRICS_FILE, clock=time.monotonic):
+        self.engine = engine
+        self.path = path
+        self.clock = clock
+        self.job = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._live = {}
+            self.videos = []  # bitmiş videoların vaxtları (JSON xülasə üçün)
+            self.results = {"done": 0, "error": 0}
+            self.bytes = 0.0
+            self.retries = 0
+            self.phases = {p: Histogram(PHASE_BUCKETS) for p in PHASES}
+            self.throughput = Histogram(MBPS_BUCKETS)
+            self.started_at = time.time()
+            self.run_start = self.clock()
+
+    # ---------------- hadisələr ----------------
+    def __call__(self, event, idx, data):
+        now = self.clock()
+        if event == "job":
+            self.reset()
+            self.job = data
+            return
+        if event == "idle":
+            if self.path:
+                self.write_summary()
+            return
+        if idx is None:
+            return
+        with self._lock:
+            if event == "queued":
+                self._live[idx] = _Timeline(now)
+                return
+            tl = self._live.get(idx)
+            if tl is None:
+                return
+            if event == "status":
+                status = data.get("status")
+                if status == "downloading":
+                    if tl.start is not None:
+                        # eyni video yenidən başladı (təkrar cəhd)
+                        tl.retries += 1
+                        self.retries += 1
+                    tl.start = now
+                    tl.first_output = tl.first_byte = tl.download_end = tl.post_start = None
+                    tl.mb = tl.cur = 0.0
+                elif status == "queued":
+                    # dayandırıldı: vaxtlar hesaba alınmır
+                    tl.start = None
+            elif event == "progress":
+                self._progress(tl, data, now)
+            elif event == "retry":
+                tl.retries += 1
+                self.retries += 1
+            elif event == "finished":
+                self._finish(idx, tl, data.get("returncode"), now)
+
+    def _progress(self, tl, data, now):
+        if tl.start is None:
+            return
+        phase = data.get("phase")
+        if phase == "download":
+            # mühərrikin ilk (sıfır) yazısında "filename" açarı olmur — yalnız backend-dən gələnlərdə
+            if tl.first_output is None and "filename" in data:
+                tl.first_output = now
+            mb = data.get("mb")
+            if mb:
+                if tl.first_byte is None:
+                    tl.first_byte = now
+                    if tl.first_output is None:
+                        tl.first_output = now
+                # sayğac hər faylda (mp4 xam: video, sonra audio) sıfırdan başlayır
+                if mb < tl.cur:
+                    tl.mb += mb
+                else:
+                    tl.mb += mb - tl.cur
+                tl.cur = mb
+        elif phase == "postqueue":
+            if tl.download_end is None:
+                tl.download_end = now
+        elif phase in ("merge", "postprocess"):
+            if tl.download_end is None:
+                tl.download_end = now
+            if tl.post_start is None:
+                tl.post_start = now
+
+    def _finish(self, idx, tl, rc, now):
+        if tl.start is None:
+            return
+        end_dl = tl.download_end or now
+        timings = {
+            "queue_wait": tl.start - tl.queued,
+            "spawn": None if tl.first_output is None else tl.first_output - tl.start,
+            "ttfb": None if tl.first_byte is None else tl.first_byte - tl.start,
+            "download": end_dl - tl.start,
+            "post_wait": None,
+            "post": None,
+            "total": now - tl.start,
+        }
+        if tl.post_start is not None:
+            # tək mərhələdə emal yükləmənin ardınca dərhal başlayır — gözləmə yoxdur
+            if tl.post_start > end_dl:
+                timings["post_wait"] = tl.post_start - end_dl
+            timings["post"] = now - tl.post_start
+        net = end_dl - (tl.first_byte or tl.start)
+        mbps = tl.mb / net if net > 0 and tl.mb else None
+        result = "done" if rc == 0 else "error"
+        self.results[result] += 1
+        self.bytes += tl.mb * MB
+        for phase, value in timings.items():
+            if value is not None:
+                self.phases[phase].observe(max(0.0, value))
+        if mbps is not None and rc == 0:
+            self.throughput.observe(mbps)
+        rec = {"idx": idx, "result": result, "rc": rc, "mb": round(tl.mb, 3), "retries": tl.retries}
+        rec["mbps"] = None if mbps is None else round(mbps, 3)
+        rec.update({k: None if v is None else round(v, 3) for k, v in timings.items()})
+        self.videos.append(rec)
+        self._live.pop(idx, None)
+
+    # ---------------- ixrac ----------------
+    def phase_stats(self):
+        with self._lock:
+            stats = {p: h.stats() for p, h in self.phases.items()}
+            stats["mbps"] = self.throughput.stats()
+            return stats
+
+    def summary(self):
+        elapsed = self.clock() - self.run_start
+        with self._lock:
+            videos = list(self.videos)
+            results = dict(self.results)
+            total_bytes = self.bytes
+            retries = self.retries
+        return {
+            "started_at": self.started_at,
+            "elapsed": round(elapsed, 3),
+            "job": self.job,
+            "results": results,
+            "bytes": int(total_bytes),
+            "mb_per_s": round(total_bytes / MB / elapsed, 3) if elapsed > 0 else None,
+            "retries": retries,
+            "phases": self.phase_stats(),
+            "videos": videos,
+        }
+
+    def write_summary(self, path=None):
+        path = path or self.path
+        try:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f, ensure_ascii=False, indent=1)
+            os.replace(tmp, path)
+            append_log(f"Metrika xülasəsi yazıldı: {path}")
+        except Exception as e:
+            append_log(f"Metrika xülasəsi yazıla bilmədi: {e}")
+
+    def prometheus(self):
+        out = []
+
+        def family(name, kind, help_text):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("ytdownloader_videos_total", "counter", "Bitmiş videolar (nəticəyə görə)")
+            for result, n in self.results.items():
+                out.append(f'ytdownloader_videos_total{{result="{result}"}} {n}')
+            family("ytdownloader_bytes_total", "counter", "Endirilmiş baytlar")
+            out.append(f"ytdownloader_bytes_total {int(self.bytes)}")
+            family("ytdownloader_retries_total", "counter", "Təkrar cəhdlər")
+            out.append(f"ytdownloader_retries_total {self.retries}")
+            family("ytdownloader_phase_seconds", "histogram", "Video başına mərhələ vaxtı")
+            for phase, h in self.phases.items():
+                out.extend(h.prometheus("ytdownloader_phase_seconds", f'phase="{phase}"'))
+            family("ytdownloader_throughput_mbps", "histogram", "Video başına effektiv yükləmə sürəti (MB/s)")
+            out.extend(self.throughput.prometheus("ytdownloader_throughput_mbps"))
+        engine = self.engine
+        if engine is not None:
+            counts = engine.counts()
+            family("ytdownloader_videos", "gauge", "Cari işdə statusa görə video sayı")
+            for status, n in counts.items():
+                out.append(f'ytdownloader_videos{{status="{status}"}} {n}')
+            family("ytdownloader_workers", "gauge", "Paralel yükləmə hədd")
+            out.append(f"ytdownloader_workers {engine.max_threads}")
+            if engine.post is not None:
+                family("ytdownloader_post_pending", "gauge", "Emal mərhələsində gözləyən/işlənən videolar")
+                out.append(f"ytdownloader_post_pending {engine.post.pending}")
+        return "\n".join(out) + "\n"
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """`/metrics` (Prometheus) və `/summary` (JSON) verən yerli HTTP server."""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        self.metrics = metrics
+        metrics_ref = metrics
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] == "/metrics":
+                    body, ctype = metrics_ref.prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path.split("?")[0] == "/summary":
+                    body, ctype = json.dumps(metrics_ref.summary(), ensure_ascii=False), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _Server((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        append_log(f"Metrika endpoint-i: http://{self.httpd.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
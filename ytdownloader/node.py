@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+Koordinatorun (bax `coordinator.py`) worker node-u və HTTP klienti.
+
+`WorkerNode` adi `DownloadEngine`-i koordinatordan qidalandırır: siyahını
+özü oxumaq əvəzinə videoları icarəyə götürüb `add_video` ilə növbəyə qoyur,
+yükləmə/emal bitəndə nəticəni bildirir. Mühərrikin hər şeyi (paralellik,
+konveyer, təkrar cəhdlər, throttling, sürət limiti) olduğu kimi işləyir.
+
+Node öz əlindəki videoların sayını `engine.max_threads + PREFETCH` ilə
+məhdudlaşdırır — qalan videolar başqa node-lar üçün koordinatorda qalır.
+Şəbəkə ilə yalnız bir thread (feeder) danışır: icarə, heartbeat və
+nəticələr; worker thread-ləri koordinatoru gözləmir. Koordinator əlçatmaz
+olanda nəticələr yadda saxlanılır və bağlantı bərpa olunanda göndərilir.
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from .coordinator import TOKEN_HEADER
+from .log import append_log
+
+PREFETCH = 2
+POLL_WAIT = 10.0
+RETRY_PAUSE = 5.0
+
+
+class CoordinatorError(Exception):
+    pass
+
+
+class CoordinatorClient:
+    def __init__(self, url, token=None, timeout=10.0):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _call(self, path, payload=None, wait=0.0):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method="POST" if data is not None else "GET")
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout + wait) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error")
+            except Exception:
+                message = None
+            raise CoordinatorError(f"{path}: HTTP {e.code} {message or e.reason}")
+        except (OSError, ValueError) as e:
+            raise CoordinatorError(f"{path}: {e}")
+
+    def status(self):
+        return self._call("/status")
+
+    def submit(self, url, fmt):
+        return self._call("/jobs", {"url": url, "fmt": fmt})["id"]
+
+    def next_job(self, worker):
+        return self._call("/job", {"worker": worker})["job"]
+
+    def lease(self, worker, job, count, wait=0.0):
+        return self._call("/lease", {"worker": worker, "job": job, "count": count, "wait": wait}, wait)
+
+    def heartbeat(self, worker, job, items):
+        return self._call("/heartbeat", {"worker": worker, "job": job, "items": items})["lost"]
+
+    def complete(self, worker, job, idx, status, error=None):
+        return self._call("/complete", {"worker": worker, "job": job, "idx": idx, "status": status, "error": error})
+
+    def release(self, worker, job, items):
+        return self._call("/release", {"worker": worker, "job": job, "items": items})
+
+
+def node_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkerNode:
+    """
+    `run(threads)` işlər bitənə (və ya `stop()`) qədər bloklanır: koordinatordan
+    növbəti işi alır, mühərriki onunla qidalandırır, iş bitəndə növbətiyə keçir.
+    `counts` — cari işin koordinatordakı sayğacları (UI üçün).
+    """
+
+    def __init__(self, engine, client, name=None):
+        self.engine = engine
+        self.client = client
+        self.name = name or node_name()
+        self.job = None
+        self.counts = {}
+        self.results = {"done": 0, "error": 0}  # bu node-un koordinatora bildirdikləri
+        self.held = set()  # icarədəki, nəticəsi hələ bildirilməmiş idx-lər
+        self.reports = queue.Queue()
+        self.stop_event = threading.Event()
+        self._wake = threading.Event()
+        engine.subscribe(self._on_event)
+
+    def _on_event(self, event, idx, data):
+        if event == "status" and idx in self.held and data.get("status") in ("done", "error"):
+            info = self.engine.video_info.get(idx, {})
+            self.reports.put((idx, data["status"], info.get("error")))
+            self._wake.set()
+        elif event == "status" and data.get("status") == "downloading":
+            # video növbədən götürüldü — yer boşaldı
+            self._wake.set()
+
+    def run(self, threads):
+        try:
+            while not self.stop_event.is_set():
+                job = self._retrying(self.client.next_job, self.name)
+                if job is None:
+                    # _retrying dayandırılanda da None qaytarır
+                    if not self.stop_event.is_set():
+                        append_log("Node: koordinatorda iş qalmayıb.")
+                    return
+                self.run_job(job, threads)
+        finally:
+            self.engine.unsubscribe(self._on_event)
+
+    def run_job(self, job, threads):
+        self.job = job
+        self.held.clear()
+        engine = self.engine
+        engine.fmt = job["fmt"]
+        append_log(f"Node {self.name}: iş #{job['id']} ({job['fmt']}): {job['url']}")
+        engine.begin_feed(job["url"], start_threads=threads)
+        ttl = None
+        last_beat = time.monotonic()
+        finished = False
+        while not self.stop_event.is_set() and not engine.stop_event.is_set():
+            self._wake.clear()
+            try:
+                self._flush_reports()
+                want = engine.max_threads + PREFETCH - len(self.held)
+                if want > 0 and not finished:
+                    resp = self.client.lease(self.name, job["id"], want, 0.0 if self.held else POLL_WAIT)
+                    ttl = resp.get("ttl", ttl)
+                    self.counts = resp.get("counts") or {}
+                    for item in resp["items"]:
+                        self.held.add(item["idx"])
+                        # bu node-un indeksində artıq varsa yüklənmir, dərhal "bitdi" bildirilir
+                        done = self._locally_done(item["video_id"])
+                        engine.add_video(
+                            item["idx"], item["url"], item["title"], bool(item["playlist"]), item["video_id"],
+                            status="done" if done else "queued", skipped=done,
+                            duration=item["duration"], size=item["size"],
+                        )
+                    if resp["done"] and not self.held:
+                        finished = True
+                        engine.end_feed()
+                    if resp["items"]:
+                        continue
+                if finished:
+                    break
+                if ttl and self.held and time.monotonic() - last_beat >= ttl / 3:
+                    lost = self.client.heartbeat(self.name, job["id"], sorted(self.held))
+                    last_beat = time.monotonic()
+                    if lost:
+                        self._drop_lost(lost)
+            except CoordinatorError as e:
+                append_log(f"Node: koordinator əlçatmazdır: {e}", "warning")
+                self.stop_event.wait(RETRY_PAUSE)
+                continue
+            # yer varsa koordinatorda yeni videoları tez-tez yoxlayırıq, doludursa yalnız heartbeat
+            pause = ttl / 3 if ttl else 1.0
+            self._wake.wait(min(pause, 1.0) if len(self.held) < engine.max_threads + PREFETCH else pause)
+        if not finished:
+            # dayandırıldı: bitməmiş videolar başqa node-lara qalır
+            engine.end_feed()
+        engine.wait()
+        self._flush_reports(final=True)
+
+    def _drop_lost(self, lost):
+        """
+        İcarəsi itmiş videolar artıq bu node-un deyil: heartbeat, `want` və
+        sonda `release`-dən çıxır, növbədədirsə yüklənmir. Artıq yüklənən
+        video bitə bilər, amma nəticəsi bildirilmir (`held`-də deyil).
+        """
+        withdrawn = 0
+        for idx in lost:
+            self.held.discard(idx)
+            withdrawn += self.engine.withdraw(idx)
+        append_log(
+            f"Node: {len(lost)} videonun icarəsi itib (başqa node-a keçib), {withdrawn} növbədən götürüldü.",
+            "warning",
+        )
+        self._wake.set()
+
+    def _locally_done(self, video_id):
+        index = self.engine.index
+        if index is None or not video_id:
+            return False
+        return all(index.is_done(video_id, f, self.engine.output_dir) for f in self.engine.formats)
+
+    def _flush_reports(self, final=False):
+        while True:
+            try:
+                idx, status, error = self.reports.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.client.complete(self.name, self.job["id"], idx, status, error)
+            except CoordinatorError as e:
+                # sonra yenə cəhd edilir; icarə bitərsə video başqa node-a keçəcək
+                self.reports.put((idx, status, error))
+                if not final:
+                    raise
+                append_log(f"Node: nəticələr koordinatora göndərilmədi: {e}", "error")
+                return
+            self.held.discard(idx)
+            self.results[status] = self.results.get(status, 0) + 1
+        if final and self.held:
+            try:
+                self.client.release(self.name, self.job["id"], sorted(self.held))
+            except CoordinatorError as e:
+                append_log(f"Node: icarələr qaytarılmadı (müddət bitəndə qayıdacaq): {e}", "warning")
+            self.held.clear()
+
+    def _retrying(self, fn, *args):
+        while not self.stop_event.is_set():
+            try:
+                return fn(*args)
+            except CoordinatorError as e:
+                append_log(f"Node: koordinator əlçatmazdır: {e}", "warning")
+                self.stop_event.wait(RETRY_PAUSE)
+        return None
+
+    def stop(self):
+        self.stop_event.set()
+        self.engine.stop()
+        self._wake.set()
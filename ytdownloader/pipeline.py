@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+"""
+İki mərhələli konveyer: şəbəkə yükləməsi + ffmpeg emalı.
+
+Konveyer rejimində yükləmə worker-ləri yalnız xam axınları endirir
+(mp4 üçün video və audio ayrıca `.f<format_id>` faylları, audio formatlar
+üçün orijinal audio axını) və slot-u dərhal növbəti videoya verir. Birləşdirmə,
+transkodlaşdırma və metadata/thumbnail yazılması `PostProcessStage`-in
+CPU nüvələri sayı qədər ffmpeg prosesində gedir. Mərhələlər arasında həcmi
+məhdud növbə var: emal geri qalırsa yükləmə worker-ləri `submit`-də gözləyir
+(backpressure) və bu vaxt ayrıca ölçülür.
+
+Bir neçə çıxış formatı (mp4 + mp3 + wav) seçiləndə video bir dəfə endirilir:
+hər format üçün ayrıca `PostJob` növbəyə düşür və onlar paralel ffmpeg
+proseslərində gedir. Eyni videonun işləri bir `PostGroup` paylaşır — xam
+fayllar sonuncu format hazır olanda silinir, `on_done` da bir dəfə çağırılır.
+
+`StageMeter` hər mərhələnin dolu slot-saniyələrini tutuma bölür —
+`utilization` hesabatı hansı mərhələnin darboğaz olduğunu göstərir.
+"""
+
+import glob
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+
+from .core import append_log
+from .procs import ProcessController
+
+QUEUE_PER_WORKER = 2
+CANCELLED = -1  # ləğv olunmuş işin nəticəsi (dayandırılmış yükləmə kimi)
+REPORT_INTERVAL = 10.0
+# "#01 - Ad.f137.mp4" → "#01 - Ad"
+RAW_RE = re.compile(r"^(?P<base>.+)\.f[^./\\]+\.[^./\\]+$")
+THUMB_EXTS = (".jpg", ".png", ".webp")
+MP3_QUALITY = "5"  # yt-dlp FFmpegExtractAudio-nun default-u
+
+
+def find_ffmpeg():
+    return shutil.which("ffmpeg")
+
+
+def raw_template(output_template):
+    """`...%(title)s.%(ext)s` → `...%(title)s.f%(format_id)s.%(ext)s`."""
+    head, sep, _ = output_template.rpartition(".%(ext)s")
+    return f"{head}.f%(format_id)s.%(ext)s" if sep else output_template + ".f%(format_id)s"
+
+
+def raw_base(filename):
+    m = RAW_RE.match(filename)
+    return m.group("base") if m else None
+
+
+def raw_files(base, seen=()):
+    """Bir videonun xam faylları yükləmə sırası ilə (əvvəl video, sonra audio)."""
+    ordered = [f for f in dict.fromkeys(seen) if os.path.exists(f)]
+    extra = [
+        f
+        for f in glob.glob(glob.escape(base) + ".f*")
+        if f not in ordered and RAW_RE.match(f) and not f.endswith((".part", ".ytdl"))
+    ]
+    extra.sort(key=os.path.getmtime)
+    return ordered + extra
+
+
+class PostGroup:
+    """Bir videonun bütün format işləri: nəticə sonuncu iş bitəndə bəllidir."""
+
+    def __init__(self, count):
+        self.remaining = count
+        self.rc = 0
+        self.outputs = {}
+        self._lock = threading.Lock()
+
+    def finish(self, job, rc):
+        """İşin nəticəsini qeyd edir; qrupun son işi idisə True."""
+        with self._lock:
+            self.remaining -= 1
+            if rc != 0:
+                self.rc = self.rc or rc
+            else:
+                self.outputs[job.fmt] = job.output
+            return self.remaining == 0
+
+
+class PostJob:
+    def __init__(self, idx, url, fmt, base, inputs, group=None):
+        self.idx = idx
+        self.url = url
+        self.fmt = fmt
+        self.base = base
+        self.inputs = inputs
+        self.group = group
+        self.output = f"{base}.{fmt}"
+
+    def metadata(self):
+        try:
+            with open(self.base + ".info.json", encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return {"title": os.path.basename(self.base)}
+        meta = {
+            "title": info.get("title"),
+            "artist": info.get("uploader") or info.get("channel"),
+            "date": info.get("upload_date"),
+            "comment": info.get("webpage_url"),
+            "description": info.get("description"),
+        }
+        return {k: v for k, v in meta.items() if v}
+
+    def thumbnail(self):
+        for ext in THUMB_EXTS:
+            if os.path.exists(self.base + ext):
+                return self.base + ext
+        return None
+
+    def command(self, ffmpeg, tmp):
+        cmd = [ffmpeg, "-y", "-loglevel", "error", "-nostdin"]
+        if self.fmt == "mp4":
+            thumb = self.thumbnail()
+            for f in self.inputs:
+                cmd += ["-i", f]
+            if thumb:
+                cmd += ["-i", thumb]
+            if len(self.inputs) > 1:
+                cmd += ["-map", "0:v:0", "-map", "1:a:0"]
+            else:
+                cmd += ["-map", "0"]
+            cmd += ["-c", "copy"]
+            if thumb:
+                cmd += ["-map", f"{len(self.inputs)}:v:0", "-c:v:1", "mjpeg", "-disposition:v:1", "attached_pic"]
+            for k, v in self.metadata().items():
+                cmd += ["-metadata", f"{k}={v}"]
+            cmd += ["-movflags", "+faststart"]
+        else:
+            # mp4 mənbəyindən də: xam fayllar video, sonra audio sırasındadır
+            cmd += ["-i", self.inputs[-1], "-vn", "-map", "0:a:0"]
+            if self.fmt == "mp3":
+                cmd += ["-c:a", "libmp3lame", "-q:a", MP3_QUALITY]
+            elif self.fmt == "wav":
+                cmd += ["-c:a", "pcm_s16le"]
+        return cmd + [tmp]
+
+    def leftovers(self):
+        files = list(self.inputs) + [self.base + ".info.json"]
+        files += [self.base + ext for ext in THUMB_EXTS]
+        return files
+
+
+class StageMeter:
+    """Mərhələ yükü: dolu slot-saniyələr / (slot sayı × vaxt)."""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.busy = 0
+        self._busy_s = 0.0
+        self._cap_s = 0.0
+        self._t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _advance(self):
+        now = time.monotonic()
+        dt, self._t = now - self._t, now
+        self._busy_s += self.busy * dt
+        self._cap_s += self.slots * dt
+
+    def enter(self):
+        with self._lock:
+            self._advance()
+            self.busy += 1
+
+    def leave(self):
+        with self._lock:
+            self._advance()
+            self.busy -= 1
+
+    def set_slots(self, slots):
+        with self._lock:
+            self._advance()
+            self.slots = slots
+
+    def totals(self):
+        """(dolu slot-saniyə, tutum slot-saniyə) — başlanğıcdan bəri."""
+        with self._lock:
+            self._advance()
+            return self._busy_s, self._cap_s
+
+
+def utilization(prev, cur):
+    busy, cap = cur[0] - prev[0], cur[1] - prev[1]
+    return min(1.0, busy / cap) if cap > 0 else 0.0
+
+
+class PostProcessStage:
+    """
+    ffmpeg emal hovuzu. Callback-lər emal thread-indən çağırılır:
+    `on_start(job)`, `on_done(job, rc)`, sonra (`pending` azaldıqdan sonra)
+    `on_settled()`.
+    """
+
+    def __init__(self, ffmpeg, on_done, on_start=None, on_settled=None, workers=None, queue_size=None, procs=None):
+        self.ffmpeg = ffmpeg
+        self.procs = procs or ProcessController()
+        self.on_done = on_done
+        self.on_start = on_start
+        self.on_settled = on_settled
+        self.workers = workers or os.cpu_count() or 1
+        self.q = queue.Queue(maxsize=queue_size or QUEUE_PER_WORKER * self.workers)
+        self.pending = 0
+        self.closed = False
+        self.reset_meters()
+        self._lock = threading.Lock()
+        # dolu növbədə bloklanmış submit-lər; cancel_pending onların düşməsini gözləyir
+        self._waiting = 0
+        self._landed = threading.Condition(self._lock)
+        self._threads = []
+
+    def reset_meters(self):
+        self.meter = StageMeter(self.workers)
+        # slot-suz: yükləmə worker-lərinin növbədə gözləmə vaxtı
+        self.blocked = StageMeter(0)
+
+    def start(self):
+        with self._lock:
+            self.closed = False
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for _ in range(self.workers - len(self._threads)):
+            t = threading.Thread(target=self._worker, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, job):
+        """
+        Növbəyə qoyur; növbə doludursa yer açılana qədər gözləyir. Emal ləğv
+        olunubsa (`cancel_pending`, növbəti `start()`-a qədər) iş növbəyə
+        düşmür, CANCELLED ilə bitmiş sayılır və False qaytarılır.
+        """
+        with self._lock:
+            self.pending += 1
+            closed = self.closed
+            if not closed:
+                try:
+                    self.q.put_nowait(job)
+                    return True
+                except queue.Full:
+                    self._waiting += 1
+        if closed:
+            self._finish(job, CANCELLED)
+            return False
+        self.blocked.enter()
+        try:
+            # taymautsuz: cancel_pending növbəni boşaldaraq yer açır
+            self.q.put(job)
+        finally:
+            self.blocked.leave()
+            with self._lock:
+                self._waiting -= 1
+                self._landed.notify_all()
+        return True
+
+    def cancel_pending(self):
+        """
+        Hələ başlamamış işləri növbədən çıxarır, CANCELLED ilə bitirir və
+        qaytarır. Qrupun işləyən üzvü varsa qrupun nəticəsi o bitəndə gəlir.
+        """
+        with self._lock:
+            self.closed = True
+        jobs = []
+        while True:
+            while True:
+                try:
+                    job = self.q.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    jobs.append(job)
+            with self._lock:
+                # boşalma bloklanmış submit-ləri oyadır; onların işi də növbədən çıxarılır
+                if not self._waiting:
+                    break
+                self._landed.wait()
+        for job in jobs:
+            self._finish(job, CANCELLED)
+        return jobs
+
+    def _worker(self):
+        while True:
+            job = self.q.get()
+            if job is None:
+                return
+            if self.closed:
+                # ləğv zamanı bloklanmış submit-dən düşüb
+                self._finish(job, CANCELLED)
+                continue
+            if self.on_start:
+                self.on_start(job)
+            self.meter.enter()
+            try:
+                rc = self.run(job)
+            except Exception as e:
+                append_log(f"Emal xətası: {e}", "error", idx=job.idx)
+                rc = 1
+            finally:
+                self.meter.leave()
+            self._finish(job, rc)
+
+    def _finish(self, job, rc):
+        try:
+            group = job.group
+            if group is None:
+                self.on_done(job, rc)
+            elif group.finish(job, rc):
+                if group.rc == 0:
+                    self.remove_leftovers(job)
+                self.on_done(job, group.rc)
+        finally:
+            with self._lock:
+                self.pending -= 1
+            if self.on_settled:
+                self.on_settled()
+
+    def run(self, job):
+        if not job.inputs:
+            append_log(f"Emal: xam fayl tapılmadı ({job.base})", "error", idx=job.idx)
+            return 1
+        tmp = f"{job.base}.pp.{job.fmt}"
+        cmd = job.command(self.ffmpeg, tmp)
+        # nəzarətçi vasitəsilə: pauza/dayandırma ffmpeg-ə də çatır
+        proc = self.procs.popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        try:
+            output, _ = proc.communicate()
+        finally:
+            self.procs.forget(proc)
+        if proc.returncode != 0:
+            append_log(f"ffmpeg xətası: {output[-500:]}", "error", idx=job.idx, rc=proc.returncode)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return proc.returncode
+        os.replace(tmp, job.output)
+        # qrupda xam fayllar digər formatlara da lazımdır
+        if job.group is None:
+            self.remove_leftovers(job)
+        return 0
+
+    @staticmethod
+    def remove_leftovers(job):
+        for f in job.leftovers():
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+
+    def close(self):
+        for _ in self._threads:
+            self.q.put(None)
+
+
+class UtilizationReporter:
+    """Hər REPORT_INTERVAL saniyədə mərhələ yüklərini loga və `utilization` hadisəsinə yazır."""
+
+    def __init__(self, engine, interval=REPORT_INTERVAL):
+        self.engine = engine
+        self.interval = interval
+        self.last = None
+        self._stop = threading.Event()
+        self._prev = None
+
+    def _snapshot(self):
+        post = self.engine.post
+        return (self.engine.download_meter.totals(), post.meter.totals(), post.blocked.totals())
+
+    def report(self, final=False):
+        cur = self._snapshot()
+        prev = ((0.0, 0.0), (0.0, 0.0), (0.0, 0.0)) if final or self._prev is None else self._prev
+        self._prev = cur
+        dl, pp = utilization(prev[0], cur[0]), utilization(prev[1], cur[1])
+        # backpressure: yükləmə slot-larının emal növbəsini gözləməyə sərf etdiyi hissə
+        blocked = utilization((prev[2][0], prev[0][1]), (cur[2][0], cur[0][1]))
+        post = self.engine.post
+        if pp >= 0.9 and (blocked > 0.05 or post.q.full()):
+            bottleneck = "emal"
+        elif dl >= 0.9:
+            bottleneck = "yükləmə"
+        else:
+            bottleneck = None
+        self.last = {
+            "download": dl,
+            "post": pp,
+            "blocked": blocked,
+            "queue": post.q.qsize(),
+            "queue_max": post.q.maxsize,
+            "bottleneck": bottleneck,
+        }
+        label = "cəmi" if final else "son interval"
+        append_log(
+            f"Mərhələ yükü ({label}): yükləmə {dl:.0%}, emal {pp:.0%} ({post.workers} nüvə), "
+            f"gözləmə {blocked:.0%}, növbə {post.q.qsize()}/{post.q.maxsize}"
+            + (f" — darboğaz: {bottleneck}" if bottleneck else "")
+        )
+        self.engine.emit("utilization", final=final, **self.last)
+        return self.last
+
+    def start(self):
+        self._stop.clear()
+        self._prev = self._snapshot()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.engine.stop_event.is_set():
+                return
+            self.report()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Playlist oxunması.
+
+`iter_entries` yt-dlp-ni `--flat-playlist -j` ilə işə salır: hər entry ayrıca
+JSON sətri kimi gəlir və dərhal yield olunur. Beləliklə bütöv `-J` sənədini
+gözləmək (və yaddaşda saxlamaq) lazım deyil — worker-lər 1-ci video üzərində
+işləyərkən siyahının qalanı hələ səhifə-səhifə gəlir.
+"""
+
+import json
+import subprocess
+
+from .core import append_log
+
+
+def entry_url(e):
+    url = e.get("webpage_url") or e.get("url") or ""
+    if url.startswith("http"):
+        return url
+    return f"https://www.youtube.com/watch?v={e.get('id')}"
+
+
+def is_playlist_entry(e):
+    return e.get("_type") == "url" or e.get("playlist_index") is not None
+
+
+def listing_command(yt_dlp, url, start=1):
+    cmd = [yt_dlp, "--flat-playlist", "-j"]
+    if start > 1:
+        cmd += ["--playlist-start", str(start)]
+    return cmd + [url]
+
+
+def iter_entries(yt_dlp, url, stop_event=None, start=1):
+    """
+    Entry dict-lərini gəldikcə qaytarır (`start` — 1-dən başlayan ilk entry).
+    Heç bir entry gəlmədən yt-dlp xəta ilə bitərsə CalledProcessError
+    (output = yt-dlp-nin mesajları) atılır.
+    """
+    cmd = listing_command(yt_dlp, url, start)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1)
+    messages = []
+    count = 0
+    exhausted = False
+    try:
+        for line in proc.stdout:
+            if stop_event is not None and stop_event.is_set():
+                return
+            line = line.strip()
+            if not line.startswith("{"):
+                if line:
+                    messages.append(line)
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                append_log(f"JSON parse xətası (entry atlandı): {e}")
+                continue
+            if isinstance(entry, dict):
+                count += 1
+                yield entry
+        exhausted = True
+    finally:
+        # dayandırıldıqda və ya istehlakçı generator-u tez bağladıqda
+        if not exhausted and proc.poll() is None:
+            proc.kill()
+        rc = proc.wait()
+        proc.stdout.close()
+
+    if rc != 0:
+        output = "\n".join(messages)
+        if count == 0 and not (stop_event is not None and stop_event.is_set()):
+            raise subprocess.CalledProcessError(rc, cmd, output=output)
+        append_log(f"Playlist oxunması xəbərdarlıqla bitdi (rc={rc}): {output[-500:]}")
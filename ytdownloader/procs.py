@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Alt-proseslərin həyat dövrü.
+
+`ProcessController` hər yt-dlp/ffmpeg prosesini ayrıca proses qrupunda
+başladır və qeydə alır. Beləliklə pauza/dayandırma yalnız bizim oxuma
+dövrümüzə deyil, prosesin özünə (və onun ffmpeg uşaqlarına) təsir edir:
+
+  * pause  — SIGSTOP bütün qrupa: şəbəkə və CPU dərhal dayanır;
+  * resume — SIGCONT;
+  * terminate_all — SIGTERM (+ SIGCONT, dayandırılmış proses siqnalı alsın),
+    TERM_GRACE saniyədən sonra hələ də yaşayanlara SIGKILL;
+  * hold — yalnız cari thread-in başlatdığı prosesləri qısa müddətə dondurur
+    (sürət limiti, bax `bandwidth.py`).
+
+Windows-da SIGSTOP yoxdur: psutil quraşdırılıbsa `suspend()/resume()`
+işlədilir, yoxdursa pauza yalnız çıxışın oxunmasını saxlayır.
+"""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from .core import append_log
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+TERM_GRACE = 3.0
+POSIX = os.name == "posix"
+
+
+class Cancelled(Exception):
+    """Yükləmə istifadəçi tərəfindən dayandırıldı."""
+
+
+def group_kwargs():
+    if POSIX:
+        return {"start_new_session": True}
+    return {"creationflags": getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)}
+
+
+def _signal(proc, sig):
+    if proc.poll() is not None:
+        return
+    try:
+        if POSIX:
+            # start_new_session: qrup id-si prosesin pid-i ilə eynidir
+            os.killpg(proc.pid, sig)
+        elif sig == "stop":
+            if psutil is not None:
+                psutil.Process(proc.pid).suspend()
+        elif sig == "cont":
+            if psutil is not None:
+                psutil.Process(proc.pid).resume()
+        elif sig == "kill":
+            proc.kill()
+        else:
+            proc.terminate()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+    except Exception as e:
+        append_log(f"Prosesə siqnal göndərilmədi pid={proc.pid}: {e}")
+
+
+if POSIX:
+    SIG_STOP, SIG_CONT, SIG_TERM, SIG_KILL = signal.SIGSTOP, signal.SIGCONT, signal.SIGTERM, signal.SIGKILL
+else:
+    SIG_STOP, SIG_CONT, SIG_TERM, SIG_KILL = "stop", "cont", "term", "kill"
+
+
+class ProcessController:
+    def __init__(self, grace=TERM_GRACE):
+        self.grace = grace
+        self.paused = False
+        self._procs = {}  # proses → onu başladan thread
+        self._lock = threading.Lock()
+        if not POSIX and psutil is None:
+            append_log("psutil yoxdur: pauza zamanı yt-dlp prosesləri tam dayanmayacaq.")
+
+    def popen(self, cmd, **kwargs):
+        """subprocess.Popen — ayrıca proses qrupunda; pauza aktivdirsə dərhal dayandırılır."""
+        kwargs.update(group_kwargs())
+        with self._lock:
+            proc = subprocess.Popen(cmd, **kwargs)
+            self._procs[proc] = threading.get_ident()
+            if self.paused:
+                _signal(proc, SIG_STOP)
+        return proc
+
+    def forget(self, proc):
+        with self._lock:
+            self._procs.pop(proc, None)
+
+    def running(self):
+        with self._lock:
+            return [p for p in self._procs if p.poll() is None]
+
+    def pause(self):
+        with self._lock:
+            self.paused = True
+            for p in self._procs:
+                _signal(p, SIG_STOP)
+            return len(self._procs)
+
+    def resume(self):
+        with self._lock:
+            self.paused = False
+            for p in self._procs:
+                _signal(p, SIG_CONT)
+
+    def hold(self, seconds, cancel=None):
+        """
+        Cari thread-in proseslərini `seconds` müddətinə dondurur və gözləyir;
+        proses yoxdursa (in-process backend) sadəcə gözləyir. `cancel` set
+        olunarsa dərhal qayıdır. Ümumi pauza aktivdirsə SIGCONT göndərilmir.
+        """
+        me = threading.get_ident()
+        with self._lock:
+            procs = [p for p, owner in self._procs.items() if owner == me]
+            for p in procs:
+                _signal(p, SIG_STOP)
+        if cancel is not None:
+            cancel.wait(seconds)
+        else:
+            time.sleep(seconds)
+        with self._lock:
+            if not self.paused:
+                for p in procs:
+                    if p in self._procs:
+                        _signal(p, SIG_CONT)
+
+    def terminate_all(self):
+        """SIGTERM göndərir və dərhal qayıdır; `grace` saniyə sonra qalanlar öldürülür."""
+        with self._lock:
+            self.paused = False
+            procs = [p for p in self._procs if p.poll() is None]
+            for p in procs:
+                _signal(p, SIG_TERM)
+                _signal(p, SIG_CONT)
+        if procs:
+            timer = threading.Timer(self.grace, self._kill, args=(procs,))
+            timer.daemon = True
+            timer.start()
+        return len(procs)
+
+    def _kill(self, procs):
+        for p in procs:
+            if p.poll() is None:
+                append_log(f"Proses SIGTERM-ə cavab vermədi, öldürülür pid={p.pid}")
+                _signal(p, SIG_KILL)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+yt-dlp irəliləyiş protokolu.
+
+yt-dlp-yə `--progress-template` ilə "|" ayırıcılı sətirlər çap etdirilir:
+
+    __YTP__|d|<downloaded>|<total>|<total_estimate>|<speed>|<eta>|<frag_index>|<frag_count>
+    __YTP__|p|<postprocessor>|<status>
+
+`parse_line` belə sətri tək keçidlə (`split`) tipli `Progress` yazısına çevirir.
+Şablonu tanımayan köhnə yt-dlp versiyaları üçün əvvəlki regex yolu
+(`core.parse_progress_line`) ehtiyat kimi qalır.
+"""
+
+import collections
+import re
+
+from .core import parse_progress_line
+
+PREFIX = "__YTP__|"
+MB = 1024.0 * 1024.0
+
+PROGRESS_TEMPLATE_ARGS = [
+    "--progress-template",
+    "download:" + PREFIX + "d"
+    "|%(progress.downloaded_bytes)s|%(progress.total_bytes)s|%(progress.total_bytes_estimate)s"
+    "|%(progress.speed)s|%(progress.eta)s|%(progress.fragment_index)s|%(progress.fragment_count)s",
+    "--progress-template",
+    "postprocess:" + PREFIX + "p|%(progress.postprocessor)s|%(progress.status)s",
+]
+
+# ehtiyat yol üçün: "[Merger] Merging formats into ..." və s.
+PHASE_RE = re.compile(r"^\[(?P<pp>Merger|ExtractAudio|EmbedThumbnail|Metadata|FFmpeg\w*)\]")
+# son fayl yolu: "[download] Destination: x", "[Merger] Merging formats into \"x\"" və s.
+DEST_RE = re.compile(
+    r'^\[(?P<pp>\w+)\] (?:Destination: (?P<dest>.+)|Merging formats into "(?P<merged>.+)"|(?P<existing>.+) has already been downloaded)$'
+)
+
+
+class Progress(
+    collections.namedtuple(
+        "Progress", "phase percent downloaded total speed eta frag_index frag_count postprocessor filename"
+    )
+):
+    """
+    phase — "download", "merge" və ya "postprocess".
+    Baytlar/sürət baytla, eta saniyə ilə; bilinməyən sahələr None-dur.
+    filename — yt-dlp-nin yazdığı (və ya yazacağı) fayl, bilinirsə.
+    """
+
+    __slots__ = ()
+
+    @property
+    def mb(self):
+        return None if self.downloaded is None else self.downloaded / MB
+
+
+Progress.__new__.__defaults__ = (None,)
+
+
+def _num(s):
+    return None if s == "NA" or not s else float(s)
+
+
+def phase_for(postprocessor):
+    return "merge" if postprocessor == "Merger" else "postprocess"
+
+
+def download_record(downloaded, total, speed=None, eta=None, frag_index=None, frag_count=None, filename=None):
+    percent = min(downloaded * 100.0 / total, 100.0) if downloaded is not None and total else None
+    return Progress("download", percent, downloaded, total, speed, eta, frag_index, frag_count, None, filename)
+
+
+def postprocess_record(postprocessor, filename=None):
+    return Progress(phase_for(postprocessor), None, None, None, None, None, None, None, postprocessor, filename)
+
+
+def parse_template_line(line):
+    parts = line.rstrip("\r\n").split("|")
+    kind = parts[1] if len(parts) > 1 else ""
+    try:
+        if kind == "d" and len(parts) == 9:
+            downloaded = _num(parts[2])
+            total = _num(parts[3]) or _num(parts[4])
+            percent = min(downloaded * 100.0 / total, 100.0) if downloaded is not None and total else None
+            return Progress(
+                "download", percent, downloaded, total, _num(parts[5]), _num(parts[6]), _num(parts[7]), _num(parts[8]), None
+            )
+    except ValueError:
+        return None
+    if kind == "p" and len(parts) == 4:
+        return postprocess_record(parts[2])
+    return None
+
+
+def parse_legacy_line(line):
+    """
+    Köhnə `--newline` çıxışı: regex ilə faiz/MB, "[Merger]" tipli sətirlərdən
+    faza, "Destination:" sətirlərindən fayl yolu.
+    """
+    if "%" in line:
+        parsed = parse_progress_line(line)
+        if parsed:
+            pct, mb = parsed
+            downloaded = None if mb is None else mb * MB
+            total = None if mb is None or not pct else downloaded * 100.0 / pct
+            return Progress("download", pct, downloaded, total, None, None, None, None, None)
+    if line.startswith("["):
+        m = DEST_RE.match(line.rstrip("\r\n"))
+        if m:
+            filename = m.group("dest") or m.group("merged") or m.group("existing")
+            if m.group("pp") == "download":
+                return Progress("download", None, None, None, None, None, None, None, None, filename)
+            return postprocess_record(m.group("pp"), filename)
+        m = PHASE_RE.match(line)
+        if m:
+            return postprocess_record(m.group("pp"))
+    return None
+
+
+def parse_line(line):
+    if line.startswith(PREFIX):
+        return parse_template_line(line)
+    return parse_legacy_line(line)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+Təkrar cəhdlər: xətanın təsnifatı, eksponensial gözləmə və throttling qoruyucusu.
+
+`classify(lines)` yt-dlp-nin çıxışından (ERROR/WARNING sətirləri) xətanın növünü
+təyin edir:
+
+    throttle  — HTTP 429, "not a bot" yoxlaması: host bizi məhdudlaşdırır;
+    permanent — gizli/silinmiş video, 404/410, regional blok: təkrar mənasızdır;
+    transient — timeout, bağlantı kəsilməsi, 5xx, 403 (vaxtı keçmiş imza) və
+                tanınmayan xətalar: təkrar cəhd olunur.
+
+`RetryPolicy.delay(n)` n-ci təkrar üçün gözləmədir: base·2^(n-1), `cap` ilə
+məhdud, yarısı təsadüfi (jitter) — eyni anda düşən videolar eyni anda qayıtmır.
+
+`CircuitBreaker` throttling görüləndə açılır və bütün worker-lərin yeni
+yükləmə götürməsini `cooldown` müddətinə saxlayır; sonra bir worker "sınaq"
+yükləməsi edir (yarıaçıq): uğurlu olarsa qoruyucu bağlanır, yenə throttling
+olarsa gözləmə ikiqat artır (max_cooldown-a qədər).
+"""
+
+import random
+import re
+import threading
+import time
+
+TRANSIENT = "transient"
+THROTTLE = "throttle"
+PERMANENT = "permanent"
+
+MAX_RETRIES = 3
+RETRY_BASE = 5.0
+RETRY_CAP = 300.0
+THROTTLE_RETRIES = 10
+THROTTLE_COOLDOWN = 60.0
+MAX_COOLDOWN = 900.0
+
+THROTTLE_RE = re.compile(
+    r"HTTP Error 429|Too Many Requests|rate[- ]limit|confirm you.re not a bot|"
+    r"This content isn.t available, try again later",
+    re.I,
+)
+PERMANENT_RE = re.compile(
+    r"Private video|Video unavailable|This video (?:has been removed|is no longer available|is private)|"
+    r"account associated with this video has been terminated|copyright claim|"
+    r"members[- ]only|Join this channel|confirm your age|inappropriate for some users|"
+    r"not available in your country|geo[- ]?restrict|HTTP Error 40[14]|HTTP Error 410|"
+    r"Unsupported URL|is not a valid URL|Requested format is not available|Premieres in|"
+    r"This live event will begin",
+    re.I,
+)
+
+
+def error_lines(lines):
+    return [ln.strip() for ln in lines if ln.lstrip().startswith("ERROR")]
+
+
+def classify(lines):
+    """yt-dlp çıxışının son sətirlərindən xəta növü (THROTTLE, PERMANENT, TRANSIENT)."""
+    errors = error_lines(lines)
+    # ERROR sətri yoxdursa (proses öldürülüb, ffmpeg xətası) bütün sətirlərə baxılır
+    text = "\n".join(errors or [ln.strip() for ln in lines])
+    if THROTTLE_RE.search(text):
+        return THROTTLE
+    if PERMANENT_RE.search(text):
+        return PERMANENT
+    return TRANSIENT
+
+
+def last_error(lines):
+    errors = error_lines(lines)
+    if errors:
+        return errors[-1]
+    rest = [ln.strip() for ln in lines if ln.strip()]
+    return rest[-1] if rest else ""
+
+
+class RetryPolicy:
+    def __init__(self, retries=MAX_RETRIES, base=RETRY_BASE, cap=RETRY_CAP, throttle_retries=THROTTLE_RETRIES):
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self.throttle_retries = throttle_retries
+
+    def allowed(self, kind, attempt):
+        """`attempt`-ci təkrara icazə varmı (1-dən)."""
+        if kind == PERMANENT:
+            return False
+        limit = self.throttle_retries if kind == THROTTLE else self.retries
+        return attempt <= limit
+
+    def delay(self, attempt):
+        d = min(self.cap, self.base * 2 ** (attempt - 1))
+        return d / 2 + random.uniform(0, d / 2)
+
+
+class CircuitBreaker:
+    """
+    Vəziyyətlər: closed → (trip) → open → (cooldown bitdi) → half-open → closed/open.
+    `acquire()` worker-in yeni video götürməsindən əvvəl çağırılır.
+    """
+
+    def __init__(self, cooldown=THROTTLE_COOLDOWN, max_cooldown=MAX_COOLDOWN, on_change=None, clock=time.monotonic):
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_change = on_change
+        self.clock = clock
+        self.state = "closed"
+        self.trips = 0
+        self.until = 0.0
+        self._probing = False
+        self._cond = threading.Condition()
+
+    def trip(self):
+        """Throttling görüldü: dispatch dayanır. Açıq qoruyucunu təkrar açmır."""
+        with self._cond:
+            if self.state == "open":
+                return None
+            self.trips += 1
+            wait = min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+            wait *= random.uniform(0.9, 1.1)
+            self.state = "open"
+            self.until = self.clock() + wait
+            self._probing = False
+            self._cond.notify_all()
+        self._changed(True, wait)
+        return wait
+
+    def ok(self):
+        """Throttling olmadan bitən yükləmə: yarıaçıq qoruyucunu bağlayır."""
+        with self._cond:
+            if self.state != "half-open":
+                return
+            self.state = "closed"
+            self.trips = 0
+            self._probing = False
+            self._cond.notify_all()
+        self._changed(False, 0.0)
+
+    def acquire(self, cancel=None):
+        """
+        Dispatch icazəsi: qoruyucu bağlıdırsa dərhal True. Açıqdırsa cooldown
+        bitənə qədər, yarıaçıqdırsa sınaq yükləməsi bitənə qədər bloklanır.
+        Sınaq yükləməsini edəcək worker üçün "probe" qaytarır; `cancel` set
+        olunub `wake()` çağırılanda False.
+        """
+        with self._cond:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return False
+                if self.state == "closed":
+                    return True
+                if self.state == "open":
+                    remaining = self.until - self.clock()
+                    if remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+                    self.state = "half-open"
+                if not self._probing:
+                    self._probing = True
+                    return "probe"
+                self._cond.wait()
+
+    def release(self):
+        """Sınaq yükləməsi baş tutmadı (növbə boş, dayandırıldı): başqa worker sınasın."""
+        with self._cond:
+            if self.state == "half-open" and self._probing:
+                self._probing = False
+                self._cond.notify_all()
+
+    def remaining(self):
+        """Açıq qoruyucunun bağlanmasına qalan saniyə (bağlıdırsa 0)."""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.until - self.clock())
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def reset(self):
+        with self._cond:
+            was_open = self.state != "closed"
+            self.state = "closed"
+            self.trips = 0
+            self._probing = False
+            self._cond.notify_all()
+        if was_open:
+            self._changed(False, 0.0)
+
+    def _changed(self, active, cooldown):
+        if self.on_change is not None:
+            self.on_change(active, cooldown)
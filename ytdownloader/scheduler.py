@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Prioritetli video növbəsi.
+
+`VideoQueue` `queue.Queue`-nun alt sinfidir (mutex, `not_empty`, `task_done`,
+`qsize` olduğu kimi qalır), amma daxildə FIFO deque əvəzinə heap saxlayır.
+Açar iki hissədən ibarətdir:
+
+    (-pin, siyasət açarı, idx)
+
+* pin — istifadəçinin verdiyi prioritet (default 0): böyük olan əvvəl çıxır,
+  mənfi dəyər videonu sona salır;
+* siyasət (POLICIES):
+    playlist — playlist sırası (əvvəlki FIFO davranışı);
+    shortest — ən kiçik (bayt; ölçü yoxdursa müddətdən `cache.estimate_size`
+               ilə təxmin olunur) əvvəl: qısa videolar uzun
+               birinin arxasında gözləmir;
+    largest  — ən böyük əvvəl (LPT): uzun videolar tez başlayır, sonda bir
+               worker-in tək qalması ("quyruq") qısalır.
+  Ölçüsü və müddəti bilinməyən videolar hər iki siyasətdə sona düşür.
+
+Prioritet dəyişikliyi növbəni yenidən qurmur: köhnə yazı "ölü" işarələnir,
+yenisi heap-ə əlavə olunur (O(log n)); ölü yazılar çıxarılarkən atılır.
+Siyasətin dəyişməsi canlı yazıların açarını yeniləyib bir `heapify` edir.
+"""
+
+import heapq
+import queue
+
+from .cache import estimate_size
+
+POLICIES = ("playlist", "shortest", "largest")
+POLICY_LABELS = {"playlist": "Playlist sırası", "shortest": "Qısalar əvvəl", "largest": "Böyüklər əvvəl"}
+PIN_TOP = 1000000
+
+_UNKNOWN = float("inf")
+
+
+def _size_of(info):
+    """Bayt: bilinən ölçü və ya müddətdən təxmin — bir heap-də vahidlər qarışmasın."""
+    size = info.get("size") or estimate_size(info.get("duration"), "mp4")
+    return float(size) if size else _UNKNOWN
+
+
+def policy_key(policy, info):
+    if policy == "shortest":
+        return _size_of(info)
+    if policy == "largest":
+        size = _size_of(info)
+        return _UNKNOWN if size == _UNKNOWN else -size
+    return 0.0
+
+
+class VideoQueue(queue.Queue):
+    """
+    `put((idx, url))` / `get()` → `(idx, url)`. `info(idx)` videonun metadata
+    dict-ini (size, duration, priority) qaytarır; açar `put` anında hesablanır.
+    """
+
+    def __init__(self, info, policy="playlist"):
+        self.info = info
+        self.policy = policy if policy in POLICIES else "playlist"
+        super().__init__()
+
+    # ---------------- queue.Queue daxili metodları (mutex altında) ----------------
+    def _init(self, maxsize):
+        self.heap = []
+        self.entries = {}  # idx → canlı heap yazısı
+
+    def _qsize(self):
+        return len(self.entries)
+
+    def _put(self, item):
+        self._push(*item)
+
+    def _get(self):
+        heap = self.heap
+        while True:
+            entry = heapq.heappop(heap)
+            if entry[-1]:
+                del self.entries[entry[1]]
+                return entry[1], entry[2]
+
+    def _push(self, idx, url):
+        old = self.entries.get(idx)
+        if old is not None:
+            old[-1] = False
+        entry = [self._key(idx), idx, url, True]
+        self.entries[idx] = entry
+        heap = self.heap
+        heapq.heappush(heap, entry)
+        # ölü yazılar canlılardan çox olanda heap sıxılır
+        if len(heap) > 2 * len(self.entries) + 64:
+            self.heap = [e for e in heap if e[-1]]
+            heapq.heapify(self.heap)
+
+    def _key(self, idx):
+        info = self.info(idx) or {}
+        return (-(info.get("priority") or 0), policy_key(self.policy, info), idx)
+
+    # ---------------- ictimai API ----------------
+    def take(self, done):
+        """
+        Növbəti video və ya None: növbə boşdursa `done()` True olana qədər
+        bloklanır. Timeout yoxdur — `put` və `wake()` oyadır.
+        """
+        with self.not_empty:
+            while not self._qsize():
+                if done():
+                    return None
+                self.not_empty.wait()
+            return self._get()
+
+    def wake(self):
+        with self.not_empty:
+            self.not_empty.notify_all()
+
+    def clear(self):
+        with self.mutex:
+            self._init(0)
+
+    def discard(self, idx):
+        """Videonu növbədən çıxarır (yüklənməyəcək); növbədə deyilsə False."""
+        with self.mutex:
+            entry = self.entries.pop(idx, None)
+            if entry is None:
+                return False
+            entry[-1] = False
+            # `join()` gözləyənlər üçün: çıxarılan video "bitmiş" sayılır
+            self.unfinished_tasks -= 1
+            if self.unfinished_tasks <= 0:
+                self.all_tasks_done.notify_all()
+            return True
+
+    def reprioritize(self, idx):
+        """Növbədəki videonun açarını yeniləyir (metadata dəyişəndən sonra); növbədə deyilsə False."""
+        with self.mutex:
+            old = self.entries.get(idx)
+            if old is None:
+                return False
+            self._push(idx, old[2])
+            return True
+
+    def set_policy(self, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Naməlum növbə siyasəti: {policy}")
+        with self.mutex:
+            self.policy = policy
+            self.heap = list(self.entries.values())
+            for entry in self.heap:
+                entry[0] = self._key(entry[1])
+            heapq.heapify(self.heap)
+
+    def snapshot(self):
+        """Növbədəki idx-lər çıxma sırası ilə (UI/test üçün; O(n log n))."""
+        with self.mutex:
+            return [e[1] for e in sorted(self.entries.values())]
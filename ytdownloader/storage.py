@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+"""
+Disk yeri nəzarəti və müvəqqəti qovluqdan son qovluğa köçürmə.
+
+`DiskBudget` videonun təxmini ölçüsünü yükləmə başlamazdan əvvəl həcm (volume)
+üzrə rezerv edir: boş yer − digər aktiv rezervlər − `min_free` tələbatı
+ödəmirsə video gözləyir. Beləliklə 50 paralel yükləmə diski birlikdə doldurub
+hamısı yarıda qırılmır — ya başlayır, ya da yer boşalana qədər növbədə qalır.
+Gözləyən video başqa rezerv buraxılanda dərhal, kənarda (başqa proses, əl ilə
+silinən fayllar) boşalan yeri isə `recheck` saniyədən bir yoxlayır; `wake()`
+yoxlamanı dərhal etdirir.
+
+`Stager` yükləmə və emalı `scratch` qovluğunda (məs. sürətli SSD/tmpfs), hər
+video üçün ayrıca alt qovluqda aparır; hazır fayllar son qovluğa atomik
+köçürülür — son qovluqda heç vaxt yarımçıq fayl görünmür. Eyni həcmdədirsə
+`os.replace`, fərqli həcmdədirsə əvvəl gizli `.tmp` fayla kopyalanır, sonra
+`os.replace`. `VolumeLimiter` bir həcmə eyni anda yazan köçürmələrin sayını
+məhdudlaşdırır (HDD/şəbəkə diski paralel yazılarda yavaşlayır).
+"""
+
+import contextlib
+import errno
+import os
+import shutil
+import threading
+
+from .log import append_log
+
+MB = 1024 * 1024
+MIN_FREE = 512 * MB  # diskdə həmişə boş qalmalı olan yer
+UNKNOWN_SIZE = 256 * MB  # müddəti/ölçüsü bilinməyən video üçün ehtiyat
+FINAL_WRITES = 2  # bir həcmə eyni anda köçürmə sayı
+RECHECK = 5.0  # yer gözləyərkən diskin yenidən yoxlanması (default), san.
+TEMP_SUFFIXES = (".part", ".ytdl", ".tmp")
+
+
+def existing_dir(path):
+    """`path` və ya onun mövcud olan ən yaxın valideyni."""
+    path = os.path.abspath(path)
+    while not os.path.isdir(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def volume_of(path):
+    return os.stat(existing_dir(path)).st_dev
+
+
+def is_temp(name):
+    return name.startswith(".") or name.endswith(TEMP_SUFFIXES) or ".pp." in name
+
+
+class DiskBudget:
+    """
+    Həcm üzrə yer rezervləri. `reserve(key, {qovluq: bayt})` ya bütün tələbatı
+    rezerv edir (None), ya da heç birini — onda çatışmayan həcm haqda
+    (qovluq, lazım, boş) qaytarır. Rezerv `release(key)`-ə qədər qalır.
+    """
+
+    def __init__(self, min_free=MIN_FREE, usage=shutil.disk_usage, recheck=RECHECK):
+        self.min_free = min_free
+        self.usage = usage
+        self.recheck = recheck
+        self._cond = threading.Condition()
+        self._held = {}  # key → {dev: bayt}
+        self._reserved = {}  # dev → bayt
+
+    def reserve(self, key, needs):
+        by_dev = {}
+        for path, size in needs.items():
+            dev = volume_of(path)
+            total, where = by_dev.get(dev, (0, path))
+            by_dev[dev] = (total + size, where)
+        with self._cond:
+            self._release(key)
+            for dev, (size, path) in by_dev.items():
+                free = self.usage(existing_dir(path)).free - self._reserved.get(dev, 0)
+                if free - size < self.min_free:
+                    return path, size, max(0, free)
+            held = self._held[key] = {}
+            for dev, (size, _) in by_dev.items():
+                held[dev] = size
+                self._reserved[dev] = self._reserved.get(dev, 0) + size
+        return None
+
+    def _release(self, key):
+        held = self._held.pop(key, None)
+        if not held:
+            return False
+        for dev, size in held.items():
+            left = self._reserved.get(dev, 0) - size
+            if left > 0:
+                self._reserved[dev] = left
+            else:
+                self._reserved.pop(dev, None)
+        return True
+
+    def release(self, key):
+        with self._cond:
+            if self._release(key):
+                self._cond.notify_all()
+
+    def active(self):
+        with self._cond:
+            return len(self._held)
+
+    def reserved(self):
+        """{dev: bayt} — hazırda rezerv olunmuş yer."""
+        with self._cond:
+            return dict(self._reserved)
+
+    def wait(self, timeout=None):
+        """Hansısa rezerv buraxılana, `wake()`-ə və ya `timeout`-a (default `recheck`) qədər gözləyir."""
+        with self._cond:
+            self._cond.wait(self.recheck if timeout is None else timeout)
+
+    def wake(self):
+        """Gözləyənlər diski dərhal yenidən yoxlasın (məs. kənarda yer boşaldılıb)."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._held.clear()
+            self._reserved.clear()
+            self._cond.notify_all()
+
+
+class VolumeLimiter:
+    """Həcm üzrə eyni anda yazan köçürmələrin sayı."""
+
+    def __init__(self, limit=FINAL_WRITES):
+        self.limit = max(1, int(limit))
+        self._lock = threading.Lock()
+        self._slots = {}  # dev → Semaphore
+
+    @contextlib.contextmanager
+    def slot(self, path):
+        dev = volume_of(path)
+        with self._lock:
+            sem = self._slots.get(dev)
+            if sem is None:
+                sem = self._slots[dev] = threading.Semaphore(self.limit)
+        with sem:
+            yield
+
+
+def move_atomic(src, dest_dir):
+    """`src`-i `dest_dir`-ə köçürür; son yol. Son qovluqda yarımçıq fayl görünmür."""
+    dest = os.path.join(dest_dir, os.path.basename(src))
+    try:
+        os.replace(src, dest)
+        return dest
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    # fərqli həcm: gizli müvəqqəti fayla kopyala, sonra eyni həcmdə atomik ad dəyişmə
+    tmp = os.path.join(dest_dir, "." + os.path.basename(src) + ".tmp")
+    try:
+        shutil.copyfile(src, tmp)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    os.remove(src)
+    return dest
+
+
+class Stager:
+    """`scratch` altında hər video üçün iş qovluğu və hazır faylların son qovluğa köçürülməsi."""
+
+    def __init__(self, scratch, limiter=None):
+        self.scratch = os.path.abspath(scratch)
+        self.limiter = limiter or VolumeLimiter()
+
+    def workdir(self, key):
+        path = os.path.join(self.scratch, key)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def finalize(self, key, dest_dir):
+        """İş qovluğundakı hazır faylları köçürür; {köhnə yol: yeni yol}."""
+        work = os.path.join(self.scratch, key)
+        try:
+            names = sorted(n for n in os.listdir(work) if not is_temp(n))
+        except FileNotFoundError:
+            return {}
+        moved = {}
+        os.makedirs(dest_dir, exist_ok=True)
+        with self.limiter.slot(dest_dir):
+            for name in names:
+                src = os.path.join(work, name)
+                moved[src] = move_atomic(src, dest_dir)
+        try:
+            os.rmdir(work)
+        except OSError:
+            # .part və s. qalıbsa qovluq saxlanılır
+            pass
+        if moved:
+            append_log(f"{len(moved)} fayl son qovluğa köçürüldü.", "debug", dest=dest_dir)
+        return moved
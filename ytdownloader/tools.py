@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+Xarici alətlərin (yt-dlp, ffmpeg) tapılması, keşi və fonda quraşdırılması.
+
+Yolun tapılması ucuzdur (proqram qovluğu + `shutil.which`), bahalı olan
+versiyanın soruşulmasıdır: PyInstaller yt-dlp binary-si `--version` üçün də
+açılıb özünü açır (~1 san.). Ona görə nəticə TOOLS_FILE-da saxlanır:
+
+    {"yt-dlp": {"path": ..., "mtime": ..., "size": ..., "version": ...}, ...}
+
+Yazı yalnız yol, mtime və ölçü eyni qalanda istifadə olunur — binary
+yenilənəndə və ya başqa yerdə tapılanda versiya yenidən soruşulur.
+
+`ToolSetup` çatışmayan alətləri (yt-dlp binary-sinin endirilməsi, ffmpeg üçün
+apt) fon thread-ində quraşdırır və vəziyyəti `on_status(text)` ilə bildirir;
+GUI pəncərəsi bu vaxt açıq və işlək qalır.
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import threading
+
+from .log import append_log
+
+TOOLS_FILE = os.path.join(os.getcwd(), "ytdownloader_tools.json")
+VERSION_ARGS = {"yt-dlp": ["--version"], "ffmpeg": ["-version"]}
+VERSION_TIMEOUT = 30
+YT_DLP_URL = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/"
+
+
+def exe_name(name):
+    return name + ".exe" if platform.system().lower() == "windows" else name
+
+
+def locate(name, search_dir=None):
+    """Proqram qovluğundakı binary (əvvəlki davranış) və ya PATH-dəki."""
+    local = os.path.join(search_dir or os.getcwd(), exe_name(name))
+    if os.path.isfile(local):
+        return local
+    return shutil.which(name)
+
+
+def probe_version(name, path):
+    try:
+        out = subprocess.run(
+            [path, *VERSION_ARGS.get(name, ["--version"])],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=VERSION_TIMEOUT,
+        ).stdout
+    except Exception as e:
+        append_log(f"{name} versiyası alınmadı: {e}", "warning")
+        return None
+    first = out.strip().splitlines()[0] if out.strip() else ""
+    # "ffmpeg version 6.0-static https://..." → "6.0-static"
+    if first.startswith(name + " version "):
+        first = first[len(name + " version "):].split(" ")[0]
+    return first or None
+
+
+class ToolCache:
+    """TOOLS_FILE üzərində nazik qat; yazılar thread-safe-dir."""
+
+    def __init__(self, path=TOOLS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+            if not isinstance(self.entries, dict):
+                self.entries = {}
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, name, path):
+        """`path` üçün keşdəki yazı — fayl dəyişməyibsə; yoxsa None."""
+        entry = self.entries.get(name)
+        if not entry or entry.get("path") != path:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if entry.get("mtime") != st.st_mtime or entry.get("size") != st.st_size:
+            return None
+        return entry
+
+    def put(self, name, path, version):
+        st = os.stat(path)
+        entry = {"path": path, "mtime": st.st_mtime, "size": st.st_size, "version": version}
+        with self.lock:
+            self.entries[name] = entry
+            self._save()
+        return entry
+
+    def forget(self, name):
+        with self.lock:
+            if self.entries.pop(name, None) is not None:
+                self._save()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            append_log(f"Alət keşi yazılmadı: {e}", "warning")
+
+
+def discover(name, cache=None, search_dir=None):
+    """
+    Alətin yazısı ({"path", "mtime", "size", "version"}) və ya tapılmayıbsa None.
+    Versiya yalnız keş etibarsız olanda soruşulur.
+    """
+    path = locate(name, search_dir)
+    if cache is None:
+        cache = ToolCache()
+    if not path:
+        cache.forget(name)
+        return None
+    entry = cache.get(name, path)
+    if entry is not None:
+        return entry
+    try:
+        return cache.put(name, path, probe_version(name, path))
+    except OSError:
+        return None
+
+
+def download_yt_dlp(dest_dir=None):
+    """Son buraxılışı proqram qovluğuna endirir; yol və ya None."""
+    system = platform.system().lower()
+    exe_path = os.path.join(dest_dir or os.getcwd(), exe_name("yt-dlp"))
+    try:
+        import urllib.request
+
+        tmp = exe_path + ".part"
+        urllib.request.urlretrieve(YT_DLP_URL + exe_name("yt-dlp"), tmp)
+        if system != "windows":
+            os.chmod(tmp, 0o755)
+        # yarımçıq endirmə növbəti başlanğıcda "tapılmış" binary kimi görünməsin
+        os.replace(tmp, exe_path)
+        return exe_path
+    except Exception as e:
+        append_log(f"yt-dlp endirilə bilmədi: {e}", "error")
+        return None
+
+
+def install_ffmpeg():
+    system = platform.system().lower()
+    if system not in ("linux", "darwin"):
+        return False
+    try:
+        subprocess.run(["sudo", "apt", "update"], check=False)
+        subprocess.run(["sudo", "apt", "install", "ffmpeg", "-y"], check=False)
+        return True
+    except Exception as e:
+        append_log(f"ffmpeg quraşdırıla bilmədi: {e}", "error")
+        return False
+
+
+class ToolSetup(threading.Thread):
+    """
+    Fonda alətlərin tapılması və çatışmayanların quraşdırılması.
+
+    `on_status(text)` hər addımda, `on_done(tools)` sonda çağırılır
+    (`tools` — ad → yazı və ya None). Hər ikisi bu thread-dən çağırılır,
+    GUI onları `root.after` ilə öz thread-inə ötürməlidir.
+    """
+
+    def __init__(self, on_done, on_status=None, cache=None, install=True):
+        super().__init__(daemon=True)
+        self.on_done = on_done
+        self.on_status = on_status
+        self.cache = cache or ToolCache()
+        self.install = install
+
+    def status(self, text):
+        append_log(text)
+        if self.on_status is not None:
+            self.on_status(text)
+
+    def run(self):
+        tools = {}
+        ytdlp = discover("yt-dlp", self.cache)
+        if ytdlp is None and self.install:
+            self.status("yt-dlp tapılmadı, endirilir...")
+            if download_yt_dlp():
+                ytdlp = discover("yt-dlp", self.cache)
+        tools["yt-dlp"] = ytdlp
+
+        ffmpeg = discover("ffmpeg", self.cache)
+        if ffmpeg is None and self.install:
+            self.status("ffmpeg tapılmadı, quraşdırılır...")
+            if install_ffmpeg():
+                ffmpeg = discover("ffmpeg", self.cache)
+        tools["ffmpeg"] = ffmpeg
+        self.on_done(tools)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+Paralel yükləmə sayının avtomatik tənzimlənməsi.
+
+`ConcurrencyTuner` mühərrikin hadisələrinə qulaq asır və hər INTERVAL
+saniyədə ümumi sürəti (MB/s), xəta nisbətini və CPU yükünü ölçür:
+
+  * xətalar çoxdursa (server throttling — HTTP 429/403) say yarıya enir;
+    təkrar cəhdə qayıdan yükləmələr ("retry" — "finished" göndərilmir) də
+    xəta sayılır, throttling qoruyucusunun açılması ("throttle") isə
+    növbəti intervalda mütləq geri çəkilmədir;
+  * CPU doyubsa (ffmpeg) bir vahid azalır;
+  * son artım sürəti ən azı GAIN qədər qaldırıbsa artım davam edir,
+    qaldırmayıbsa bir addım geri qayıdılır və bir müddət gözlənilir;
+  * növbədə işçi sayından az video qalıbsa heç nə dəyişmir.
+
+Qərarlar loga yazılır və `("concurrency", None, {"workers", "reason", ...})`
+hadisəsi ilə GUI/CLI-yə göndərilir.
+"""
+
+import os
+import threading
+import time
+
+from .core import append_log
+
+INTERVAL = 5.0
+AUTO_START = 4
+STEP = 2
+GAIN = 0.05  # artım "faydalı" sayılması üçün minimal sürət artımı
+ERROR_BACKOFF = 0.25  # intervaldakı bitənlərin bu hissəsi xəta ilə bitərsə say yarıya enir
+MIN_ERRORS = 2  # tək xəta (məs. gizli video) throttling sayılmır
+CPU_HIGH = 0.9  # nüvə başına yük (loadavg / cpu_count)
+HOLD_AFTER_BACKOFF = 3  # geri çəkilmədən sonra neçə interval dəyişiklik edilmir
+
+
+def cpu_load():
+    """Nüvə başına 1 dəqiqəlik orta yük; ölçülə bilmirsə (Windows) None."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class ConcurrencyTuner:
+    def __init__(self, engine, ceiling, start=AUTO_START, interval=INTERVAL):
+        self.engine = engine
+        self.ceiling = max(1, ceiling)
+        self.start_workers = max(1, min(start, self.ceiling))
+        self.interval = interval
+        self.last = (self.start_workers, "başlanğıc")
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._row_mb = {}
+        self._mb = 0.0
+        self._finished = 0
+        self._errors = 0
+        self._throttled = False
+        self._last_rate = None
+        self._last_move = 0  # +1 artım, -1 azalma, 0 dəyişiklik yox
+        self._hold = 0
+
+    # ---------------- hadisələr ----------------
+    def __call__(self, event, idx, data):
+        if event == "progress":
+            mb = data.get("mb")
+            if mb is not None:
+                with self._lock:
+                    last = self._row_mb.get(idx, 0.0)
+                    if mb > last:
+                        self._mb += mb - last
+                    self._row_mb[idx] = mb
+        elif event == "finished":
+            with self._lock:
+                self._row_mb.pop(idx, None)
+                self._finished += 1
+                if data.get("returncode") != 0:
+                    self._errors += 1
+        elif event == "retry":
+            # uğursuz cəhd: video növbəyə qayıdır, "finished" gəlməyəcək
+            with self._lock:
+                self._row_mb.pop(idx, None)
+                self._finished += 1
+                self._errors += 1
+        elif event == "throttle" and data.get("active"):
+            with self._lock:
+                self._throttled = True
+        elif event == "idle":
+            self.stop()
+
+    # ---------------- idarə ----------------
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        last_t = time.monotonic()
+        while not self._stop.wait(self.interval):
+            if self.engine.stop_event.is_set():
+                break
+            now = time.monotonic()
+            dt, last_t = now - last_t, now
+            with self._lock:
+                mb, finished, errors = self._mb, self._finished, self._errors
+                if self._throttled:
+                    # qoruyucu açıldı: nisbətdən asılı olmayaraq geri çəkilirik
+                    errors = max(errors, finished, MIN_ERRORS)
+                self._mb = 0.0
+                self._finished = self._errors = 0
+                self._throttled = False
+            if self.engine.is_paused():
+                continue
+            self.step(mb / dt if dt > 0 else 0.0, finished, errors, cpu_load())
+
+    def step(self, rate, finished, errors, load):
+        """Bir ölçmə intervalının qərarı; yeni işçi sayını qaytarır."""
+        n = self.engine.max_threads
+        new, reason = n, None
+        if errors >= max(MIN_ERRORS, finished * ERROR_BACKOFF):
+            new, reason = max(1, n // 2), f"{errors}/{finished} xəta — throttling ehtimalı"
+            self._hold = HOLD_AFTER_BACKOFF
+        elif load is not None and load > CPU_HIGH and n > 1:
+            new, reason = n - 1, f"CPU yükü {load:.2f}"
+            self._hold = 1
+        elif self._hold > 0:
+            self._hold -= 1
+        elif self.engine.q.qsize() < n:
+            pass
+        elif self._last_move > 0 and self._last_rate is not None and rate < self._last_rate * (1 + GAIN):
+            new, reason = max(1, n - STEP), f"artım sürəti qaldırmadı ({rate:.2f} MB/s)"
+            self._hold = HOLD_AFTER_BACKOFF
+        elif n < self.ceiling:
+            new, reason = min(self.ceiling, n + STEP), f"sürət {rate:.2f} MB/s — artırılır"
+
+        self._last_move = (new > n) - (new < n)
+        self._last_rate = rate
+        if new != n:
+            self.engine.set_concurrency(new)
+            self.last = (new, reason)
+            load_text = "?" if load is None else f"{load:.2f}"
+            append_log(f"Avto paralel: {n} → {new} ({reason}), CPU yükü: {load_text}")
+            self.engine.emit(
+                "concurrency", workers=new, previous=n, reason=reason, mbps=rate, errors=errors, load=load
+            )
+        return new